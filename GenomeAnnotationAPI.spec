@@ -321,11 +321,15 @@ module GenomeAnnotationAPI {
 
     /* exclude_sequence = set to 1 (true) or 0 (false) to indicate if sequences
        should be included.  Defautl is false.
+       included_feature_fields = the Feature_data fields to return, for example
+       ["feature_id", "feature_type", "feature_function", "feature_locations"].
+       Default is all fields.
     */
     typedef structure {
         ObjectReference ref;
         list<string> feature_id_list;
         boolean exclude_sequence;
+        list<string> included_feature_fields;
     } GetFeatures2Params;
 
     /**
@@ -608,6 +612,7 @@ module GenomeAnnotationAPI {
     /*
      * Retrieve any part of GenomeAnnotation.
      * Any of exclude_genes, include_mrnas and exclude_cdss flags override values listed in include_features_by_type.
+     * included_feature_fields lists the Feature_data fields to return for each feature (default all).
      */
     typedef structure {
         ObjectReference ref;
@@ -622,6 +627,7 @@ module GenomeAnnotationAPI {
         boolean include_exons_by_mrna_id;
         boolean include_utr_by_utr_type_by_mrna_id;
         boolean exclude_summary;
+        list<string> included_feature_fields;
     } GetCombinedDataParams;
 
     /*
@@ -630,6 +636,57 @@ module GenomeAnnotationAPI {
      */
     funcdef get_combined_data(GetCombinedDataParams params) returns (GenomeAnnotation_data) authentication required;
 
+    /*
+     * Retrieve a page of get_combined_data results. The sections are chosen with the same flags as for
+     * get_combined_data, except that protein_by_cds_id is only returned when include_protein_by_cds_id
+     * is set. page_size is the maximum number of features in a page (default 1000). cursor is the
+     * next_cursor returned with the previous page; leave it out to get the first page.
+     * @optional exclude_genes include_mrnas exclude_cdss include_features_by_type include_protein_by_cds_id
+     * @optional include_mrna_ids_by_gene_id exclude_cds_ids_by_gene_id include_cds_id_by_mrna_id
+     * @optional include_exons_by_mrna_id include_utr_by_utr_type_by_mrna_id exclude_summary included_feature_fields
+     * @optional page_size cursor
+     */
+    typedef structure {
+        ObjectReference ref;
+        boolean exclude_genes;
+        boolean include_mrnas;
+        boolean exclude_cdss;
+        list<string> include_features_by_type;
+        boolean include_protein_by_cds_id;
+        boolean include_mrna_ids_by_gene_id;
+        boolean exclude_cds_ids_by_gene_id;
+        boolean include_cds_id_by_mrna_id;
+        boolean include_exons_by_mrna_id;
+        boolean include_utr_by_utr_type_by_mrna_id;
+        boolean exclude_summary;
+        list<string> included_feature_fields;
+        int page_size;
+        string cursor;
+    } GetCombinedDataPageParams;
+
+    /*
+     * A page of get_combined_data results. Features are ordered by type and then by id, and every
+     * relation and protein appears on the page of the feature it is keyed by. feature_types and
+     * summary are only returned on the first page. total_features is the number of features over all
+     * pages. next_cursor is missing on the last page.
+     * @optional next_cursor
+     */
+    typedef structure {
+        GenomeAnnotation_data data;
+        int total_features;
+        string next_cursor;
+    } CombinedDataPage;
+
+    /*
+     * Retrieve get_combined_data results a page at a time, so large eukaryotic datasets can be read
+     * without building the whole result at once. All the pages are read from the same version of the
+     * object. A page reads only its own features and relations, but the ids of all the paged features
+     * are read once per object version and server process. include_protein_by_cds_id reads the proteins
+     * of the whole genome for every page that has CDSs on it, as data_api has no way to read some of
+     * them, so leave it off for large genomes.
+     */
+    funcdef get_combined_data_page(GetCombinedDataPageParams params) returns (CombinedDataPage) authentication required;
+
 
 
     /*
@@ -0,0 +1,128 @@
+import errno
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+
+from GenomeAnnotationAPI import jsoncodec
+
+
+class CombinedDataCache(object):
+    '''
+    A bounded on-disk LRU cache of get_combined_data results.
+
+    Workspace objects at a fixed version never change, so a result keyed by
+    the versioned reference and the requested sections can be served again
+    without touching the workspace or data_api. Entries are stored as gzipped
+    JSON files, one per key, and the least recently used files are removed
+    once the directory holds more than max_bytes. The directory may be shared
+    by the processes on a host: files are written atomically and recency is
+    tracked through file modification times. Errors writing to the cache
+    are ignored, so a full disk only makes it stop caching. A max_bytes of 0
+    disables caching.
+
+    The cache does no access checks; callers must check that the user can
+    read the object before looking it up.
+    '''
+
+    _SUFFIX = '.json.gz'
+
+    def __init__(self, directory, max_bytes, codec=None):
+        if max_bytes < 0:
+            raise ValueError('max_bytes must be non-negative')
+        if max_bytes and not directory:
+            raise ValueError('A directory is required when caching is enabled')
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._codec = codec or jsoncodec.get_codec()
+        self._lock = threading.Lock()
+        self._created = False
+
+    def _path(self, key):
+        return os.path.join(self._dir, hashlib.sha256(key).hexdigest() + self._SUFFIX)
+
+    def get(self, key):
+        if self._max_bytes == 0:
+            return None
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rb') as f:
+                value = self._codec.loads(f.read())
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                # truncated or corrupt
+                self._remove(path)
+            return None
+        except ValueError:
+            self._remove(path)
+            return None
+        try:
+            # mark as most recently used
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        if self._max_bytes == 0:
+            return
+        data = self._codec.dumps(value)
+        try:
+            self._make_dir()
+            fd, tmp = tempfile.mkstemp(dir=self._dir, prefix='.')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+                    f.write(data)
+            os.rename(tmp, self._path(key))
+        except (IOError, OSError):
+            self._remove(tmp)
+            return
+        self._evict()
+
+    def _make_dir(self):
+        if self._created:
+            return
+        try:
+            os.makedirs(self._dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        self._created = True
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self._dir):
+                if not name.endswith(self._SUFFIX) or name.startswith('.'):
+                    continue
+                path = os.path.join(self._dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self._max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        if not self._dir or not os.path.isdir(self._dir):
+            return
+        for name in os.listdir(self._dir):
+            if name.endswith(self._SUFFIX):
+                self._remove(os.path.join(self._dir, name))
@@ -816,6 +816,7 @@ GetFeatures2Params is a reference to a hash where the following keys are defined
 	ref has a value which is a GenomeAnnotationAPI.ObjectReference
 	feature_id_list has a value which is a reference to a list where each element is a string
 	exclude_sequence has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
 ObjectReference is a string
 boolean is an int
 Feature_data is a reference to a hash where the following keys are defined:
@@ -850,6 +851,7 @@ GetFeatures2Params is a reference to a hash where the following keys are defined
 	ref has a value which is a GenomeAnnotationAPI.ObjectReference
 	feature_id_list has a value which is a reference to a list where each element is a string
 	exclude_sequence has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
 ObjectReference is a string
 boolean is an int
 Feature_data is a reference to a hash where the following keys are defined:
@@ -2531,6 +2533,7 @@ GetCombinedDataParams is a reference to a hash where the following keys are defi
 	include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 	include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 	exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
 ObjectReference is a string
 boolean is an int
 GenomeAnnotation_data is a reference to a hash where the following keys are defined:
@@ -2620,6 +2623,7 @@ GetCombinedDataParams is a reference to a hash where the following keys are defi
 	include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 	include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 	exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
 ObjectReference is a string
 boolean is an int
 GenomeAnnotation_data is a reference to a hash where the following keys are defined:
@@ -2748,6 +2752,133 @@ of large eukaryotic datasets. It may lead to out-of-memory errors.
  
 
 
+=head2 get_combined_data_page
+
+  $return = $obj->get_combined_data_page($params)
+
+=over 4
+
+=item Parameter and return types
+
+=begin html
+
+<pre>
+$params is a GenomeAnnotationAPI.GetCombinedDataPageParams
+$return is a GenomeAnnotationAPI.CombinedDataPage
+GetCombinedDataPageParams is a reference to a hash where the following keys are defined:
+	ref has a value which is a GenomeAnnotationAPI.ObjectReference
+	exclude_genes has a value which is a GenomeAnnotationAPI.boolean
+	include_mrnas has a value which is a GenomeAnnotationAPI.boolean
+	exclude_cdss has a value which is a GenomeAnnotationAPI.boolean
+	include_features_by_type has a value which is a reference to a list where each element is a string
+	include_protein_by_cds_id has a value which is a GenomeAnnotationAPI.boolean
+	include_mrna_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+	exclude_cds_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+	include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
+	page_size has a value which is an int
+	cursor has a value which is a string
+CombinedDataPage is a reference to a hash where the following keys are defined:
+	data has a value which is a GenomeAnnotationAPI.GenomeAnnotation_data
+	total_features has a value which is an int
+	next_cursor has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+$params is a GenomeAnnotationAPI.GetCombinedDataPageParams
+$return is a GenomeAnnotationAPI.CombinedDataPage
+GetCombinedDataPageParams is a reference to a hash where the following keys are defined:
+	ref has a value which is a GenomeAnnotationAPI.ObjectReference
+	exclude_genes has a value which is a GenomeAnnotationAPI.boolean
+	include_mrnas has a value which is a GenomeAnnotationAPI.boolean
+	exclude_cdss has a value which is a GenomeAnnotationAPI.boolean
+	include_features_by_type has a value which is a reference to a list where each element is a string
+	include_protein_by_cds_id has a value which is a GenomeAnnotationAPI.boolean
+	include_mrna_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+	exclude_cds_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+	include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+	exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+	included_feature_fields has a value which is a reference to a list where each element is a string
+	page_size has a value which is an int
+	cursor has a value which is a string
+CombinedDataPage is a reference to a hash where the following keys are defined:
+	data has a value which is a GenomeAnnotationAPI.GenomeAnnotation_data
+	total_features has a value which is an int
+	next_cursor has a value which is a string
+
+
+=end text
+
+=item Description
+
+Retrieve get_combined_data results a page at a time, so large eukaryotic datasets can be read
+without building the whole result at once. All the pages are read from the same version of the
+object. A page reads only its own features and relations, but the ids of all the paged features
+are read once per object version and server process. include_protein_by_cds_id reads the proteins
+of the whole genome for every page that has CDSs on it, as data_api has no way to read some of
+them, so leave it off for large genomes.
+
+=back
+
+=cut
+
+ sub get_combined_data_page
+{
+    my($self, @args) = @_;
+
+# Authentication: required
+
+    if ((my $n = @args) != 1)
+    {
+	Bio::KBase::Exceptions::ArgumentValidationError->throw(error =>
+							       "Invalid argument count for function get_combined_data_page (received $n, expecting 1)");
+    }
+    {
+	my($params) = @args;
+
+	my @_bad_arguments;
+        (ref($params) eq 'HASH') or push(@_bad_arguments, "Invalid type for argument 1 \"params\" (value was \"$params\")");
+        if (@_bad_arguments) {
+	    my $msg = "Invalid arguments passed to get_combined_data_page:\n" . join("", map { "\t$_\n" } @_bad_arguments);
+	    Bio::KBase::Exceptions::ArgumentValidationError->throw(error => $msg,
+								   method_name => 'get_combined_data_page');
+	}
+    }
+
+    my $url = $self->{url};
+    my $result = $self->{client}->call($url, $self->{headers}, {
+	    method => "GenomeAnnotationAPI.get_combined_data_page",
+	    params => \@args,
+    });
+    if ($result) {
+	if ($result->is_error) {
+	    Bio::KBase::Exceptions::JSONRPC->throw(error => $result->error_message,
+					       code => $result->content->{error}->{code},
+					       method_name => 'get_combined_data_page',
+					       data => $result->content->{error}->{error} # JSON::RPC::ReturnObject only supports JSONRPC 1.1 or 1.O
+					      );
+	} else {
+	    return wantarray ? @{$result->result} : $result->result->[0];
+	}
+    } else {
+        Bio::KBase::Exceptions::HTTP->throw(error => "Error invoking method get_combined_data_page",
+					    status_line => $self->{client}->status_line,
+					    method_name => 'get_combined_data_page',
+				       );
+    }
+}
+ 
+
+
 =head2 get_genome_v1
 
   $data = $obj->get_genome_v1($params)
@@ -4686,6 +4817,7 @@ a reference to a hash where the following keys are defined:
 ref has a value which is a GenomeAnnotationAPI.ObjectReference
 feature_id_list has a value which is a reference to a list where each element is a string
 exclude_sequence has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
 
 </pre>
 
@@ -4697,6 +4829,7 @@ a reference to a hash where the following keys are defined:
 ref has a value which is a GenomeAnnotationAPI.ObjectReference
 feature_id_list has a value which is a reference to a list where each element is a string
 exclude_sequence has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
 
 
 =end text
@@ -5340,6 +5473,7 @@ include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
 
 </pre>
 
@@ -5360,6 +5494,115 @@ include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
 exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 GetCombinedDataPageParams
+
+=over 4
+
+
+
+=item Description
+
+* Retrieve a page of get_combined_data results. The sections are chosen with the same flags as for
+* get_combined_data, except that protein_by_cds_id is only returned when include_protein_by_cds_id
+* is set. page_size is the maximum number of features in a page (default 1000). cursor is the
+* next_cursor returned with the previous page; leave it out to get the first page.
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+ref has a value which is a GenomeAnnotationAPI.ObjectReference
+exclude_genes has a value which is a GenomeAnnotationAPI.boolean
+include_mrnas has a value which is a GenomeAnnotationAPI.boolean
+exclude_cdss has a value which is a GenomeAnnotationAPI.boolean
+include_features_by_type has a value which is a reference to a list where each element is a string
+include_protein_by_cds_id has a value which is a GenomeAnnotationAPI.boolean
+include_mrna_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+exclude_cds_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
+page_size has a value which is an int
+cursor has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+ref has a value which is a GenomeAnnotationAPI.ObjectReference
+exclude_genes has a value which is a GenomeAnnotationAPI.boolean
+include_mrnas has a value which is a GenomeAnnotationAPI.boolean
+exclude_cdss has a value which is a GenomeAnnotationAPI.boolean
+include_features_by_type has a value which is a reference to a list where each element is a string
+include_protein_by_cds_id has a value which is a GenomeAnnotationAPI.boolean
+include_mrna_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+exclude_cds_ids_by_gene_id has a value which is a GenomeAnnotationAPI.boolean
+include_cds_id_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+include_exons_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+include_utr_by_utr_type_by_mrna_id has a value which is a GenomeAnnotationAPI.boolean
+exclude_summary has a value which is a GenomeAnnotationAPI.boolean
+included_feature_fields has a value which is a reference to a list where each element is a string
+page_size has a value which is an int
+cursor has a value which is a string
+
+
+=end text
+
+=back
+
+
+
+=head2 CombinedDataPage
+
+=over 4
+
+
+
+=item Description
+
+* A page of get_combined_data results. Features are ordered by type and then by id, and every
+* relation and protein appears on the page of the feature it is keyed by. feature_types and
+* summary are only returned on the first page. total_features is the number of features over all
+* pages. next_cursor is missing on the last page.
+
+
+=item Definition
+
+=begin html
+
+<pre>
+a reference to a hash where the following keys are defined:
+data has a value which is a GenomeAnnotationAPI.GenomeAnnotation_data
+total_features has a value which is an int
+next_cursor has a value which is a string
+
+</pre>
+
+=end html
+
+=begin text
+
+a reference to a hash where the following keys are defined:
+data has a value which is a GenomeAnnotationAPI.GenomeAnnotation_data
+total_features has a value which is an int
+next_cursor has a value which is a string
 
 
 =end text
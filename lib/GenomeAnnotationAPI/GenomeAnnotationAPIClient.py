@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 ############################################################
 #
-# Autogenerated by the KBase type compiler -
-# any changes made here will be overwritten
+# Originally generated by the KBase type compiler, now maintained
+# by hand - do not regenerate with kb-sdk compile
 #
 ############################################################
 
@@ -152,11 +152,14 @@ class GenomeAnnotationAPI(object):
         @return Mapping from Feature IDs to dicts of available data.
         :param params: instance of type "GetFeatures2Params"
            (exclude_sequence = set to 1 (true) or 0 (false) to indicate if
-           sequences should be included.  Defautl is false.) -> structure:
+           sequences should be included.  Defautl is false.
+           included_feature_fields = the Feature_data fields to return, for
+           example ["feature_id", "feature_type", "feature_function",
+           "feature_locations"]. Default is all fields.) -> structure:
            parameter "ref" of type "ObjectReference", parameter
            "feature_id_list" of list of String, parameter "exclude_sequence"
            of type "boolean" (A boolean - 0 for false, 1 for true. @range (0,
-           1))
+           1)), parameter "included_feature_fields" of list of String
         :returns: instance of mapping from String to type "Feature_data" ->
            structure: parameter "feature_id" of String, parameter
            "feature_type" of String, parameter "feature_function" of String,
@@ -419,7 +422,9 @@ class GenomeAnnotationAPI(object):
         :param params: instance of type "GetCombinedDataParams" (* Retrieve
            any part of GenomeAnnotation. * Any of exclude_genes,
            include_mrnas and exclude_cdss flags override values listed in
-           include_features_by_type.) -> structure: parameter "ref" of type
+           include_features_by_type. * included_feature_fields lists the
+           Feature_data fields to return for each feature (default all).) ->
+           structure: parameter "ref" of type
            "ObjectReference", parameter "exclude_genes" of type "boolean" (A
            boolean - 0 for false, 1 for true. @range (0, 1)), parameter
            "include_mrnas" of type "boolean" (A boolean - 0 for false, 1 for
@@ -439,7 +444,8 @@ class GenomeAnnotationAPI(object):
            "include_utr_by_utr_type_by_mrna_id" of type "boolean" (A boolean
            - 0 for false, 1 for true. @range (0, 1)), parameter
            "exclude_summary" of type "boolean" (A boolean - 0 for false, 1
-           for true. @range (0, 1))
+           for true. @range (0, 1)), parameter "included_feature_fields" of
+           list of String
         :returns: instance of type "GenomeAnnotation_data" (gene_id is a
            feature id of a gene feature. mrna_id is a feature id of a mrna
            feature. cds_id is a feature id of a cds feature.) -> structure:
@@ -498,6 +504,71 @@ class GenomeAnnotationAPI(object):
             'GenomeAnnotationAPI.get_combined_data',
             [params], self._service_ver, context)
 
+    def get_combined_data_page(self, params, context=None):
+        """
+        Retrieve get_combined_data results a page at a time, so large eukaryotic datasets can be read
+        without building the whole result at once. All the pages are read from the same version of the
+        object. A page reads only its own features and relations, but the ids of all the paged features
+        are read once per object version and server process. include_protein_by_cds_id reads the proteins
+        of the whole genome for every page that has CDSs on it, as data_api has no way to read some of
+        them, so leave it off for large genomes.
+        :param params: instance of type "GetCombinedDataPageParams" (*
+           Retrieve a page of get_combined_data results. The sections are
+           chosen with the same flags as for * get_combined_data, except that
+           protein_by_cds_id is only returned when include_protein_by_cds_id
+           * is set. page_size is the maximum number of features in a page
+           (default 1000). cursor is the * next_cursor returned with the
+           previous page; leave it out to get the first page.) -> structure:
+           parameter "ref" of type "ObjectReference", parameter
+           "exclude_genes" of type "boolean" (A boolean - 0 for false, 1 for
+           true. @range (0, 1)), parameter "include_mrnas" of type "boolean"
+           (A boolean - 0 for false, 1 for true. @range (0, 1)), parameter
+           "exclude_cdss" of type "boolean" (A boolean - 0 for false, 1 for
+           true. @range (0, 1)), parameter "include_features_by_type" of list
+           of String, parameter "include_protein_by_cds_id" of type "boolean"
+           (A boolean - 0 for false, 1 for true. @range (0, 1)), parameter
+           "include_mrna_ids_by_gene_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "exclude_cds_ids_by_gene_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_cds_id_by_mrna_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_exons_by_mrna_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_utr_by_utr_type_by_mrna_id" of type "boolean" (A boolean
+           - 0 for false, 1 for true. @range (0, 1)), parameter
+           "exclude_summary" of type "boolean" (A boolean - 0 for false, 1
+           for true. @range (0, 1)), parameter "included_feature_fields" of
+           list of String, parameter "page_size" of Long, parameter "cursor"
+           of String
+        :returns: instance of type "CombinedDataPage" (* A page of
+           get_combined_data results. Features are ordered by type and then
+           by id, and every * relation and protein appears on the page of the
+           feature it is keyed by. feature_types and * summary are only
+           returned on the first page. total_features is the number of
+           features over all * pages. next_cursor is missing on the last
+           page.) -> structure: parameter "data" of type
+           "GenomeAnnotation_data" (gene_id is a feature id of a gene
+           feature. mrna_id is a feature id of a mrna feature. cds_id is a
+           feature id of a cds feature.) -> structure: parameter "gene_type"
+           of String, parameter "mrna_type" of String, parameter "cds_type"
+           of String, parameter "feature_types" of list of String, parameter
+           "feature_by_id_by_type" of mapping from String to mapping from
+           String to type "Feature_data", parameter "protein_by_cds_id" of
+           mapping from String to type "Protein_data", parameter
+           "mrna_ids_by_gene_id" of mapping from String to list of String,
+           parameter "cds_ids_by_gene_id" of mapping from String to list of
+           String, parameter "cds_id_by_mrna_id" of mapping from String to
+           String, parameter "exons_by_mrna_id" of mapping from String to
+           list of type "Exon_data", parameter "utr_by_utr_type_by_mrna_id"
+           of mapping from String to mapping from String to type "UTR_data",
+           parameter "summary" of type "Summary_data", parameter
+           "total_features" of Long, parameter "next_cursor" of String
+        """
+        return self._client.call_method(
+            'GenomeAnnotationAPI.get_combined_data_page',
+            [params], self._service_ver, context)
+
     def get_genome_v1(self, params, context=None):
         """
         A reasonably simple wrapper on get_objects2, but with Genome specific
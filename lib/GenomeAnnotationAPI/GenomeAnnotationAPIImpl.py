@@ -1,11 +1,58 @@
 # -*- coding: utf-8 -*-
 #BEGIN_HEADER
-from doekbase.data_api.annotation.genome_annotation.api import GenomeAnnotationAPI as GenomeAnnotationAPI_local
-from doekbase.data_api import cache
+import base64
+import hashlib
+import importlib
+import json
 import logging
-from biokbase.workspace.client import Workspace
+import os
+import tempfile
+import threading
+from multiprocessing import TimeoutError as PoolTimeoutError
+from multiprocessing.pool import ThreadPool
+
+from GenomeAnnotationAPI.GenomeInterfaceV1 import GenomeInterfaceV1, LAZY_IMPORTS
+from GenomeAnnotationAPI.GenomeAnnotationCache import GenomeAnnotationCache
+from GenomeAnnotationAPI.CombinedDataCache import CombinedDataCache
+from GenomeAnnotationAPI.WorkspaceClientPool import WorkspaceClientPool
+from GenomeAnnotationAPI.asynclog import QueueLogHandler
+from GenomeAnnotationAPI import deadline
+from GenomeAnnotationAPI import jsoncodec
+
+
+# the fields of Feature_data
+FEATURE_FIELDS = ('feature_id', 'feature_type', 'feature_function', 'feature_aliases',
+                  'feature_dna_sequence_length', 'feature_dna_sequence', 'feature_md5',
+                  'feature_locations', 'feature_publications', 'feature_quality_warnings',
+                  'feature_quality_score', 'feature_notes', 'feature_inference')
+
+# the Feature_data fields that are plain copies of KBaseGenomes.Feature fields,
+# mapped to the Feature field names
+LEGACY_FEATURE_FIELDS = {
+    'feature_id': 'id',
+    'feature_type': 'type',
+    'feature_function': 'function',
+    'feature_dna_sequence_length': 'dna_sequence_length',
+    'feature_dna_sequence': 'dna_sequence',
+    'feature_md5': 'md5',
+    'feature_locations': 'location',
+}
+
+
+class _Completed(object):
+    # the result of a call run inline, with the AsyncResult interface
+    def __init__(self, func, args):
+        self._value = None
+        self._error = None
+        try:
+            self._value = func(*args)
+        except Exception as e:
+            self._error = e
 
-from GenomeAnnotationAPI.GenomeInterfaceV1 import GenomeInterfaceV1
+    def get(self, timeout=None):
+        if self._error is not None:
+            raise self._error
+        return self._value
 
 #END_HEADER
 
@@ -35,6 +82,359 @@ class GenomeAnnotationAPI:
             to_prop_name = prop_name
         if to_prop_name not in to_dict and prop_name in from_dict:
             to_dict[to_prop_name] = from_dict[prop_name]
+
+    def _workspace(self, ctx):
+        """
+        Returns a workspace client for the caller whose timeout is capped by
+        the time left before the request deadline.
+        """
+        return self.workspace_pool.get_client(ctx['token'], deadline.timeout(ctx, 30 * 60))
+
+    def _submit(self, func, *args):
+        """
+        Starts func(*args) on the pool for get_combined_data sections, or
+        runs it inline if the pool has a single worker. Returns an object
+        whose get() returns the result or raises the error.
+        """
+        if self._combined_data_workers < 2:
+            return _Completed(func, args)
+        with self._combined_data_pool_lock:
+            # created lazily and per process so uwsgi workers get their own
+            if self._combined_data_pool_pid != os.getpid():
+                self._combined_data_pool = ThreadPool(self._combined_data_workers)
+                self._combined_data_pool_pid = os.getpid()
+            pool = self._combined_data_pool
+        return pool.apply_async(func, args)
+
+    def _wait_for(self, ctx, pending):
+        """Returns the result of a _submit call, waiting until the request deadline."""
+        left = deadline.remaining(ctx)
+        if left is None:
+            return pending.get()
+        try:
+            return pending.get(max(left, 0))
+        except PoolTimeoutError:
+            deadline.check(ctx)
+            raise
+
+    def _combined_data_sections(self, params):
+        """
+        Returns which sections of get_combined_data params asks for, as a
+        dict of section names to flags, with 'features_by_type' holding the
+        set of feature types to load and 'feature_fields' the sorted
+        Feature_data fields to return, or None for all of them.
+        """
+        def flag(name):
+            return name in params and params[name] == 1
+        features_by_type = None
+        if 'include_features_by_type' in params:
+            features_by_type = set(params['include_features_by_type'])
+        else:
+            features_by_type = set(['gene', 'CDS'])
+        if flag('exclude_genes'):
+            features_by_type.discard('gene')
+        if flag('include_mrnas'):
+            features_by_type.add('mRNA')
+        if flag('exclude_cdss'):
+            features_by_type.discard('CDS')
+        return {'features_by_type': features_by_type,
+                'protein_by_cds_id': not flag('exclude_protein_by_cds_id'),
+                'mrna_ids_by_gene_id': flag('include_mrna_ids_by_gene_id'),
+                'cds_ids_by_gene_id': not flag('exclude_cds_ids_by_gene_id'),
+                'cds_id_by_mrna_id': flag('include_cds_id_by_mrna_id'),
+                'exons_by_mrna_id': flag('include_exons_by_mrna_id'),
+                'utr_by_utr_type_by_mrna_id': flag('include_utr_by_utr_type_by_mrna_id'),
+                'summary': not flag('exclude_summary'),
+                'feature_fields': sorted(params['included_feature_fields'])
+                if params.get('included_feature_fields') else None}
+
+    def _get_feature_ids(self, ga, feature_types):
+        """
+        Returns the ids of the features of the given types, by type. data_api
+        returns every feature for an empty type list, so that isn't asked for.
+        """
+        if not feature_types:
+            return {}
+        return ga.get_feature_ids({"type_list": sorted(feature_types)})['by_type']
+
+    def _get_features(self, ctx, ref, object_info, feature_ids=None, fields=None,
+                      exclude_sequence=False, ga=None):
+        """
+        Returns the Feature_data of feature_ids, or of all features, by id.
+        If fields is given, only those Feature_data fields are returned. For
+        legacy genomes they are read straight from the workspace when they
+        are all plain copies of Genome feature fields; otherwise they are
+        picked out of the data_api result, which leaves out the sequences
+        when they aren't wanted.
+        """
+        if fields:
+            fields = set(fields)
+            unknown = fields - set(FEATURE_FIELDS)
+            if unknown:
+                raise ValueError('Unknown feature fields: ' + ', '.join(sorted(unknown)))
+            is_legacy = object_info[2].split('-')[0] == "KBaseGenomes.Genome"
+            if is_legacy and fields <= set(LEGACY_FEATURE_FIELDS):
+                return self._get_legacy_features(ctx, ref, feature_ids, fields)
+            if not fields & set(['feature_dna_sequence', 'feature_dna_sequence_length']):
+                exclude_sequence = True
+        if ga is None:
+            ga = self._get_genome_annotation(ctx, ref, object_info)
+        features = ga.get_features(feature_id_list=feature_ids,
+                                   exclude_sequence=exclude_sequence)
+        if fields:
+            for feature in features.itervalues():
+                for key in feature.keys():
+                    if key not in fields:
+                        del feature[key]
+        return features
+
+    def _get_legacy_features(self, ctx, ref, feature_ids, fields):
+        """
+        Reads the fields of the features of a KBaseGenomes.Genome with
+        workspace subdata paths, so only those fields are fetched.
+        """
+        paths = ['features/[*]/id']
+        for field in sorted(fields):
+            if field != 'feature_id':
+                paths.append('features/[*]/' + LEGACY_FEATURE_FIELDS[field])
+        genome = self._workspace(ctx).get_objects2(
+            {'objects': [{'ref': ref, 'included': paths}]})['data'][0]['data']
+        wanted = set(feature_ids) if feature_ids else None
+        features = {}
+        for feature in genome.get('features', []):
+            if wanted is not None and feature['id'] not in wanted:
+                continue
+            feature_data = {}
+            for field in fields:
+                name = LEGACY_FEATURE_FIELDS[field]
+                if name not in feature:
+                    continue
+                if field == 'feature_locations':
+                    feature_data[field] = [
+                        {'contig_id': l[0], 'start': l[1], 'strand': l[2], 'length': l[3]}
+                        for l in feature[name]]
+                else:
+                    feature_data[field] = feature[name]
+            features[feature['id']] = feature_data
+        return features
+
+    def _fix_feature_quality_score(self, feature_data):
+        if 'feature_quality_score' in feature_data:
+            fq_score = feature_data['feature_quality_score']
+            if fq_score is not None and not isinstance(fq_score, list):
+                if isinstance(fq_score, basestring):
+                    feature_data['feature_quality_score'] = [fq_score]
+                else:
+                    feature_data['feature_quality_score'] = [str(fq_score)]
+        return feature_data
+
+    def _fetch_summary(self, ws, ref, ga, is_legacy):
+        if is_legacy:
+            return ws.get_objects2({'objects': [{'ref': ref, 'included': [
+                "/scientific_name", "/tax_id", "/contig_ids", "/dna_size", "/gc_content",
+                "/genetic_code", "/num_contigs", "/source", "/source_id", "/domain",
+                "/taxonomy"]}]})['data'][0]['data']
+        return ga.get_summary()
+
+    def _convert_summary(self, summary, is_legacy, feature_type_counts):
+        """
+        Returns the Summary_data for the output of _fetch_summary. Legacy
+        genomes don't store feature type counts, so they are passed in.
+        """
+        if is_legacy:
+            genome = summary
+            summary = {}
+            self._migrate_property_internal(genome, summary, 'scientific_name')
+            self._migrate_property_internal(genome, summary, 'tax_id', 'taxonomy_id')
+            self._migrate_property_internal(genome, summary, 'contig_ids')
+            self._migrate_property_internal(genome, summary, 'dna_size')
+            self._migrate_property_internal(genome, summary, 'gc_content')
+            self._migrate_property_internal(genome, summary, 'genetic_code')
+            self._migrate_property_internal(genome, summary, 'num_contigs')
+            self._migrate_property_internal(genome, summary, 'source', 'assembly_source')
+            self._migrate_property_internal(genome, summary, 'source_id', 'assembly_source_id')
+            self._migrate_property_internal(genome, summary, 'domain', 'kingdom')
+            summary['feature_type_counts'] = feature_type_counts
+            if 'taxonomy' in genome and genome['taxonomy'] is not None:
+                summary['scientific_lineage'] = [x.strip() for x in genome["taxonomy"].split(";")]
+            return summary
+        if 'taxonomy' in summary:
+            taxonomy = summary['taxonomy']
+            self._migrate_property_internal(taxonomy, summary, 'scientific_name')
+            self._migrate_property_internal(taxonomy, summary, 'taxonomy_id')
+            self._migrate_property_internal(taxonomy, summary, 'kingdom')
+            self._migrate_property_internal(taxonomy, summary, 'scientific_lineage')
+            self._migrate_property_internal(taxonomy, summary, 'genetic_code')
+            self._migrate_property_internal(taxonomy, summary, 'organism_aliases')
+            del summary['taxonomy']
+        if 'assembly' in summary:
+            assembly = summary['assembly']
+            self._migrate_property_internal(assembly, summary, 'assembly_source')
+            self._migrate_property_internal(assembly, summary, 'assembly_source_id')
+            self._migrate_property_internal(assembly, summary, 'assembly_source_date')
+            self._migrate_property_internal(assembly, summary, 'gc_content')
+            self._migrate_property_internal(assembly, summary, 'dna_size')
+            self._migrate_property_internal(assembly, summary, 'num_contigs')
+            self._migrate_property_internal(assembly, summary, 'contig_ids')
+            del summary['assembly']
+        if 'annotation' in summary:
+            annotation = summary['annotation']
+            self._migrate_property_internal(annotation, summary, 'external_source')
+            self._migrate_property_internal(annotation, summary, 'external_source_date')
+            self._migrate_property_internal(annotation, summary, 'release')
+            self._migrate_property_internal(annotation, summary, 'original_source_filename')
+            self._migrate_property_internal(annotation, summary, 'feature_type_counts')
+            del summary['annotation']
+        return summary
+
+    def _load_combined_data(self, ctx, ws, ref, input_obj_info, sections):
+        """
+        Builds the get_combined_data result for the sections of the object
+        with info input_obj_info.
+        """
+        is_legacy = input_obj_info[2].split('-')[0] == "KBaseGenomes.Genome"
+        gene_type = 'gene'
+        mrna_type = 'mRNA'
+        cds_type = 'CDS'
+        load_features_by_type = sections['features_by_type']
+        ga = self._get_genome_annotation(ctx, ref, input_obj_info)
+        genome_data = {'gene_type': gene_type, 'mrna_type': mrna_type, 'cds_type': cds_type}
+
+        # only the ids of the loaded features and of the genes the relations
+        # are looked up for are needed
+        needed_types = set(load_features_by_type)
+        if (sections['mrna_ids_by_gene_id'] or sections['cds_ids_by_gene_id']) and not is_legacy:
+            needed_types.add(gene_type)
+
+        # Sections that don't depend on each other are fetched concurrently;
+        # the result is assembled in the same order as before.
+        pending_feature_ids = self._submit(self._get_feature_ids, ga, needed_types)
+        pending = {'feature_types': self._submit(ga.get_feature_types)}
+        if sections['protein_by_cds_id']:
+            pending['protein_by_cds_id'] = self._submit(ga.get_proteins)
+        if sections['cds_id_by_mrna_id'] and not is_legacy:
+            pending['cds_id_by_mrna_id'] = self._submit(ga.get_cds_by_mrna)
+        if sections['exons_by_mrna_id']:
+            pending['exons_by_mrna_id'] = self._submit(ga.get_mrna_exons)
+        if sections['utr_by_utr_type_by_mrna_id']:
+            pending['utr_by_utr_type_by_mrna_id'] = self._submit(ga.get_mrna_utrs)
+        if sections['summary']:
+            pending['summary'] = self._submit(self._fetch_summary, ws, ref, ga, is_legacy)
+            if is_legacy:
+                pending['feature_type_counts'] = self._submit(ga.get_feature_type_counts)
+
+        feature_ids_by_type = self._wait_for(ctx, pending_feature_ids)
+        genome_data['feature_types'] = self._wait_for(ctx, pending['feature_types'])
+        gene_ids = feature_ids_by_type.get(gene_type, [])
+        if sections['mrna_ids_by_gene_id'] and not is_legacy:
+            pending['mrna_ids_by_gene_id'] = self._submit(ga.get_mrna_by_gene, gene_ids)
+        if sections['cds_ids_by_gene_id'] and not is_legacy:
+            pending['cds_ids_by_gene_id'] = self._submit(ga.get_cds_by_gene, gene_ids)
+        feature_types_to_load = list(load_features_by_type)
+        feature_ids = []
+        for feature_type in feature_types_to_load:
+            feature_ids.extend(feature_ids_by_type.get(feature_type, []))
+        feature_map = None
+        deadline.check(ctx)
+        if len(feature_ids) > 0:
+            feature_map = self._get_features(ctx, ref, input_obj_info, feature_ids,
+                                             sections['feature_fields'], ga=ga)
+        else:
+            feature_map = {}
+        feature_by_id_by_type = {}
+        for feature_type in feature_types_to_load:
+            deadline.check(ctx)
+            id_to_feature = {}
+            for feature_id in feature_ids_by_type.get(feature_type, []):
+                id_to_feature[feature_id] = self._fix_feature_quality_score(feature_map[feature_id])
+            feature_by_id_by_type[feature_type] = id_to_feature
+        genome_data['feature_by_id_by_type'] = feature_by_id_by_type
+        # the legacy Genome type has no relations between features
+        for section in ['protein_by_cds_id', 'mrna_ids_by_gene_id', 'cds_ids_by_gene_id',
+                        'cds_id_by_mrna_id', 'exons_by_mrna_id', 'utr_by_utr_type_by_mrna_id']:
+            if sections[section]:
+                if section in pending:
+                    genome_data[section] = self._wait_for(ctx, pending[section])
+                else:
+                    genome_data[section] = {}
+        if sections['summary']:
+            feature_type_counts = None
+            if is_legacy:
+                feature_type_counts = self._wait_for(ctx, pending['feature_type_counts'])
+            genome_data['summary'] = self._convert_summary(
+                self._wait_for(ctx, pending['summary']), is_legacy, feature_type_counts)
+        return genome_data
+
+    def _encode_cursor(self, ref, page_types, offset):
+        """
+        Returns an opaque cursor for the page of get_combined_data_page
+        starting at offset.
+        """
+        return base64.urlsafe_b64encode(json.dumps(
+            {'ref': ref, 'types': sorted(page_types), 'offset': offset}))
+
+    def _decode_cursor(self, cursor):
+        try:
+            value = json.loads(base64.urlsafe_b64decode(str(cursor)))
+            return value['ref'], set(value['types']), int(value['offset'])
+        except (TypeError, ValueError, KeyError):
+            raise ValueError('Invalid cursor: {!r}'.format(cursor))
+
+    def _get_genome_annotation(self, ctx, ref, object_info=None):
+        """
+        Returns a data_api GenomeAnnotationAPI object for ref, reusing a cached
+        one when the same token asks for the same object version again. The ref
+        is always resolved with the caller's token first, so the workspace
+        still checks access on every call. Cached objects hold the token they
+        were built with, so they are keyed by a hash of the token rather than
+        the user: a revoked or expired token is never used on behalf of a
+        newer one.
+        """
+        if object_info is None:
+            ws = self._workspace(ctx)
+            object_info = ws.get_object_info_new({'objects': [{'ref': ref}]})[0]
+        versioned_ref = '{}/{}/{}'.format(object_info[6], object_info[0], object_info[4])
+        key = (versioned_ref, hashlib.sha256(ctx['token'] or '').hexdigest())
+        return self.genome_annotation_cache.get_or_create(
+            key, lambda: self._load_data_api()(self.services, ctx['token'], versioned_ref))
+
+    def _load_data_api(self):
+        """
+        Returns the data_api GenomeAnnotationAPI class. doekbase.data_api is
+        slow to import, so it is imported on first use, and the object cache
+        chosen in the config is set up before anything uses it.
+        """
+        with self._data_api_lock:
+            if self._data_api_class is None:
+                from doekbase.data_api.annotation.genome_annotation.api import GenomeAnnotationAPI as GenomeAnnotationAPI_local
+                from doekbase.data_api import cache
+                if self._data_api_cache is not None:
+                    cache_class, cache_params = self._data_api_cache
+                    cache.ObjectCache.cache_class = getattr(cache, cache_class)
+                    cache.ObjectCache.cache_params = cache_params
+                self._data_api_class = GenomeAnnotationAPI_local
+            return self._data_api_class
+
+    def warm_up(self, refs=(), token=None, user_id=None):
+        """
+        Does the work that would otherwise slow down the first requests:
+        imports the lazily loaded dependencies and loads the genomes in refs
+        into the caches with the given token. Run in a uwsgi master before it
+        forks, the workers share the result copy-on-write. Failures are
+        logged rather than raised.
+        """
+        self._load_data_api()
+        for module in LAZY_IMPORTS:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                self.logger.exception("Warm-up could not import " + module)
+        ctx = {'token': token, 'user_id': user_id}
+        for ref in refs:
+            try:
+                self._get_genome_annotation(ctx, ref).get_feature_types()
+            except Exception:
+                self.logger.exception("Warm-up could not load " + ref)
     #END_CLASS_HEADER
 
     # config contains contents of config file in a hash or None if it couldn't
@@ -42,9 +442,12 @@ class GenomeAnnotationAPI:
     def __init__(self, config):
         #BEGIN_CONSTRUCTOR
         self.logger = logging.getLogger()
-        log_handler = logging.StreamHandler()
-        log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-        self.logger.addHandler(log_handler)
+        # the root logger outlives this object, so only add the handler once
+        if not any(isinstance(h, QueueLogHandler) for h in self.logger.handlers):
+            log_handler = logging.StreamHandler()
+            log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+            self.logger.addHandler(QueueLogHandler(
+                log_handler, maxsize=int(config.get('log_queue_size', 10000))))
 
         self.services = {
             "workspace_service_url": config['workspace-url'],
@@ -65,17 +468,45 @@ class GenomeAnnotationAPI:
             redis_host = None
             redis_port = None
 
+        # applied when data_api is first loaded
+        self._data_api_class = None
+        self._data_api_cache = None
+        self._data_api_lock = threading.Lock()
         if redis_host is not None and redis_port is not None:
             self.logger.info("Activating REDIS at host:{} port:{}".format(redis_host, redis_port))
-            cache.ObjectCache.cache_class = cache.RedisCache
-            cache.ObjectCache.cache_params = {'redis_host': redis_host, 'redis_port': redis_port}
+            self._data_api_cache = ('RedisCache', {'redis_host': redis_host, 'redis_port': redis_port})
         elif cache_dir is not None:
             self.logger.info("Activating File")
-            cache.ObjectCache.cache_class = cache.DBMCache
-            cache.ObjectCache.cache_params = {'path':cache_dir,'name':'data_api'}
+            self._data_api_cache = ('DBMCache', {'path':cache_dir,'name':'data_api'})
         else:
             self.logger.info("Not activating REDIS")
 
+        self.workspace_pool = WorkspaceClientPool(
+            config['workspace-url'],
+            size=int(config.get('workspace_pool_size', 10)))
+
+        self.genome_annotation_cache = GenomeAnnotationCache(
+            maxsize=int(config.get('genome_annotation_cache_size', 50)),
+            ttl=int(config.get('genome_annotation_cache_ttl', 300)))
+        # the sorted feature ids get_combined_data_page pages over, kept for
+        # as long as the data_api objects
+        self._page_ids_cache = GenomeAnnotationCache(
+            maxsize=int(config.get('genome_annotation_cache_size', 50)),
+            ttl=int(config.get('genome_annotation_cache_ttl', 300)))
+
+        self._combined_data_workers = int(config.get('combined_data_workers', 4))
+        self._combined_data_pool = None
+        self._combined_data_pool_pid = None
+        self._combined_data_pool_lock = threading.Lock()
+        self._combined_data_page_size = int(config.get('combined_data_page_size', 1000))
+        self.combined_data_cache = CombinedDataCache(
+            config.get('combined_data_cache_dir') or
+            os.path.join(cache_dir or config.get('scratch') or tempfile.gettempdir(),
+                         'combined_data'),
+            int(config.get('combined_data_cache_size_mb', 0)) * 1024 * 1024,
+            jsoncodec.get_codec(config.get('json_codec', 'auto')))
+        self._combined_data_max_page_size = int(config.get('combined_data_max_page_size', 10000))
+
         #END_CONSTRUCTOR
         pass
 
@@ -91,7 +522,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_taxon
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_taxon['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_taxon['ref'])
         returnVal = ga.get_taxon(ref_only=True)
         #END get_taxon
 
@@ -113,7 +544,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_assembly
-        ws = Workspace(self.services['workspace_service_url'], token=ctx['token'])
+        ws = self._workspace(ctx)
         objreq = {'objects': [{'ref': inputs_get_assembly['ref'], 
                                'included': ['assembly_ref', 'contigset_ref']}]}
         ref = ws.get_objects2(objreq)['data'][0]['data']
@@ -142,7 +573,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_types
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_types['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_types['ref'])
         returnVal = ga.get_feature_types()
         #END get_feature_types
 
@@ -164,7 +595,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_type_descriptions
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_type_descriptions['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_type_descriptions['ref'])
 
         if 'feature_id_list' in inputs_get_feature_type_descriptions:
             returnVal = ga.get_feature_type_descriptions(inputs_get_feature_type_descriptions['feature_id_list'])
@@ -190,7 +621,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_type_counts
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_type_counts['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_type_counts['ref'])
 
         if 'feature_type_list' in inputs_get_feature_type_counts:
             returnVal = ga.get_feature_type_counts(inputs_get_feature_type_counts['feature_type_list'])
@@ -229,7 +660,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_ids
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_ids['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_ids['ref'])
 
         if 'group_type' in inputs_get_feature_ids:
             if 'filters' in inputs_get_feature_ids:
@@ -276,7 +707,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_features
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_features['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_features['ref'])
 
         if 'exclude_sequence' in inputs_get_features:
             exclude_sequence = inputs_get_features['exclude_sequence'] == 1
@@ -304,11 +735,14 @@ class GenomeAnnotationAPI:
         @return Mapping from Feature IDs to dicts of available data.
         :param params: instance of type "GetFeatures2Params"
            (exclude_sequence = set to 1 (true) or 0 (false) to indicate if
-           sequences should be included.  Defautl is false.) -> structure:
+           sequences should be included.  Defautl is false.
+           included_feature_fields = the Feature_data fields to return, for
+           example ["feature_id", "feature_type", "feature_function",
+           "feature_locations"]. Default is all fields.) -> structure:
            parameter "ref" of type "ObjectReference", parameter
            "feature_id_list" of list of String, parameter "exclude_sequence"
            of type "boolean" (A boolean - 0 for false, 1 for true. @range (0,
-           1))
+           1)), parameter "included_feature_fields" of list of String
         :returns: instance of mapping from String to type "Feature_data" ->
            structure: parameter "feature_id" of String, parameter
            "feature_type" of String, parameter "feature_function" of String,
@@ -341,10 +775,11 @@ class GenomeAnnotationAPI:
           elif params['exclude_sequence'] != 0:
             raise ValueError('exclude_sequence field in parameters object must be set to either 1 or 0')
 
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], params['ref'])
-        returnVal = ga.get_features(
-                          feature_id_list=feature_id_list,
-                          exclude_sequence=exclude_sequence)
+        ws = self._workspace(ctx)
+        object_info = ws.get_object_info_new({'objects': [{'ref': params['ref']}]})[0]
+        returnVal = self._get_features(ctx, params['ref'], object_info, feature_id_list,
+                                       params.get('included_feature_fields'),
+                                       exclude_sequence)
 
         #END get_features2
 
@@ -371,7 +806,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_proteins
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_proteins['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_proteins['ref'])
         returnVal = ga.get_proteins()
         #END get_proteins
 
@@ -395,7 +830,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_locations
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_locations['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_locations['ref'])
 
         if 'feature_id_list' in inputs_get_feature_locations:
             returnVal = ga.get_feature_locations(inputs_get_feature_locations['feature_id_list'])
@@ -421,7 +856,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_publications
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_publications['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_publications['ref'])
 
         if 'feature_id_list' in inputs_get_feature_publications:
             returnVal = ga.get_feature_publications(inputs_get_feature_publications['feature_id_list'])
@@ -450,7 +885,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_dna
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_dna['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_dna['ref'])
 
         if 'feature_id_list' in inputs_get_feature_dna:
             returnVal = ga.get_feature_dna(inputs_get_feature_dna['feature_id_list'])
@@ -476,7 +911,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_functions
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_functions['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_functions['ref'])
 
         if 'feature_id_list' in inputs_get_feature_functions:
             returnVal = ga.get_feature_functions(inputs_get_feature_functions['feature_id_list'])
@@ -502,7 +937,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_feature_aliases
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_feature_aliases['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_feature_aliases['ref'])
 
         if 'feature_id_list' in inputs_get_feature_aliases:
             returnVal = ga.get_feature_aliases(inputs_get_feature_aliases['feature_id_list'])
@@ -532,7 +967,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_cds_by_gene
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_cds_by_gene['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_cds_by_gene['ref'])
 
         if 'gene_id_list' in inputs_get_cds_by_gene:
             returnVal = ga.get_cds_by_gene(inputs_get_cds_by_gene['gene_id_list'])
@@ -557,7 +992,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_cds_by_mrna
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_mrna_id_list['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_mrna_id_list['ref'])
 
         if 'mrna_id_list' in inputs_mrna_id_list:
             returnVal = ga.get_cds_by_mrna(inputs_mrna_id_list['mrna_id_list'])
@@ -583,7 +1018,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_gene_by_cds
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_gene_by_cds['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_gene_by_cds['ref'])
 
         if 'cds_id_list' in inputs_get_gene_by_cds:
             returnVal = ga.get_gene_by_cds(inputs_get_gene_by_cds['cds_id_list'])
@@ -609,7 +1044,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_gene_by_mrna
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_gene_by_mrna['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_gene_by_mrna['ref'])
 
         if 'mrna_id_list' in inputs_get_gene_by_mrna:
             returnVal = ga.get_gene_by_mrna(inputs_get_gene_by_mrna['mrna_id_list'])
@@ -635,7 +1070,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_mrna_by_cds
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_mrna_by_cds['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_mrna_by_cds['ref'])
 
         if 'cds_id_list' in inputs_get_mrna_by_cds:
             returnVal = ga.get_mrna_by_cds(inputs_get_mrna_by_cds['cds_id_list'])
@@ -661,7 +1096,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_mrna_by_gene
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_mrna_by_gene['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_mrna_by_gene['ref'])
 
         if 'gene_id_list' in inputs_get_mrna_by_gene:
             returnVal = ga.get_mrna_by_gene(inputs_get_mrna_by_gene['gene_id_list'])
@@ -692,7 +1127,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_mrna_exons
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_mrna_exons['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_mrna_exons['ref'])
 
         if 'mrna_id_list' in inputs_get_mrna_exons:
             returnVal = ga.get_mrna_exons(inputs_get_mrna_exons['mrna_id_list'])
@@ -721,7 +1156,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_mrna_utrs
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_mrna_utrs['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_mrna_utrs['ref'])
 
         if 'mrna_id_list' in inputs_get_mrna_utrs:
             returnVal = ga.get_mrna_utrs(inputs_get_mrna_utrs['mrna_id_list'])
@@ -759,7 +1194,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_summary
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_get_summary['ref'])
+        ga = self._get_genome_annotation(ctx, inputs_get_summary['ref'])
         returnVal = ga.get_summary()
         #END get_summary
 
@@ -793,7 +1228,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: return_1, return_2
         #BEGIN save_summary
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], inputs_save_summary['ref'])
+        ga = self._load_data_api()(self.services, ctx['token'], inputs_save_summary['ref'])
         returnVal = ga.save_summary()
         return_1 = returnVal[0]
         return_2 = returnVal[1]
@@ -816,7 +1251,9 @@ class GenomeAnnotationAPI:
         :param params: instance of type "GetCombinedDataParams" (* Retrieve
            any part of GenomeAnnotation. * Any of exclude_genes,
            include_mrnas and exclude_cdss flags override values listed in
-           include_features_by_type.) -> structure: parameter "ref" of type
+           include_features_by_type. * included_feature_fields lists the
+           Feature_data fields to return for each feature (default all).) ->
+           structure: parameter "ref" of type
            "ObjectReference", parameter "exclude_genes" of type "boolean" (A
            boolean - 0 for false, 1 for true. @range (0, 1)), parameter
            "include_mrnas" of type "boolean" (A boolean - 0 for false, 1 for
@@ -836,7 +1273,8 @@ class GenomeAnnotationAPI:
            "include_utr_by_utr_type_by_mrna_id" of type "boolean" (A boolean
            - 0 for false, 1 for true. @range (0, 1)), parameter
            "exclude_summary" of type "boolean" (A boolean - 0 for false, 1
-           for true. @range (0, 1))
+           for true. @range (0, 1)), parameter "included_feature_fields" of
+           list of String
         :returns: instance of type "GenomeAnnotation_data" (gene_id is a
            feature id of a gene feature. mrna_id is a feature id of a mrna
            feature. cds_id is a feature id of a cds feature.) -> structure:
@@ -894,144 +1332,213 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN get_combined_data
-        ws = Workspace(self.services['workspace_service_url'], token=ctx['token'])
+        ws = self._workspace(ctx)
+        # this also checks that the caller can read the object, before any
+        # cached result is returned
         input_obj_info = ws.get_object_info_new({'objects': [{'ref': params['ref']}]})[0]
-        input_obj_type = input_obj_info[2].split('-')[0]
-        is_legacy = input_obj_type == "KBaseGenomes.Genome"
-        exclude_genes = 'exclude_genes' in params and params['exclude_genes'] == 1
-        include_mrnas = 'include_mrnas' in params and params['include_mrnas'] == 1
-        exclude_cdss = 'exclude_cdss' in params and params['exclude_cdss'] == 1
+        sections = self._combined_data_sections(params)
+        # a versioned reference never changes, so neither does the result
+        cache_key = json.dumps({
+            'ref': '{}/{}/{}'.format(input_obj_info[6], input_obj_info[0], input_obj_info[4]),
+            'sections': dict(sections, features_by_type=sorted(sections['features_by_type']))},
+            sort_keys=True)
+        returnVal = self.combined_data_cache.get(cache_key)
+        if returnVal is None:
+            deadline.check(ctx)
+            returnVal = self._load_combined_data(ctx, ws, params['ref'], input_obj_info, sections)
+            self.combined_data_cache.put(cache_key, returnVal)
+        #END get_combined_data
+
+        # At some point might do deeper type checking...
+        if not isinstance(returnVal, dict):
+            raise ValueError('Method get_combined_data return value ' +
+                             'returnVal is not type dict as required.')
+        # return the results
+        return [returnVal]
+
+    def get_combined_data_page(self, ctx, params):
+        """
+        Retrieve get_combined_data results a page at a time, so large eukaryotic datasets can be read
+        without building the whole result at once. All the pages are read from the same version of the
+        object. A page reads only its own features and relations, but the ids of all the paged features
+        are read once per object version and server process. include_protein_by_cds_id reads the proteins
+        of the whole genome for every page that has CDSs on it, as data_api has no way to read some of
+        them, so leave it off for large genomes.
+        :param params: instance of type "GetCombinedDataPageParams" (*
+           Retrieve a page of get_combined_data results. The sections are
+           chosen with the same flags as for * get_combined_data, except that
+           protein_by_cds_id is only returned when include_protein_by_cds_id
+           * is set. page_size is the maximum number of features in a page
+           (default 1000). cursor is the * next_cursor returned with the
+           previous page; leave it out to get the first page.) -> structure:
+           parameter "ref" of type "ObjectReference", parameter
+           "exclude_genes" of type "boolean" (A boolean - 0 for false, 1 for
+           true. @range (0, 1)), parameter "include_mrnas" of type "boolean"
+           (A boolean - 0 for false, 1 for true. @range (0, 1)), parameter
+           "exclude_cdss" of type "boolean" (A boolean - 0 for false, 1 for
+           true. @range (0, 1)), parameter "include_features_by_type" of list
+           of String, parameter "include_protein_by_cds_id" of type "boolean"
+           (A boolean - 0 for false, 1 for true. @range (0, 1)), parameter
+           "include_mrna_ids_by_gene_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "exclude_cds_ids_by_gene_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_cds_id_by_mrna_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_exons_by_mrna_id" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter
+           "include_utr_by_utr_type_by_mrna_id" of type "boolean" (A boolean
+           - 0 for false, 1 for true. @range (0, 1)), parameter
+           "exclude_summary" of type "boolean" (A boolean - 0 for false, 1
+           for true. @range (0, 1)), parameter "included_feature_fields" of
+           list of String, parameter "page_size" of Long, parameter "cursor"
+           of String
+        :returns: instance of type "CombinedDataPage" (* A page of
+           get_combined_data results. Features are ordered by type and then
+           by id, and every * relation and protein appears on the page of the
+           feature it is keyed by. feature_types and * summary are only
+           returned on the first page. total_features is the number of
+           features over all * pages. next_cursor is missing on the last
+           page.) -> structure: parameter "data" of type
+           "GenomeAnnotation_data" (gene_id is a feature id of a gene
+           feature. mrna_id is a feature id of a mrna feature. cds_id is a
+           feature id of a cds feature.) -> structure: parameter "gene_type"
+           of String, parameter "mrna_type" of String, parameter "cds_type"
+           of String, parameter "feature_types" of list of String, parameter
+           "feature_by_id_by_type" of mapping from String to mapping from
+           String to type "Feature_data", parameter "protein_by_cds_id" of
+           mapping from String to type "Protein_data", parameter
+           "mrna_ids_by_gene_id" of mapping from String to list of String,
+           parameter "cds_ids_by_gene_id" of mapping from String to list of
+           String, parameter "cds_id_by_mrna_id" of mapping from String to
+           String, parameter "exons_by_mrna_id" of mapping from String to
+           list of type "Exon_data", parameter "utr_by_utr_type_by_mrna_id"
+           of mapping from String to mapping from String to type "UTR_data",
+           parameter "summary" of type "Summary_data", parameter
+           "total_features" of Long, parameter "next_cursor" of String
+        """
+        # ctx is the context object
+        # return variables are: returnVal
+        #BEGIN get_combined_data_page
+        page_size = int(params.get('page_size', self._combined_data_page_size))
+        if page_size < 1:
+            raise ValueError('page_size must be at least 1')
+        page_size = min(page_size, self._combined_data_max_page_size)
         gene_type = 'gene'
         mrna_type = 'mRNA'
         cds_type = 'CDS'
-        load_features_by_type = None
-        if 'include_features_by_type' in params:
-            load_features_by_type = set(params['include_features_by_type'])
-        else:
-            load_features_by_type = set([gene_type, cds_type])
-        if exclude_genes and gene_type in load_features_by_type:
-            load_features_by_type.remove(gene_type)
-        if include_mrnas:
-            load_features_by_type.add(mrna_type)
-        if exclude_cdss and cds_type in load_features_by_type:
-            load_features_by_type.remove(cds_type)
-        load_protein_by_cds_id = not ('exclude_protein_by_cds_id' in params and params['exclude_protein_by_cds_id'] == 1)
-        load_mrna_ids_by_gene_id = 'include_mrna_ids_by_gene_id' in params and params['include_mrna_ids_by_gene_id'] == 1
-        load_cds_ids_by_gene_id = not ('exclude_cds_ids_by_gene_id' in params and params['exclude_cds_ids_by_gene_id'] == 1)
-        load_cds_id_by_mrna_id = 'include_cds_id_by_mrna_id' in params and params['include_cds_id_by_mrna_id'] == 1
-        load_exons_by_mrna_id = 'include_exons_by_mrna_id' in params and params['include_exons_by_mrna_id'] == 1
-        load_utr_by_utr_type_by_mrna_id = 'include_utr_by_utr_type_by_mrna_id' in params and params['include_utr_by_utr_type_by_mrna_id'] == 1
-        load_summary = not ('exclude_summary' in params and params['exclude_summary'] == 1)
-        ga = GenomeAnnotationAPI_local(self.services, ctx['token'], params['ref'])
+        sections = self._combined_data_sections(params)
+        # data_api can only read the proteins of the whole genome, so they
+        # are opt-in here rather than read again for every page
+        sections['protein_by_cds_id'] = params.get('include_protein_by_cds_id') == 1
+        load_features_by_type = sections['features_by_type']
+        ws = self._workspace(ctx)
+        objects = [{'ref': params['ref']}]
+        offset = 0
+        cursor_types = None
+        if params.get('cursor'):
+            cursor_ref, cursor_types, offset = self._decode_cursor(params['cursor'])
+            objects.append({'ref': cursor_ref})
+        infos = ws.get_object_info_new({'objects': objects})
+        # later pages are read from the version the first page was read from
+        input_obj_info = infos[-1]
+        if infos[0][6] != input_obj_info[6] or infos[0][0] != input_obj_info[0]:
+            raise ValueError('The cursor is not for ' + params['ref'])
+        ref = '{}/{}/{}'.format(input_obj_info[6], input_obj_info[0], input_obj_info[4])
+        is_legacy = input_obj_info[2].split('-')[0] == "KBaseGenomes.Genome"
+
+        # the pages run over every feature that a requested section is keyed by
+        page_types = set(load_features_by_type)
+        if sections['protein_by_cds_id']:
+            page_types.add(cds_type)
+        if not is_legacy:
+            if sections['mrna_ids_by_gene_id'] or sections['cds_ids_by_gene_id']:
+                page_types.add(gene_type)
+            if sections['cds_id_by_mrna_id']:
+                page_types.add(mrna_type)
+        if sections['exons_by_mrna_id'] or sections['utr_by_utr_type_by_mrna_id']:
+            page_types.add(mrna_type)
+        if cursor_types is not None and cursor_types != page_types:
+            raise ValueError('The cursor is for a different selection of sections')
+
+        deadline.check(ctx)
+        ga = self._get_genome_annotation(ctx, ref, input_obj_info)
+        # the ids of a version never change, so they are read and sorted once
+        # rather than for every page. The caller's access to ref was checked
+        # by get_object_info_new above.
+        feature_ids_by_type = self._page_ids_cache.get_or_create(
+            (ref, tuple(sorted(page_types))),
+            lambda: dict((feature_type, sorted(type_ids)) for feature_type, type_ids
+                         in self._get_feature_ids(ga, page_types).items()))
+        total_features = 0
+        page_ids_by_type = {}
+        for feature_type in sorted(page_types):
+            type_ids = feature_ids_by_type.get(feature_type, [])
+            start = max(offset - total_features, 0)
+            end = max(offset + page_size - total_features, 0)
+            page_ids_by_type[feature_type] = type_ids[start:end]
+            total_features += len(type_ids)
         genome_data = {'gene_type': gene_type, 'mrna_type': mrna_type, 'cds_type': cds_type}
-        all_feature_types = ga.get_feature_types()
-        genome_data['feature_types'] = all_feature_types
-        feature_types_to_load = list(load_features_by_type)
-        feature_ids_by_type = ga.get_feature_ids({"type_list": all_feature_types})['by_type']
+        if offset == 0:
+            genome_data['feature_types'] = ga.get_feature_types()
+
         feature_ids = []
-        for feature_type in feature_types_to_load:
-            feature_ids.extend(feature_ids_by_type[feature_type])
-        feature_map = None
-        if len(feature_ids) > 0:
-            feature_map = ga.get_features(feature_ids)
-        else:
-            feature_map = {}
+        for feature_type in load_features_by_type:
+            feature_ids.extend(page_ids_by_type[feature_type])
+        deadline.check(ctx)
+        feature_map = {}
+        if feature_ids:
+            feature_map = self._get_features(ctx, ref, input_obj_info, feature_ids,
+                                             sections['feature_fields'], ga=ga)
         feature_by_id_by_type = {}
-        for feature_type in feature_types_to_load:
-            id_to_feature = {}
-            for feature_id in feature_ids_by_type[feature_type]:
-                feature_data = feature_map[feature_id]
-                if 'feature_quality_score' in feature_data:
-                    fq_score = feature_data['feature_quality_score']
-                    if fq_score is not None and not isinstance(fq_score, list):
-                        if isinstance(fq_score, basestring):
-                            feature_data['feature_quality_score'] = [fq_score]
-                        else:
-                            feature_data['feature_quality_score'] = [str(fq_score)]
-                id_to_feature[feature_id] = feature_data
-            feature_by_id_by_type[feature_type] = id_to_feature
+        for feature_type in load_features_by_type:
+            feature_by_id_by_type[feature_type] = dict(
+                (feature_id, self._fix_feature_quality_score(feature_map[feature_id]))
+                for feature_id in page_ids_by_type[feature_type])
         genome_data['feature_by_id_by_type'] = feature_by_id_by_type
-        if load_protein_by_cds_id:
-            genome_data['protein_by_cds_id'] = ga.get_proteins()
-        if load_mrna_ids_by_gene_id:
-            if is_legacy:
-                genome_data['mrna_ids_by_gene_id'] = {}
-            else:
-                genome_data['mrna_ids_by_gene_id'] = ga.get_mrna_by_gene(feature_ids_by_type[gene_type])
-        if load_cds_ids_by_gene_id:
-            if is_legacy:
-                genome_data['cds_ids_by_gene_id'] = {}
-            else:
-                genome_data['cds_ids_by_gene_id'] = ga.get_cds_by_gene(feature_ids_by_type[gene_type])
-        if load_cds_id_by_mrna_id:
-            if is_legacy:
-                genome_data['cds_id_by_mrna_id'] = {}
-            else:
-                genome_data['cds_id_by_mrna_id'] = ga.get_cds_by_mrna()
-        if load_exons_by_mrna_id:
-            genome_data['exons_by_mrna_id'] = ga.get_mrna_exons()
-        if load_utr_by_utr_type_by_mrna_id:
-            genome_data['utr_by_utr_type_by_mrna_id'] = ga.get_mrna_utrs()
-        if load_summary:
-            if is_legacy:
-                genome = ws.get_objects2({'objects': [{'ref': params['ref'], 'included': [
-                    "/scientific_name", "/tax_id", "/contig_ids", "/dna_size", "/gc_content",
-                    "/genetic_code", "/num_contigs", "/source", "/source_id", "/domain",
-                    "/taxonomy"]}]})['data'][0]['data']
-                summary = {}
-                self._migrate_property_internal(genome, summary, 'scientific_name')
-                self._migrate_property_internal(genome, summary, 'tax_id', 'taxonomy_id')
-                self._migrate_property_internal(genome, summary, 'contig_ids')
-                self._migrate_property_internal(genome, summary, 'dna_size')
-                self._migrate_property_internal(genome, summary, 'gc_content')
-                self._migrate_property_internal(genome, summary, 'genetic_code')
-                self._migrate_property_internal(genome, summary, 'num_contigs')
-                self._migrate_property_internal(genome, summary, 'source', 'assembly_source')
-                self._migrate_property_internal(genome, summary, 'source_id', 'assembly_source_id')
-                self._migrate_property_internal(genome, summary, 'domain', 'kingdom')
-                feature_type_counts = {}
-                for feature_type in feature_ids_by_type:
-                    feature_type_counts[feature_type] = len(feature_ids_by_type[feature_type])
-                summary['feature_type_counts'] = feature_type_counts
-                if 'taxonomy' in genome and genome['taxonomy'] is not None:
-                    summary['scientific_lineage'] = [x.strip() for x in genome["taxonomy"].split(";")]
-                genome_data['summary'] = summary
+
+        gene_ids = page_ids_by_type.get(gene_type)
+        mrna_ids = page_ids_by_type.get(mrna_type)
+        cds_ids = page_ids_by_type.get(cds_type)
+        deadline.check(ctx)
+        if sections['protein_by_cds_id']:
+            protein_by_cds_id = {}
+            if cds_ids:
+                proteins = ga.get_proteins()
+                for cds_id in cds_ids:
+                    if cds_id in proteins:
+                        protein_by_cds_id[cds_id] = proteins[cds_id]
+            genome_data['protein_by_cds_id'] = protein_by_cds_id
+        # the data_api methods below return every relation for an empty list
+        # of ids, so they are only called when the page has ids to look up
+        for section, load, ids, relation in [
+                ('mrna_ids_by_gene_id', ga.get_mrna_by_gene, gene_ids, True),
+                ('cds_ids_by_gene_id', ga.get_cds_by_gene, gene_ids, True),
+                ('cds_id_by_mrna_id', ga.get_cds_by_mrna, mrna_ids, True),
+                ('exons_by_mrna_id', ga.get_mrna_exons, mrna_ids, False),
+                ('utr_by_utr_type_by_mrna_id', ga.get_mrna_utrs, mrna_ids, False)]:
+            if not sections[section]:
+                continue
+            deadline.check(ctx)
+            # the legacy Genome type has no relations between features
+            if ids and not (is_legacy and relation):
+                genome_data[section] = load(ids)
             else:
-                summary = ga.get_summary()
-                if 'taxonomy' in summary:
-                    taxonomy = summary['taxonomy']
-                    self._migrate_property_internal(taxonomy, summary, 'scientific_name')
-                    self._migrate_property_internal(taxonomy, summary, 'taxonomy_id')
-                    self._migrate_property_internal(taxonomy, summary, 'kingdom')
-                    self._migrate_property_internal(taxonomy, summary, 'scientific_lineage')
-                    self._migrate_property_internal(taxonomy, summary, 'genetic_code')
-                    self._migrate_property_internal(taxonomy, summary, 'organism_aliases')
-                    del summary['taxonomy']
-                if 'assembly' in summary:
-                    assembly = summary['assembly']
-                    self._migrate_property_internal(assembly, summary, 'assembly_source')
-                    self._migrate_property_internal(assembly, summary, 'assembly_source_id')
-                    self._migrate_property_internal(assembly, summary, 'assembly_source_date')
-                    self._migrate_property_internal(assembly, summary, 'gc_content')
-                    self._migrate_property_internal(assembly, summary, 'dna_size')
-                    self._migrate_property_internal(assembly, summary, 'num_contigs')
-                    self._migrate_property_internal(assembly, summary, 'contig_ids')
-                    del summary['assembly']
-                if 'annotation' in summary:
-                    annotation = summary['annotation']
-                    self._migrate_property_internal(annotation, summary, 'external_source')
-                    self._migrate_property_internal(annotation, summary, 'external_source_date')
-                    self._migrate_property_internal(annotation, summary, 'release')
-                    self._migrate_property_internal(annotation, summary, 'original_source_filename')
-                    self._migrate_property_internal(annotation, summary, 'feature_type_counts')
-                    del summary['annotation']
-                genome_data['summary'] = summary
-        returnVal = genome_data
-        #END get_combined_data
+                genome_data[section] = {}
+        if sections['summary'] and offset == 0:
+            genome_data['summary'] = self._convert_summary(
+                self._fetch_summary(ws, ref, ga, is_legacy), is_legacy,
+                ga.get_feature_type_counts() if is_legacy else None)
+
+        returnVal = {'data': genome_data, 'total_features': total_features}
+        next_offset = offset + page_size
+        if next_offset < total_features:
+            returnVal['next_cursor'] = self._encode_cursor(ref, page_types, next_offset)
+        #END get_combined_data_page
 
         # At some point might do deeper type checking...
         if not isinstance(returnVal, dict):
-            raise ValueError('Method get_combined_data return value ' +
+            raise ValueError('Method get_combined_data_page return value ' +
                              'returnVal is not type dict as required.')
         # return the results
         return [returnVal]
@@ -1402,7 +1909,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: data
         #BEGIN get_genome_v1
-        ws = Workspace(self.services['workspace_service_url'], token=ctx['token'])
+        ws = self._workspace(ctx)
         genome_interface_v1 = GenomeInterfaceV1(ws, self.services)
         data = genome_interface_v1.get_genome(ctx, params)
         #END get_genome_v1
@@ -1754,7 +2261,7 @@ class GenomeAnnotationAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN save_one_genome_v1
-        ws = Workspace(self.services['workspace_service_url'], token=ctx['token'])
+        ws = self._workspace(ctx)
         genome_interface_v1 = GenomeInterfaceV1(ws, self.services)
         result = genome_interface_v1.save_one_genome(ctx, params)
         #END save_one_genome_v1
@@ -1,11 +1,23 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from wsgiref.simple_server import make_server
+# Originally generated by the KBase type compiler, now maintained by hand -
+# do not regenerate with kb-sdk compile (see README.md)
+from wsgiref.simple_server import make_server, WSGIServer
+from SocketServer import ThreadingMixIn
 import sys
+import signal
+import errno
 import json
 import traceback
 import datetime
+import time
+import threading
+import itertools
+import zlib
+import tempfile
+from decimal import Decimal
 from multiprocessing import Process
+from multiprocessing.pool import ThreadPool
 from getopt import getopt, GetoptError
 from jsonrpcbase import JSONRPCService, InvalidParamsError, KeywordError,\
     JSONRPCError, InvalidRequestError
@@ -17,6 +29,29 @@ import requests as _requests
 import random as _random
 import os
 from GenomeAnnotationAPI.authclient import KBaseAuth as _KBaseAuth
+from GenomeAnnotationAPI.authclient import FileTokenStore, RedisTokenStore
+from GenomeAnnotationAPI import jsoncodec
+from GenomeAnnotationAPI import metrics as _metrics
+from GenomeAnnotationAPI.profiler import CallProfiler
+from GenomeAnnotationAPI.asynclog import AsyncLog, BackgroundWriter
+from GenomeAnnotationAPI import admission
+from GenomeAnnotationAPI import deadline
+from GenomeAnnotationAPI.jsoncodec import JSONObjectEncoder  # noqa @UnusedImport @IgnorePep8
+
+# An incremental JSON parser for large request bodies. Only the C based ijson
+# backends are used; the pure Python one is too slow for genome sized bodies.
+try:
+    import ijson.backends.yajl2_c as _ijson
+except ImportError:
+    try:
+        import ijson.backends.yajl2_cffi as _ijson
+    except ImportError:
+        try:
+            import ijson.backends.yajl2 as _ijson
+        except Exception:
+            _ijson = None
+if _ijson is not None:
+    from ijson.common import JSONError as _IJSONError
 
 DEPLOY = 'KB_DEPLOYMENT_CONFIG'
 SERVICE = 'KB_SERVICE_NAME'
@@ -45,24 +80,87 @@ def get_config():
 
 config = get_config()
 
+# The JSON implementation used for request bodies and responses; see
+# jsoncodec.get_codec for the accepted json_codec values.
+_codec = jsoncodec.get_codec(config.get('json_codec', 'auto') if config
+                             else 'auto')
+
 from GenomeAnnotationAPI.GenomeAnnotationAPIImpl import GenomeAnnotationAPI  # noqa @IgnorePep8
 impl_GenomeAnnotationAPI = GenomeAnnotationAPI(config)
 
 
-class JSONObjectEncoder(json.JSONEncoder):
+class ServerBusyError(JSONRPCError):
+    """A call was turned away because too many calls of its method are
+    running."""
 
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        if isinstance(obj, frozenset):
-            return list(obj)
-        if hasattr(obj, 'toJSONable'):
-            return obj.toJSONable()
-        return json.JSONEncoder.default(self, obj)
+    code = -32001
+    message = 'Server busy'
+
+    def __init__(self, method, retry_after):
+        JSONRPCError.__init__(self)
+        self.retry_after = retry_after
+        self.data = ('Too many concurrent calls to {}, retry after {} ' +
+                     'seconds').format(method, retry_after)
 
 
 class JSONRPCServiceCustom(JSONRPCService):
 
+    def __init__(self, batch_workers=1, profiler=None, limiters=None,
+                 retry_after=5):
+        """
+        Arguments:
+        batch_workers -- the maximum number of requests from one batch that
+            are run concurrently. 1 runs batches sequentially.
+        profiler -- a CallProfiler for method calls that ask to be profiled
+            or are sampled, or None to disable profiling.
+        limiters -- a mapping of method names to admission.MethodLimiters
+            that cap how many calls of the method run at once.
+        retry_after -- the number of seconds busy callers are told to wait
+            before retrying.
+        """
+        JSONRPCService.__init__(self)
+        if batch_workers < 1:
+            raise ValueError('batch_workers must be at least 1')
+        self._batch_workers = batch_workers
+        self._profiler = profiler
+        self._limiters = limiters or {}
+        self._retry_after = retry_after
+        self._batch_pool = None
+        self._batch_pool_pid = None
+        self._batch_pool_lock = threading.Lock()
+
+    def _get_batch_pool(self):
+        # created lazily and per process so uwsgi workers forked after import
+        # don't inherit a pool whose threads only exist in the master
+        with self._batch_pool_lock:
+            if self._batch_pool_pid != os.getpid():
+                self._batch_pool = ThreadPool(self._batch_workers)
+                self._batch_pool_pid = os.getpid()
+            return self._batch_pool
+
+    def _handle_batch(self, ctxs, requests):
+        """
+        Handles the requests of a batch, each with its own context and
+        concurrently if configured. Returns a (response, error, trace) tuple
+        per request in request order; error is the exception a failed
+        request raised and is None for those that succeeded.
+        """
+        if self._batch_workers == 1 or len(requests) == 1:
+            return [self._try_request(ctx_, request_)
+                    for ctx_, request_ in zip(ctxs, requests)]
+        pool = self._get_batch_pool()
+        pending = [pool.apply_async(self._try_request, (ctx_, request_))
+                   for ctx_, request_ in zip(ctxs, requests)]
+        return [result.get() for result in pending]
+
+    def _try_request(self, ctx, request):
+        try:
+            return self._handle_request(ctx, request), None, None
+        except JSONRPCError as e:
+            return None, e, getattr(e, 'trace', None)
+        except Exception as e:
+            return None, e, traceback.format_exc()
+
     def call(self, ctx, jsondata):
         """
         Calls jsonrpc service's method and returns its return value in a JSON
@@ -73,10 +171,38 @@ class JSONRPCServiceCustom(JSONRPCService):
         """
         result = self.call_py(ctx, jsondata)
         if result is not None:
-            return json.dumps(result, cls=JSONObjectEncoder)
+            return _codec.dumps(result)
 
         return None
 
+    def call_iter(self, ctx, jsondata, chunk_size=64 * 1024):
+        """
+        Calls jsonrpc service's method and returns its return value as an
+        iterator over JSON string chunks of roughly chunk_size characters, or
+        None if there is none.
+
+        The method is run before this returns, so errors are raised here as
+        with call(); only the encoding is deferred to the iteration.
+        """
+        result = self.call_py(ctx, jsondata)
+        if result is not None:
+            return self._iterencode(result, chunk_size)
+
+        return None
+
+    def _iterencode(self, result, chunk_size):
+        chunk = []
+        chunk_len = 0
+        for piece in _codec.iterencode(result):
+            chunk.append(piece)
+            chunk_len += len(piece)
+            if chunk_len >= chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+                chunk_len = 0
+        if chunk:
+            yield ''.join(chunk)
+
     def _call_method(self, ctx, request):
         """Calls given method with given params and returns it value."""
         method = self.method_data[request['method']]['method']
@@ -158,8 +284,10 @@ class JSONRPCServiceCustom(JSONRPCService):
                 self._fill_request(request_, rdata_)
                 requests.append(request_)
 
-            for request_ in requests:
-                respond = self._handle_request(ctx, request_)
+            results = self._handle_batch([ctx] * len(requests), requests)
+            for respond, error, _ in results:
+                if error is not None:
+                    raise error
                 # Don't respond to notifications
                 if respond is not None:
                     responds.append(respond)
@@ -173,12 +301,36 @@ class JSONRPCServiceCustom(JSONRPCService):
             # empty dict, list or wrong type
             raise InvalidRequestError
 
+    def _check_deadline(self, ctx):
+        try:
+            deadline.check(ctx)
+        except deadline.DeadlineExceeded as e:
+            # don't start work the caller has stopped waiting for
+            err = JSONServerError()
+            err.data = str(e)
+            raise err
+
     def _handle_request(self, ctx, request):
         """Handles given request and returns its response."""
         if self.method_data[request['method']].has_key('types'):  # noqa @IgnorePep8
             self._validate_params_types(request['method'], request['params'])
 
-        result = self._call_method(ctx, request)
+        limiter = self._limiters.get(request['method'])
+        # calls don't wait in the queue past their deadline
+        if limiter is not None and \
+                not limiter.acquire(deadline.remaining(ctx)):
+            self._check_deadline(ctx)
+            raise ServerBusyError(request['method'], self._retry_after)
+        try:
+            self._check_deadline(ctx)
+            if self._profiler is not None and self._profiler.wanted(ctx):
+                result = self._profiler.run(ctx, request['method'],
+                                            self._call_method, ctx, request)
+            else:
+                result = self._call_method(ctx, request)
+        finally:
+            if limiter is not None:
+                limiter.release()
 
         # Do not respond to notifications.
         if request['id'] is None:
@@ -204,6 +356,7 @@ class MethodContext(dict):
         self['call_id'] = None
         self['rpc_context'] = None
         self['provenance'] = None
+        self['deadline'] = None
         self._debug_levels = set([7, 8, 9, 'DEBUG', 'DEBUG2', 'DEBUG3'])
         self._logger = logger
 
@@ -308,6 +461,106 @@ def getIPAddress(environ):
     return environ.get('REMOTE_ADDR')
 
 
+def build_json_object(events):
+    '''
+    Builds the object described by an ijson basic_parse event stream.
+    Non-integer numbers are returned as floats, as json.loads would.
+    '''
+    root = []
+    containers = [root.append]
+    keys = []
+    for event, value in events:
+        if event == 'map_key':
+            keys[-1] = value
+        elif event == 'start_map':
+            new_map = {}
+            containers[-1](new_map)
+            keys.append(None)
+
+            def setter(value, new_map=new_map, depth=len(keys) - 1):
+                new_map[keys[depth]] = value
+            containers.append(setter)
+        elif event == 'start_array':
+            new_array = []
+            containers[-1](new_array)
+            containers.append(new_array.append)
+        elif event == 'end_map':
+            keys.pop()
+            containers.pop()
+        elif event == 'end_array':
+            containers.pop()
+        else:
+            if isinstance(value, Decimal):
+                value = float(value)
+            containers[-1](value)
+    if len(root) != 1:
+        raise ValueError('No JSON object could be decoded')
+    return root[0]
+
+
+def get_accepted_encoding(environ):
+    '''
+    Returns 'gzip' or 'deflate' if the client's Accept-Encoding header allows
+    one of them, preferring gzip, or None.
+    '''
+    header = environ.get('HTTP_ACCEPT_ENCODING')
+    if not header:
+        return None
+    qvalues = {}
+    for item in header.split(','):
+        parts = item.split(';')
+        q = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        qvalues[parts[0].strip().lower()] = q
+    for encoding in ('gzip', 'deflate'):
+        if qvalues.get(encoding, qvalues.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _MeteredStream(object):
+    '''
+    A streamed response body that calls finish(response_size, error) once,
+    when the server has sent it all or closes it. WSGI servers close the
+    body even if they never iterate it, so the call is never missed.
+    '''
+
+    def __init__(self, chunks, finish):
+        self._chunks = chunks
+        self._finish = finish
+        self._size = 0
+        self._error = False
+        self._finished = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._chunks:
+                self._size += len(chunk)
+                yield chunk
+        except Exception:
+            self._error = True
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        if self._finished:
+            return
+        self._finished = True
+        try:
+            close = getattr(self._chunks, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._finish(self._size, self._error)
+
+
 class Application(object):
     # Wrap the wsgi handler in a class definition so that we can
     # do some initialization and avoid regenerating stuff over
@@ -323,15 +576,53 @@ class Application(object):
 
     def __init__(self):
         submod = get_service_name() or 'GenomeAnnotationAPI'
-        self.userlog = log.log(
+        # Log messages are written by a background thread from a queue of
+        # log_queue_size messages, so log I/O never delays a request. Only
+        # a log_info_sample_rate fraction of calls log their start and end.
+        log_queue_size = 10000
+        info_sample_rate = 1.0
+        if config is not None:
+            log_queue_size = int(config.get('log_queue_size', log_queue_size))
+            info_sample_rate = float(config.get('log_info_sample_rate',
+                                                info_sample_rate))
+        self.log_writer = BackgroundWriter(
+            log_queue_size, lambda count: self.serverlog.report_drops(count))
+        self.userlog = AsyncLog(log.log(
             submod, ip_address=True, authuser=True, module=True, method=True,
             call_id=True, changecallback=self.logcallback,
-            config=get_config_file())
-        self.serverlog = log.log(
+            config=get_config_file()), self.log_writer)
+        self.serverlog = AsyncLog(log.log(
             submod, ip_address=True, authuser=True, module=True, method=True,
-            call_id=True, logfile=self.userlog.get_log_file())
+            call_id=True, logfile=self.userlog.get_log_file()),
+            self.log_writer, info_sample_rate, ('start method', 'end method'))
         self.serverlog.set_log_level(6)
-        self.rpc_service = JSONRPCServiceCustom()
+        batch_workers = int(config.get('batch_max_workers', 1)) if config \
+            else 1
+        # Method calls are profiled into profile_dir when the request has an
+        # X-KBase-Profile header or a true 'profile' key in its context, and
+        # a profile_sample_rate fraction of all calls are profiled anyway.
+        profiler = None
+        if config is not None and config.get('profiling_enabled') == 'true':
+            profiler = CallProfiler(
+                config.get('profile_dir') or
+                os.path.join(config.get('scratch') or tempfile.gettempdir(),
+                             'profiles'),
+                float(config.get('profile_sample_rate', 0)),
+                int(config.get('profile_top_n', 30)))
+        self.profiling_enabled = profiler is not None
+        # Calls of the methods in concurrency_limits beyond their limit wait
+        # up to concurrency_queue_timeout seconds, or until their deadline, in
+        # a bounded queue, then are turned away with a 503 and a Retry-After
+        # header, or a deadline error if the deadline passed.
+        limiters = None
+        retry_after = 5
+        if config is not None:
+            limiters = admission.parse_limits(
+                config.get('concurrency_limits', ''),
+                float(config.get('concurrency_queue_timeout', 30)))
+            retry_after = int(config.get('concurrency_retry_after', 5))
+        self.rpc_service = JSONRPCServiceCustom(batch_workers, profiler,
+                                                limiters, retry_after)
         self.method_authentication = dict()
         self.rpc_service.add(impl_GenomeAnnotationAPI.get_taxon,
                              name='GenomeAnnotationAPI.get_taxon',
@@ -433,6 +724,10 @@ class Application(object):
                              name='GenomeAnnotationAPI.get_combined_data',
                              types=[dict])
         self.method_authentication['GenomeAnnotationAPI.get_combined_data'] = 'required'  # noqa
+        self.rpc_service.add(impl_GenomeAnnotationAPI.get_combined_data_page,
+                             name='GenomeAnnotationAPI.get_combined_data_page',
+                             types=[dict])
+        self.method_authentication['GenomeAnnotationAPI.get_combined_data_page'] = 'required'  # noqa
         self.rpc_service.add(impl_GenomeAnnotationAPI.get_genome_v1,
                              name='GenomeAnnotationAPI.get_genome_v1',
                              types=[dict])
@@ -445,121 +740,526 @@ class Application(object):
                              name='GenomeAnnotationAPI.status',
                              types=[dict])
         authurl = config.get(AUTH) if config else None
-        self.auth_client = _KBaseAuth(authurl)
+        if config is not None:
+            self.auth_client = _KBaseAuth(
+                authurl, int(config.get('auth_wait_timeout', 60)),
+                int(config.get('token_cache_size', 2000)),
+                int(config.get('token_cache_ttl', 300)),
+                int(config.get('token_reject_cache_size', 1000)),
+                int(config.get('token_reject_cache_ttl', 10)),
+                self._get_token_store(),
+                timeout=(float(config.get('auth_connect_timeout', 10)),
+                         float(config.get('auth_read_timeout', 60))),
+                connect_retries=int(config.get('auth_connect_retries', 3)))
+        else:
+            self.auth_client = _KBaseAuth(authurl)
+        # Encode results incrementally and send them without a content-length
+        # so the WSGI server uses chunked transfer encoding. This avoids
+        # holding both the result and its full JSON string in memory.
+        self.stream_responses = config is not None and \
+            config.get('stream_responses') == 'true'
+        self.stream_chunk_size = int(config.get('stream_chunk_size',
+                                                64 * 1024)) if config \
+            else 64 * 1024
+        # Responses of at least compression_min_size bytes are gzip or
+        # deflate compressed for clients that accept it. Unset disables
+        # compression.
+        self.compression_min_size = None
+        self.compression_level = 6
+        if config is not None and config.get('compression_min_size'):
+            self.compression_min_size = int(config['compression_min_size'])
+            self.compression_level = int(config.get('compression_level', 6))
+        # Request bodies of at least large_request_size bytes are staged to
+        # the scratch directory and parsed from there, incrementally when
+        # ijson is installed, instead of being held in memory as a string.
+        self.large_request_size = 16 * 1024 * 1024
+        self.scratch = None
+        if config is not None:
+            self.large_request_size = int(config.get('large_request_size',
+                                                     self.large_request_size))
+            self.scratch = config.get('scratch')
+        # Requests may send the number of seconds they will wait for a
+        # response, which becomes ctx['deadline']. max_request_time caps it,
+        # and applies to requests that send none.
+        self.max_request_time = None
+        if config is not None and config.get('max_request_time'):
+            self.max_request_time = float(config['max_request_time'])
+        # Per-method request metrics, served on metrics_path in the
+        # Prometheus text format. Workers sharing metrics_dir report totals
+        # across all of them.
+        self.metrics_path = None
+        self.metrics = None
+        if config is not None and config.get('metrics_path'):
+            self.metrics_path = config['metrics_path']
+            self.metrics = _metrics.MethodMetrics(
+                'genomeannotationapi', config.get('metrics_dir') or None,
+                int(config.get('metrics_flush_interval', 5)))
+
+    def warm_up(self):
+        '''
+        Loads dependencies and the genomes listed in warmup_refs before the
+        first request. warmup_token, or KB_AUTH_TOKEN, is used to read the
+        genomes.
+        '''
+        refs = [ref.strip() for ref in config.get('warmup_refs', '').split(',')
+                if ref.strip()]
+        token = config.get('warmup_token') or os.environ.get('KB_AUTH_TOKEN')
+        user = None
+        if refs and token:
+            try:
+                user = self.auth_client.get_user(token)
+            except Exception:
+                self.serverlog.log_message(
+                    log.ERR, 'Warm-up token validation failed, skipping ' +
+                    'warmup_refs: ' + traceback.format_exc())
+                refs = []
+        elif refs:
+            self.serverlog.log_message(
+                log.ERR, 'No warmup_token is set, skipping warmup_refs')
+            refs = []
+        impl_GenomeAnnotationAPI.warm_up(refs, token, user)
+
+    def _get_token_store(self):
+        '''
+        Returns the store that shares validated tokens between workers, set
+        by token_cache_backend: 'memory' (none), 'file' or 'redis'.
+        '''
+        backend = config.get('token_cache_backend', 'memory')
+        if backend == 'memory':
+            return None
+        if backend == 'file':
+            return FileTokenStore(
+                config.get('token_cache_dir') or
+                os.path.join(config.get('scratch') or tempfile.gettempdir(),
+                             'token_cache'))
+        if backend == 'redis':
+            return RedisTokenStore(config['redis_host'], config['redis_port'])
+        raise ValueError('Unknown token cache backend: ' + backend)
+
+    def _read_request(self, environ, body_size):
+        '''
+        Reads and parses the request body. The raw body is not referenced
+        once this returns, so it can be freed before the method runs.
+        '''
+        if body_size < self.large_request_size:
+            return _codec.loads(environ['wsgi.input'].read(body_size))
+        scratch = self.scratch
+        if scratch and not os.path.isdir(scratch):
+            scratch = None
+        with tempfile.TemporaryFile(dir=scratch, prefix='request_') as staged:
+            remaining = body_size
+            while remaining > 0:
+                block = environ['wsgi.input'].read(min(remaining, 1 << 20))
+                if not block:
+                    break
+                staged.write(block)
+                remaining -= len(block)
+            staged.seek(0)
+            if _ijson is None:
+                return _codec.loads(staged.read())
+            try:
+                return build_json_object(_ijson.basic_parse(staged))
+            except _IJSONError as e:
+                raise ValueError(str(e))
+
+    def _get_deadline(self, environ, req, started):
+        '''
+        Returns the time by which the caller needs a response: started plus
+        the seconds in the X-KBase-Timeout header or the 'timeout' key of the
+        request context, capped to max_request_time. None if there's none.
+        '''
+        timeouts = []
+        rpc_context = req.get('context')
+        for timeout in (environ.get('HTTP_X_KBASE_TIMEOUT'),
+                        rpc_context.get('timeout')
+                        if isinstance(rpc_context, dict) else None):
+            try:
+                if timeout is not None and float(timeout) > 0:
+                    timeouts.append(float(timeout))
+            except (TypeError, ValueError):
+                pass
+        if self.max_request_time is not None:
+            timeouts.append(self.max_request_time)
+        if not timeouts:
+            return None
+        return started + min(timeouts)
+
+    def _set_context(self, ctx, environ, req, started):
+        '''Fills in the parts of ctx that come from the request req.'''
+        ctx['module'], ctx['method'] = req['method'].split('.')
+        ctx['call_id'] = req.get('id')
+        ctx['deadline'] = self._get_deadline(environ, req, started)
+        if self.profiling_enabled:
+            rpc_context = req.get('context')
+            ctx['profile'] = environ.get(
+                'HTTP_X_KBASE_PROFILE', '').lower() in \
+                ('1', 'true', 'yes') or \
+                (isinstance(rpc_context, dict) and
+                 bool(rpc_context.get('profile')))
+        ctx['rpc_context'] = {
+            'call_stack': [{'time': self.now_in_utc(),
+                            'method': req['method']}
+                           ]
+        }
+        prov_action = {'service': ctx['module'],
+                       'method': ctx['method'],
+                       'method_params': req.get('params')
+                       }
+        ctx['provenance'] = [prov_action]
+
+    def _authenticate(self, ctx, method_name, token, get_user):
+        '''
+        Checks the authentication requirement of method_name and, when a
+        token is needed, validates it with get_user and adds the user to
+        ctx. Raises a JSONServerError if the call may not go ahead.
+        '''
+        auth_req = self.method_authentication.get(method_name, 'none')
+        if auth_req == 'none':
+            return
+        if token is None:
+            if auth_req == 'required':
+                err = JSONServerError()
+                err.data = ('Authentication required for ' +
+                            'GenomeAnnotationAPI ' +
+                            'but no authentication header was passed')
+                raise err
+            return
+        try:
+            user = get_user(token)
+            ctx['user_id'] = user
+            ctx['authenticated'] = 1
+            ctx['token'] = token
+        except Exception, e:
+            if auth_req == 'required':
+                err = JSONServerError()
+                err.data = "Token validation failed: %s" % e
+                raise err
+
+    def _call_batch(self, environ, ctx, reqs, started):
+        '''
+        Runs the JSON-RPC batch reqs and returns the status and response
+        body. The Authorization header is validated once for the whole
+        batch, and each element runs with its own copy of ctx with its own
+        method, provenance and deadline. An element that fails gets an error
+        response in its place; the other elements still run. Notifications
+        get no response, and the body is None if there is nothing to send.
+        '''
+        if not reqs:
+            err = {'error': {'code': -32600,
+                             'name': 'Invalid Request',
+                             'message': 'Empty batch',
+                             }
+                   }
+            return ('500 Internal Server Error',
+                    self.process_error(err, ctx, {'version': '1.1'}))
+        if (environ.get('HTTP_X_FORWARDED_FOR')):
+            self.log(log.INFO, ctx, 'X-Forwarded-For: ' +
+                     environ.get('HTTP_X_FORWARDED_FOR'))
+        token = environ.get('HTTP_AUTHORIZATION')
+        users = {}
+
+        def get_user(token):
+            if token not in users:
+                try:
+                    users[token] = (self.auth_client.get_user(token), None)
+                except Exception as e:
+                    users[token] = (None, e)
+            user, error = users[token]
+            if error is not None:
+                raise error
+            return user
+
+        service = self.rpc_service
+        responds = [None] * len(reqs)
+        ctxs = []
+        requests = []
+        positions = []
+        for i, rdata in enumerate(reqs):
+            request = service._get_default_vals()
+            ctx_ = MethodContext(self.userlog)
+            ctx_['client_ip'] = ctx['client_ip']
+            try:
+                service._fill_request(request, rdata)
+                self._set_context(ctx_, environ, rdata, started)
+                self._authenticate(ctx_, request['method'], token, get_user)
+            except JSONRPCError as jre:
+                responds[i] = self._batch_error(
+                    jre, getattr(jre, 'trace', None), ctx_, request, rdata)
+                continue
+            self.log(log.INFO, ctx_, 'start method')
+            ctxs.append(ctx_)
+            requests.append(request)
+            positions.append(i)
+        results = service._handle_batch(ctxs, requests) if requests else []
+        for i, ctx_, request, (respond, error, trace) in zip(
+                positions, ctxs, requests, results):
+            if error is None:
+                self.log(log.INFO, ctx_, 'end method')
+                responds[i] = respond
+            else:
+                responds[i] = self._batch_error(error, trace, ctx_, request,
+                                                reqs[i])
+        responds = [respond for respond in responds if respond is not None]
+        if not responds:
+            return '200 OK', None
+        if self.stream_responses:
+            return '200 OK', service._iterencode(responds,
+                                                 self.stream_chunk_size)
+        return '200 OK', _codec.dumps(responds)
+
+    def _batch_error(self, error, trace, ctx, request, rdata):
+        # like jsonrpcbase, errors of notifications are only sent when the
+        # notification itself was invalid
+        if request['id'] is None and not isinstance(error,
+                                                    InvalidRequestError):
+            return None
+        if isinstance(error, JSONRPCError):
+            err = {'error': {'code': error.code,
+                             'name': error.message,
+                             'message': error.data
+                             }
+                   }
+        else:
+            err = {'error': {'code': 0,
+                             'name': 'Unexpected Server Error',
+                             'message': 'An unexpected server error ' +
+                                        'occurred',
+                             }
+                   }
+        return self._error_response(err, ctx,
+                                    rdata if isinstance(rdata, dict) else {},
+                                    trace)
+
+    def _serve_metrics(self, start_response):
+        body = self.metrics.render()
+        start_response('200 OK', [('content-type', _metrics.CONTENT_TYPE),
+                                  ('content-length', str(len(body)))])
+        return [body]
 
     def __call__(self, environ, start_response):
+        if (self.metrics is not None and
+                environ['REQUEST_METHOD'] == 'GET' and
+                environ.get('PATH_INFO') == self.metrics_path):
+            return self._serve_metrics(start_response)
+        started = time.time()
         # Context object, equivalent to the perl impl CallContext
         ctx = MethodContext(self.userlog)
         ctx['client_ip'] = getIPAddress(environ)
         status = '500 Internal Server Error'
+        metric_method = None
+        retry_after = None
 
         try:
             body_size = int(environ.get('CONTENT_LENGTH', 0))
         except (ValueError):
             body_size = 0
-        if environ['REQUEST_METHOD'] == 'OPTIONS':
-            # we basically do nothing and just return headers
-            status = '200 OK'
-            rpc_result = ""
-        else:
-            request_body = environ['wsgi.input'].read(body_size)
-            try:
-                req = json.loads(request_body)
-            except ValueError as ve:
-                err = {'error': {'code': -32700,
-                                 'name': "Parse error",
-                                 'message': str(ve),
-                                 }
-                       }
-                rpc_result = self.process_error(err, ctx, {'version': '1.1'})
+        # the request stays counted as in flight until it is recorded, so
+        # it must be recorded however the handling below ends
+        recorded = False
+        try:
+            if environ['REQUEST_METHOD'] == 'OPTIONS':
+                # we basically do nothing and just return headers
+                status = '200 OK'
+                rpc_result = ""
             else:
-                ctx['module'], ctx['method'] = req['method'].split('.')
-                ctx['call_id'] = req['id']
-                ctx['rpc_context'] = {
-                    'call_stack': [{'time': self.now_in_utc(),
-                                    'method': req['method']}
-                                   ]
-                }
-                prov_action = {'service': ctx['module'],
-                               'method': ctx['method'],
-                               'method_params': req['params']
-                               }
-                ctx['provenance'] = [prov_action]
                 try:
-                    token = environ.get('HTTP_AUTHORIZATION')
-                    # parse out the method being requested and check if it
-                    # has an authentication requirement
-                    method_name = req['method']
-                    auth_req = self.method_authentication.get(
-                        method_name, 'none')
-                    if auth_req != 'none':
-                        if token is None and auth_req == 'required':
-                            err = JSONServerError()
-                            err.data = (
-                                'Authentication required for ' +
-                                'GenomeAnnotationAPI ' +
-                                'but no authentication header was passed')
-                            raise err
-                        elif token is None and auth_req == 'optional':
-                            pass
-                        else:
-                            try:
-                                user = self.auth_client.get_user(token)
-                                ctx['user_id'] = user
-                                ctx['authenticated'] = 1
-                                ctx['token'] = token
-                            except Exception, e:
-                                if auth_req == 'required':
-                                    err = JSONServerError()
-                                    err.data = \
-                                        "Token validation failed: %s" % e
-                                    raise err
-                    if (environ.get('HTTP_X_FORWARDED_FOR')):
-                        self.log(log.INFO, ctx, 'X-Forwarded-For: ' +
-                                 environ.get('HTTP_X_FORWARDED_FOR'))
-                    self.log(log.INFO, ctx, 'start method')
-                    rpc_result = self.rpc_service.call(ctx, req)
-                    self.log(log.INFO, ctx, 'end method')
-                    status = '200 OK'
-                except JSONRPCError as jre:
-                    err = {'error': {'code': jre.code,
-                                     'name': jre.message,
-                                     'message': jre.data
+                    req = self._read_request(environ, body_size)
+                except ValueError as ve:
+                    err = {'error': {'code': -32700,
+                                     'name': "Parse error",
+                                     'message': str(ve),
                                      }
                            }
-                    trace = jre.trace if hasattr(jre, 'trace') else None
-                    rpc_result = self.process_error(err, ctx, req, trace)
-                except Exception:
-                    err = {'error': {'code': 0,
-                                     'name': 'Unexpected Server Error',
-                                     'message': 'An unexpected server error ' +
-                                                'occurred',
-                                     }
-                           }
-                    rpc_result = self.process_error(err, ctx, req,
-                                                    traceback.format_exc())
-
-        # print 'Request method was %s\n' % environ['REQUEST_METHOD']
-        # print 'Environment dictionary is:\n%s\n' % pprint.pformat(environ)
-        # print 'Request body was: %s' % request_body
-        # print 'Result from the method call is:\n%s\n' % \
-        #    pprint.pformat(rpc_result)
-
-        if rpc_result:
-            response_body = rpc_result
-        else:
-            response_body = ''
-
-        response_headers = [
-            ('Access-Control-Allow-Origin', '*'),
-            ('Access-Control-Allow-Headers', environ.get(
-                'HTTP_ACCESS_CONTROL_REQUEST_HEADERS', 'authorization')),
-            ('content-type', 'application/json'),
-            ('content-length', str(len(response_body)))]
+                    rpc_result = self.process_error(err, ctx,
+                                                    {'version': '1.1'})
+                    req = None
+                else:
+                    if self.metrics is not None:
+                        metric_method = self._metric_method(req)
+                        self.metrics.start(metric_method)
+                if isinstance(req, list):
+                    status, rpc_result = self._call_batch(environ, ctx, req,
+                                                          started)
+                elif req is not None:
+                    self._set_context(ctx, environ, req, started)
+                    try:
+                        self._authenticate(ctx, req['method'],
+                                           environ.get('HTTP_AUTHORIZATION'),
+                                           self.auth_client.get_user)
+                        if (environ.get('HTTP_X_FORWARDED_FOR')):
+                            self.log(log.INFO, ctx, 'X-Forwarded-For: ' +
+                                     environ.get('HTTP_X_FORWARDED_FOR'))
+                        self.log(log.INFO, ctx, 'start method')
+                        if self.stream_responses:
+                            rpc_result = self.rpc_service.call_iter(
+                                ctx, req, self.stream_chunk_size)
+                        else:
+                            rpc_result = self.rpc_service.call(ctx, req)
+                        self.log(log.INFO, ctx, 'end method')
+                        status = '200 OK'
+                    except JSONRPCError as jre:
+                        if isinstance(jre, ServerBusyError):
+                            status = '503 Service Unavailable'
+                            retry_after = jre.retry_after
+                        err = {'error': {'code': jre.code,
+                                         'name': jre.message,
+                                         'message': jre.data
+                                         }
+                               }
+                        trace = jre.trace if hasattr(jre, 'trace') else None
+                        rpc_result = self.process_error(err, ctx, req, trace)
+                    except Exception:
+                        err = {'error': {'code': 0,
+                                         'name': 'Unexpected Server Error',
+                                         'message': 'An unexpected server ' +
+                                                    'error occurred',
+                                         }
+                               }
+                        rpc_result = self.process_error(err, ctx, req,
+                                                        traceback.format_exc())
+
+            # print 'Request method was %s\n' % environ['REQUEST_METHOD']
+            # print 'Environment dictionary is:\n%s\n' % \
+            #     pprint.pformat(environ)
+            # print 'Request body was: %s' % request_body
+            # print 'Result from the method call is:\n%s\n' % \
+            #    pprint.pformat(rpc_result)
+
+            if rpc_result:
+                response_body = rpc_result
+            else:
+                response_body = ''
+
+            response_headers = [
+                ('Access-Control-Allow-Origin', '*'),
+                ('Access-Control-Allow-Headers', environ.get(
+                    'HTTP_ACCESS_CONTROL_REQUEST_HEADERS', 'authorization')),
+                ('content-type', 'application/json')]
+            if retry_after is not None:
+                response_headers.append(('Retry-After', str(retry_after)))
+            encoding = None
+            if self.compression_min_size is not None:
+                response_headers.append(('Vary', 'Accept-Encoding'))
+                encoding = get_accepted_encoding(environ)
+                if encoding and not isinstance(response_body, basestring):
+                    try:
+                        response_body = self._buffer_stream(
+                            response_body, self.compression_min_size)
+                    except Exception:
+                        err = {'error': {'code': 0,
+                                         'name': 'Unexpected Server Error',
+                                         'message': 'An unexpected server ' +
+                                                    'error occurred',
+                                         }
+                               }
+                        status = '500 Internal Server Error'
+                        response_body = self.process_error(
+                            err, ctx, req, traceback.format_exc())
+            if isinstance(response_body, basestring):
+                if encoding and \
+                        len(response_body) >= self.compression_min_size:
+                    response_body = ''.join(self._compress([response_body],
+                                                           encoding))
+                    response_headers.append(('Content-Encoding', encoding))
+                response_headers.append(
+                    ('content-length', str(len(response_body))))
+                response_body = [response_body]
+            else:
+                if encoding:
+                    response_body = self._compress(response_body, encoding)
+                    response_headers.append(('Content-Encoding', encoding))
+                response_body = self._log_stream_errors(response_body, ctx)
+            if self.metrics is not None and \
+                    environ['REQUEST_METHOD'] != 'OPTIONS':
+                if metric_method is None:
+                    # the body could not be parsed
+                    metric_method = 'unknown'
+                    self.metrics.start(metric_method)
+                response_body = self._record_metrics(
+                    response_body, metric_method, started, body_size,
+                    status != '200 OK')
+            recorded = True
+        finally:
+            if not recorded and metric_method is not None:
+                self._finish_metrics(metric_method, started, body_size, 0,
+                                     True)
         start_response(status, response_headers)
-        return [response_body]
+        return response_body
+
+    def _metric_method(self, req):
+        # only registered methods get their own series, so clients cannot
+        # create an unbounded number of them
+        if isinstance(req, list):
+            return 'batch'
+        method = req.get('method') if isinstance(req, dict) else None
+        if isinstance(method, basestring) and \
+                method in self.rpc_service.method_data:
+            return method
+        return 'unknown'
+
+    def _record_metrics(self, response_body, method, started, request_size,
+                        error):
+        if isinstance(response_body, list):
+            self._finish_metrics(method, started, request_size,
+                                 sum(len(b) for b in response_body), error)
+            return response_body
+        # recorded when the server finishes or closes the stream, so the
+        # latency covers sending the whole response
+        return _MeteredStream(
+            response_body,
+            lambda response_size, failed: self._finish_metrics(
+                method, started, request_size, response_size,
+                error or failed))
+
+    def _finish_metrics(self, method, started, request_size, response_size,
+                        error):
+        self.metrics.finish(method, time.time() - started, request_size,
+                            response_size, error)
+
+    def _buffer_stream(self, chunks, min_size):
+        '''
+        Reads chunks until min_size characters are buffered. Returns the
+        whole body as a string if the stream ended first, otherwise an
+        iterator over the buffered and remaining chunks.
+        '''
+        chunks = iter(chunks)
+        buffered = []
+        size = 0
+        for chunk in chunks:
+            buffered.append(chunk)
+            size += len(chunk)
+            if size >= min_size:
+                return itertools.chain(buffered, chunks)
+        return ''.join(buffered)
+
+    def _compress(self, chunks, encoding):
+        if encoding == 'gzip':
+            compressor = zlib.compressobj(self.compression_level,
+                                          zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            compressor = zlib.compressobj(self.compression_level)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def _log_stream_errors(self, chunks, ctx):
+        # once streaming has started the status is sent, so an encoding
+        # failure can only be logged and the connection dropped
+        try:
+            for chunk in chunks:
+                yield chunk
+        except Exception:
+            self.log(log.ERR, ctx, 'error streaming response: ' +
+                     traceback.format_exc())
+            raise
 
     def process_error(self, error, context, request, trace=None):
+        return _codec.dumps(self._error_response(error, context, request,
+                                                 trace))
+
+    def _error_response(self, error, context, request, trace=None):
         if trace:
             self.log(log.ERR, context, trace.split('\n')[0:-1])
         if 'id' in request:
@@ -575,7 +1275,7 @@ class Application(object):
         else:
             error['version'] = '1.0'
             error['error']['error'] = trace
-        return json.dumps(error)
+        return error
 
     def now_in_utc(self):
         # noqa Taken from http://stackoverflow.com/questions/3401428/how-to-get-an-isoformat-datetime-string-including-the-default-timezone @IgnorePep8
@@ -617,29 +1317,168 @@ except ImportError:
     # Not available outside of wsgi, ignore
     pass
 
+# Under uwsgi this runs in the master before it forks the workers, so they
+# start with everything already loaded
+if config is not None and config.get('warmup') == 'true':
+    application.warm_up()
+
 _proc = None
 
 
-def start_server(host='localhost', port=0, newprocess=False):
+SERVER_MODES = ('single', 'threaded', 'prefork')
+
+
+class PreforkWSGIServer(WSGIServer):
+    # many processes accept from the one listening socket
+    request_queue_size = 128
+
+
+class ThreadPoolWSGIServer(ThreadingMixIn, WSGIServer):
+    '''
+    A WSGIServer that handles requests on a fixed size pool of threads.
+    Closing the server waits for the requests in progress to finish.
+    '''
+    request_queue_size = 128
+    workers = 4
+    _pool = None
+
+    def process_request(self, request, client_address):
+        if self._pool is None:
+            self._pool = ThreadPool(self.workers)
+        self._pool.apply_async(self.process_request_thread,
+                               (request, client_address))
+
+    def server_close(self):
+        WSGIServer.server_close(self)
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+def _set_stop_handler(handler):
+    try:
+        signal.signal(signal.SIGTERM, handler)
+        signal.signal(signal.SIGINT, handler)
+    except ValueError:
+        # not the main thread; the caller has to stop the server itself
+        pass
+
+
+def _serve(httpd):
+    '''
+    Serves until SIGTERM or SIGINT, then stops accepting connections and
+    finishes the requests in progress.
+    '''
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever() to return, which can't happen
+        # while the signal handler runs in its thread
+        threading.Thread(target=httpd.shutdown).start()
+    _set_stop_handler(stop)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def _serve_prefork(httpd, workers):
+    '''
+    Forks workers processes that accept connections from the listening
+    socket of httpd, replacing any that die. On SIGTERM or SIGINT the
+    workers are asked to shut down gracefully and waited for.
+    '''
+    children = {}
+    stopping = []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve(httpd)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.time()
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    _set_stop_handler(stop)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except OSError as e:
+            if e.errno == errno.EINTR:
+                continue
+            if e.errno == errno.ECHILD:
+                break
+            raise
+        started = children.pop(pid, None)
+        if started is not None and not stopping:
+            print "Worker %s exited, starting a new one" % pid
+            if time.time() - started < 1:
+                # don't spin if workers die on startup
+                time.sleep(1)
+            spawn()
+    httpd.server_close()
+
+
+def start_server(host='localhost', port=0, newprocess=False, mode=None,
+                 workers=None):
     '''
     By default, will start the server on localhost on a system assigned port
     in the main thread. Excecution of the main thread will stay in the server
     main loop until interrupted. To run the server in a separate process, and
     thus allow the stop_server method to be called, set newprocess = True. This
-    will also allow returning of the port number.'''
+    will also allow returning of the port number.
+
+    mode selects how requests are served: 'single' handles one request at a
+    time, 'threaded' handles up to workers requests at once on a thread pool
+    and 'prefork' runs workers processes. The server_mode and server_workers
+    config values are used if they are not given. SIGTERM and SIGINT (and so
+    stop_server) let the requests in progress finish before exiting.'''
 
     global _proc
     if _proc:
         raise RuntimeError('server is already running')
-    httpd = make_server(host, port, application)
+    if mode is None:
+        mode = config.get('server_mode', 'single') if config else 'single'
+    if workers is None:
+        workers = int(config.get('server_workers', 4)) if config else 4
+    if mode not in SERVER_MODES:
+        raise ValueError('Unknown server mode: ' + str(mode))
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    if mode == 'threaded':
+        httpd = make_server(host, port, application, ThreadPoolWSGIServer)
+        httpd.workers = workers
+    elif mode == 'prefork':
+        httpd = make_server(host, port, application, PreforkWSGIServer)
+    else:
+        httpd = make_server(host, port, application)
     port = httpd.server_address[1]
     print "Listening on port %s" % port
+    if mode == 'prefork':
+        target, args = _serve_prefork, (httpd, workers)
+    else:
+        target, args = _serve, (httpd,)
     if newprocess:
-        _proc = Process(target=httpd.serve_forever)
+        _proc = Process(target=target, args=args)
         _proc.daemon = True
         _proc.start()
+        # the child process owns the listening socket now
+        httpd.socket.close()
     else:
-        httpd.serve_forever()
+        target(*args)
     return port
 
 
@@ -649,17 +1488,30 @@ def stop_server():
     _proc = None
 
 
-def process_async_cli(input_file_path, output_file_path, token):
-    exit_code = 0
-    with open(input_file_path) as data_file:
-        req = json.load(data_file)
+def _read_cli_requests(data):
+    """
+    Parses the input of the async CLI: a single request object, a JSON array
+    of requests or one request object per line. Returns the requests and
+    the input format, 'single', 'array' or 'lines'.
+    """
+    try:
+        reqs = _codec.loads(data)
+    except ValueError:
+        reqs = [_codec.loads(line) for line in data.splitlines()
+                if line.strip()]
+        return reqs, 'lines'
+    if isinstance(reqs, list):
+        return reqs, 'array'
+    return [reqs], 'single'
+
+
+def _process_cli_request(req, user, token):
     if 'version' not in req:
         req['version'] = '1.1'
     if 'id' not in req:
         req['id'] = str(_random.random())[2:]
     ctx = MethodContext(application.userlog)
     if token:
-        user = application.auth_client.get_user(token)
         ctx['user_id'] = user
         ctx['authenticated'] = 1
         ctx['token'] = token
@@ -691,10 +1543,68 @@ def process_async_cli(input_file_path, output_file_path, token):
                           'message': 'An unexpected server error occurred',
                           'error': trace}
                 }
-    if 'error' in resp:
-        exit_code = 500
-    with open(output_file_path, "w") as f:
-        f.write(json.dumps(resp, cls=JSONObjectEncoder))
+    return resp
+
+
+def _process_cli_batch_item(args):
+    req, user, token = args
+    try:
+        return _process_cli_request(req, user, token)
+    except Exception:
+        # a malformed entry fails on its own instead of the whole batch
+        return {'id': req.get('id') if isinstance(req, dict) else None,
+                'version': '1.1',
+                'error': {'code': -32600,
+                          'name': 'Invalid Request',
+                          'message': 'The request could not be processed',
+                          'error': traceback.format_exc()}
+                }
+
+
+def process_async_cli(input_file_path, output_file_path, token):
+    """
+    Runs the requests in the input file and writes their responses to the
+    output file. A file with a JSON array or JSON lines of requests is run
+    on async_cli_workers threads, and the responses are written in the same
+    format and in input order as they complete. Returns 500 if any request
+    failed, otherwise 0.
+    """
+    exit_code = 0
+    with open(input_file_path) as data_file:
+        reqs, input_format = _read_cli_requests(data_file.read())
+    user = None
+    if token:
+        user = application.auth_client.get_user(token)
+    if input_format == 'single':
+        resp = _process_cli_request(reqs[0], user, token)
+        if 'error' in resp:
+            exit_code = 500
+        with open(output_file_path, "w") as f:
+            f.write(_codec.dumps(resp))
+        return exit_code
+    workers = int(config.get('async_cli_workers', 4)) if config else 1
+    pool = ThreadPool(max(1, min(workers, len(reqs))))
+    try:
+        with open(output_file_path, "w") as f:
+            if input_format == 'array':
+                f.write('[')
+            resps = pool.imap(_process_cli_batch_item,
+                              [(req, user, token) for req in reqs])
+            for i, resp in enumerate(resps):
+                if resp is not None and 'error' in resp:
+                    exit_code = 500
+                if input_format == 'array':
+                    if i:
+                        f.write(',\n')
+                    f.write(_codec.dumps(resp))
+                else:
+                    f.write(_codec.dumps(resp) + '\n')
+                f.flush()
+            if input_format == 'array':
+                f.write(']')
+    finally:
+        pool.close()
+        pool.join()
     return exit_code
 
 if __name__ == "__main__":
@@ -709,23 +1619,30 @@ if __name__ == "__main__":
                 token = sys.argv[3]
         sys.exit(process_async_cli(sys.argv[1], sys.argv[2], token))
     try:
-        opts, args = getopt(sys.argv[1:], "", ["port=", "host="])
+        opts, args = getopt(sys.argv[1:], "",
+                            ["port=", "host=", "mode=", "workers="])
     except GetoptError as err:
         # print help information and exit:
         print str(err)  # will print something like "option -a not recognized"
         sys.exit(2)
     port = 9999
     host = 'localhost'
+    mode = None
+    workers = None
     for o, a in opts:
         if o == '--port':
             port = int(a)
         elif o == '--host':
             host = a
             print "Host set to %s" % host
+        elif o == '--mode':
+            mode = a
+        elif o == '--workers':
+            workers = int(a)
         else:
             assert False, "unhandled option"
 
-    start_server(host=host, port=port)
+    start_server(host=host, port=port, mode=mode, workers=workers)
 #    print "Listening on port %s" % port
 #    httpd = make_server( host, port, application)
 #
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class GenomeAnnotationCache(object):
+    '''
+    A bounded, thread safe LRU cache of data_api GenomeAnnotationAPI objects.
+
+    Building a GenomeAnnotationAPI object resolves the object type and info
+    before any real work is done, so UIs fanning out many calls against one
+    genome pay that setup cost once per call. Entries are keyed by the
+    caller (typically a versioned reference plus a hash of the caller's
+    token) and expire after ttl seconds. A maxsize of 0 disables caching.
+    '''
+
+    def __init__(self, maxsize=50, ttl=300):
+        if maxsize < 0:
+            raise ValueError('maxsize must be non-negative')
+        if ttl <= 0:
+            raise ValueError('ttl must be positive')
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry is None:
+                return None
+            value, intime = entry
+            if time.time() - intime > self._ttl:
+                return None
+            # re-insert to mark as most recently used
+            self._cache[key] = entry
+            return value
+
+    def put(self, key, value):
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (value, time.time())
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        '''
+        Returns the cached value for key, calling factory() to build and cache
+        it on a miss. The factory is called outside the lock, so concurrent
+        misses on the same key may each build a value; the last one wins.
+        '''
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
@@ -1,11 +1,14 @@
 import requests
 import json
-from requests_toolbelt.multipart.encoder import MultipartEncoder
 
-from biokbase.workspace.client import Workspace
-from biokbase.AbstractHandle.Client import AbstractHandle as HandleService  # @UnresolvedImport @IgnorePep8
-from biokbase.AbstractHandle.Client import ServerError as HandleError  # @UnresolvedImport @IgnorePep8
-from AssemblySequenceAPI.AssemblySequenceAPIServiceClient import AssemblySequenceAPI
+from GenomeAnnotationAPI import deadline
+
+# The handle service, assembly sequence and multipart upload clients are only
+# needed when saving genomes, so they are imported when first used to keep
+# server startup fast.
+LAZY_IMPORTS = ('requests_toolbelt.multipart.encoder',
+                'biokbase.AbstractHandle.Client',
+                'AssemblySequenceAPI.AssemblySequenceAPIServiceClient')
 
 from pprint import pprint
 
@@ -280,7 +283,9 @@ class GenomeInterfaceV1:
             if not ('dna_sequence' in feature and feature['dna_sequence']):
                 features_to_work[feature['id']] = feature['location']
         if len(features_to_work) > 0:
-            aseq = AssemblySequenceAPI(self.sw_url, token=ctx['token'])
+            from AssemblySequenceAPI.AssemblySequenceAPIServiceClient import AssemblySequenceAPI
+            aseq = AssemblySequenceAPI(self.sw_url, token=ctx['token'],
+                                       timeout=deadline.timeout(ctx, 30 * 60))
             get_dna_params = {'requested_features': features_to_work}
             if 'assembly_ref' in genome:
                 get_dna_params['assembly_ref'] = genome['assembly_ref']
@@ -301,7 +306,9 @@ class GenomeInterfaceV1:
             return
         token = ctx['token']
         handle_id = genome[handle_property]
-        hs = HandleService(self.handle_url, token=token)
+        from biokbase.AbstractHandle.Client import AbstractHandle as HandleService  # @UnresolvedImport @IgnorePep8
+        hs = HandleService(self.handle_url, token=token,
+                           timeout=deadline.timeout(ctx, 30 * 60))
         handles = hs.hids_to_handles([handle_id])
         shock_id = handles[0]['id']
 
@@ -309,14 +316,16 @@ class GenomeInterfaceV1:
         header = {'Authorization': 'Oauth {}'.format(token)}
         res = requests.get(self.shock_url + '/node/' + shock_id +
                            '/acl/?verbosity=full',
-                           headers=header, allow_redirects=True)
+                           headers=header, allow_redirects=True,
+                           timeout=deadline.timeout(ctx))
         self.check_shock_response(
             res, 'Error getting ACLs for Shock node {}: '.format(shock_id))
         owner = res.json()['data']['owner']['username']
         if owner != ctx['user_id']:
             shock_id = self.copy_shock_node(ctx, shock_id)
             r = requests.get(self.shock_url + '/node/' + shock_id,
-                             headers=header, allow_redirects=True)
+                             headers=header, allow_redirects=True,
+                             timeout=deadline.timeout(ctx))
             errtxt = ('Error downloading attributes from shock ' +
                       'node {}: ').format(shock_id)
             self.check_shock_response(r, errtxt)
@@ -339,12 +348,14 @@ class GenomeInterfaceV1:
         source_id = shock_id
         if not source_id:
             raise ValueError('Must provide shock ID')
+        from requests_toolbelt.multipart.encoder import MultipartEncoder
         mpdata = MultipartEncoder(fields={'copy_data': source_id})
         header['Content-Type'] = mpdata.content_type
         response = requests.post(
             # copy_attributes only works in 0.9.13+
             self.shock_url + '/node?copy_indexes=1',
-            headers=header, data=mpdata, allow_redirects=True)
+            headers=header, data=mpdata, allow_redirects=True,
+            timeout=deadline.timeout(ctx))
         self.check_shock_response(
             response, ('Error copying Shock node {}: '
                        ).format(source_id))
@@ -352,7 +363,8 @@ class GenomeInterfaceV1:
         shock_id = shock_data['id']
         del header['Content-Type']
         r = requests.get(self.shock_url + '/node/' + source_id,
-                         headers=header, allow_redirects=True)
+                         headers=header, allow_redirects=True,
+                         timeout=deadline.timeout(ctx))
         errtxt = ('Error downloading attributes from shock ' +
                   'node {}: ').format(shock_id)
         self.check_shock_response(r, errtxt)
@@ -362,7 +374,8 @@ class GenomeInterfaceV1:
                                     json.dumps(attribs).encode('UTF-8'))}
             response = requests.put(
                 self.shock_url + '/node/' + shock_id, headers=header,
-                files=files, allow_redirects=True)
+                files=files, allow_redirects=True,
+                timeout=deadline.timeout(ctx))
             self.check_shock_response(
                 response, ('Error setting attributes on Shock node {}: '
                            ).format(shock_id))
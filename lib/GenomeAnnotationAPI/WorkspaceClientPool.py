@@ -0,0 +1,114 @@
+import os
+import threading
+import Queue
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from GenomeAnnotationAPI.baseclient import BaseClient as _BaseClient
+
+
+class SessionPool(object):
+    '''
+    A per-process pool of keep-alive requests sessions.
+
+    Each session is used by one caller at a time and returned to the pool
+    afterwards, so connections (and their TLS handshakes) are reused across
+    requests. The pool is rebuilt lazily after a fork, so sessions created in
+    a uwsgi master are never shared with the workers. Exposes a post method
+    so it can stand in for the requests module in BaseClient.
+    '''
+
+    def __init__(self, size=10, checkout_timeout=60):
+        if size < 1:
+            raise ValueError('Session pool size must be at least 1')
+        self._size = size
+        self._checkout_timeout = checkout_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._sessions = None
+        self._created = 0
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _checkout(self):
+        with self._lock:
+            pid = os.getpid()
+            if self._pid != pid:
+                self._pid = pid
+                self._sessions = Queue.LifoQueue()
+                self._created = 0
+            sessions = self._sessions
+            try:
+                return sessions.get_nowait()
+            except Queue.Empty:
+                if self._created < self._size:
+                    self._created += 1
+                    return self._new_session()
+        try:
+            return sessions.get(timeout=self._checkout_timeout)
+        except Queue.Empty:
+            raise RuntimeError('Timed out waiting for a free workspace ' +
+                               'connection; consider raising ' +
+                               'workspace_pool_size')
+
+    def _checkin(self, session):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._sessions.put(session)
+                return
+        session.close()
+
+    def post(self, url, **kwargs):
+        session = self._checkout()
+        try:
+            return session.post(url, **kwargs)
+        finally:
+            self._checkin(session)
+
+
+class PooledWorkspace(object):
+    '''
+    The subset of the biokbase.workspace.client.Workspace API used by this
+    module, sending calls through a shared SessionPool with the token of a
+    single request.
+    '''
+
+    def __init__(self, url, token, session_pool, timeout=30 * 60):
+        self._service_ver = None
+        self._client = _BaseClient(url, timeout=timeout, token=token,
+                                   session=session_pool)
+
+    def get_objects2(self, params, context=None):
+        return self._client.call_method(
+            'Workspace.get_objects2',
+            [params], self._service_ver, context)
+
+    def get_object_info_new(self, params, context=None):
+        return self._client.call_method(
+            'Workspace.get_object_info_new',
+            [params], self._service_ver, context)
+
+    def save_objects(self, params, context=None):
+        return self._client.call_method(
+            'Workspace.save_objects',
+            [params], self._service_ver, context)
+
+
+class WorkspaceClientPool(object):
+    '''
+    Hands out workspace clients for individual requests that share one
+    per-process pool of persistent HTTP sessions.
+    '''
+
+    def __init__(self, url, size=10):
+        self.url = url
+        self._sessions = SessionPool(size)
+
+    def get_client(self, token, timeout=30 * 60):
+        return PooledWorkspace(self.url, token, self._sessions, timeout)
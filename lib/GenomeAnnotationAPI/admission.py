@@ -0,0 +1,91 @@
+'''
+Admission control for method calls.
+
+Each limited method may run at most max_concurrent calls at once in a
+process. Further calls wait in a bounded queue, and calls beyond that, or
+that wait too long, are turned away so the caller can retry later. Methods
+without a limit are never held up, so cheap calls are not starved by heavy
+ones.
+'''
+import threading
+import time
+
+
+class MethodLimiter(object):
+    '''
+    Limits the concurrent calls of one method.
+
+    max_concurrent - the number of calls that may run at once.
+    max_queued - the number of calls that may wait for a free slot.
+    queue_timeout - the maximum number of seconds a call waits.
+    '''
+
+    def __init__(self, max_concurrent, max_queued=0, queue_timeout=30):
+        if max_concurrent < 1:
+            raise ValueError('max_concurrent must be at least 1')
+        if max_queued < 0:
+            raise ValueError('max_queued must be non-negative')
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def acquire(self, max_wait=None):
+        '''
+        Takes a slot, waiting in the queue if needed. max_wait, typically the
+        time left before the request deadline, shortens the wait below
+        queue_timeout. Returns False if the call was turned away.
+        '''
+        timeout = self.queue_timeout
+        if max_wait is not None:
+            timeout = min(timeout, max_wait)
+        with self._cond:
+            if self.running < self.max_concurrent:
+                self.running += 1
+                return True
+            if self.waiting >= self.max_queued:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.time() + timeout
+                while self.running >= self.max_concurrent:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._cond.wait(remaining)
+                self.running += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.running -= 1
+            self._cond.notify()
+
+
+def parse_limits(spec, queue_timeout=30):
+    '''
+    Parses a comma separated list of method:max_concurrent:max_queued
+    entries, for example
+    "GenomeAnnotationAPI.get_combined_data:2:8, GenomeAnnotationAPI.get_genome_v1:4:16",
+    into a mapping of method names to MethodLimiters. max_queued may be
+    left out, in which case no calls wait.
+    '''
+    limiters = {}
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        parts = entry.split(':')
+        if len(parts) not in (2, 3):
+            raise ValueError('Invalid concurrency limit: ' + entry)
+        max_queued = int(parts[2]) if len(parts) == 3 else 0
+        limiters[parts[0].strip()] = MethodLimiter(
+            int(parts[1]), max_queued, queue_timeout)
+    return limiters
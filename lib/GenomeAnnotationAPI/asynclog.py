@@ -0,0 +1,185 @@
+'''
+Log writing off the request path.
+
+Log calls put their work on a bounded in-memory queue that a background
+thread drains, so slow log files or syslog never delay a request. When the
+queue is full messages are dropped and counted rather than blocking, and
+the writer reports how many were lost once it catches up.
+'''
+import atexit
+import logging
+import os
+import Queue
+import random
+import sys
+import threading
+import time
+import traceback
+import zlib
+
+# biokbase.log levels
+_INFO = 6
+_WARNING = 4
+
+
+class BackgroundWriter(object):
+    '''
+    Runs submitted calls in order on a daemon thread.
+
+    maxsize - the maximum number of pending calls; further calls are
+        dropped until the writer catches up.
+    report_drops - called on the writer thread with the number of calls
+        dropped since the last report, or None.
+    '''
+
+    def __init__(self, maxsize=10000, report_drops=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self._maxsize = maxsize
+        self._report_drops = report_drops
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self.dropped = 0
+        self._reported = 0
+
+    def _get_queue(self):
+        # the thread is started lazily and per process, since threads don't
+        # survive a fork into uwsgi workers
+        pid = os.getpid()
+        with self._lock:
+            if self._pid != pid:
+                self._queue = Queue.Queue(self._maxsize)
+                writer = threading.Thread(target=self._run,
+                                          args=(self._queue,),
+                                          name='log-writer')
+                writer.daemon = True
+                writer.start()
+                if self._pid is None:
+                    atexit.register(self.flush, 5)
+                self._pid = pid
+            return self._queue
+
+    def submit(self, func, *args):
+        '''Queues func(*args). Returns False if it was dropped.'''
+        try:
+            self._get_queue().put_nowait((func, args))
+        except Queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _run(self, queue):
+        while True:
+            func, args = queue.get()
+            try:
+                func(*args)
+                if self.dropped != self._reported and self._report_drops:
+                    dropped = self.dropped
+                    self._report_drops(dropped - self._reported)
+                    self._reported = dropped
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    def flush(self, timeout=None):
+        '''
+        Waits until the calls queued by this process have run. Returns False
+        if they had not after timeout seconds.
+        '''
+        with self._lock:
+            if self._pid != os.getpid():
+                return True
+            queue = self._queue
+        deadline = None if timeout is None else time.time() + timeout
+        with queue.all_tasks_done:
+            while queue.unfinished_tasks:
+                if deadline is None:
+                    queue.all_tasks_done.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                queue.all_tasks_done.wait(remaining)
+        return True
+
+
+class AsyncLog(object):
+    '''
+    Wraps a biokbase.log.log object so that log_message only queues the
+    message for a BackgroundWriter. Other attributes are passed through to
+    the wrapped log.
+
+    info_sample_rate - the fraction of calls whose info level
+        sampled_messages are logged. Sampling is by call id, so a call
+        either logs all of these messages or none of them.
+    '''
+
+    def __init__(self, logger, writer, info_sample_rate=1.0,
+                 sampled_messages=()):
+        if not 0 <= info_sample_rate <= 1:
+            raise ValueError('info_sample_rate must be between 0 and 1')
+        self._logger = logger
+        self._writer = writer
+        self._sample_rate = info_sample_rate
+        self._sampled_messages = frozenset(sampled_messages)
+        self.sampled_out = 0
+
+    def _keep(self, call_id):
+        if call_id is None:
+            return random.random() < self._sample_rate
+        bucket = zlib.crc32(str(call_id)) & 0xffffffff
+        return bucket < self._sample_rate * 2 ** 32
+
+    def log_message(self, level, message, ip_address=None, authuser=None,
+                    module=None, method=None, call_id=None):
+        if (self._sample_rate < 1 and level == _INFO and
+                message in self._sampled_messages and
+                not self._keep(call_id)):
+            self.sampled_out += 1
+            return
+        self._writer.submit(self._logger.log_message, level, message,
+                            ip_address, authuser, module, method, call_id)
+
+    def report_drops(self, count):
+        '''Logs that count messages were dropped. For BackgroundWriter.'''
+        self._logger.log_message(
+            _WARNING, 'Dropped {} log messages because the log queue was full'
+            .format(count))
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+
+class QueueLogHandler(logging.Handler):
+    '''
+    A logging handler that passes records to another handler on a
+    background thread.
+    '''
+
+    def __init__(self, target, maxsize=10000):
+        logging.Handler.__init__(self)
+        self.target = target
+        self.writer = BackgroundWriter(maxsize, self._report_drops)
+
+    def _report_drops(self, count):
+        self.target.handle(logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            'Dropped %d log records because the log queue was full',
+            (count,), None))
+
+    def emit(self, record):
+        try:
+            # render the message now, as its arguments may change before
+            # the writer gets to it
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info)
+                record.exc_info = None
+            self.writer.submit(self.target.handle, record)
+        except Exception:
+            self.handleError(record)
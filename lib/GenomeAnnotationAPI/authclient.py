@@ -3,37 +3,175 @@ Created on Aug 1, 2016
 
 A very basic KBase auth client for the Python server.
 
+Originally generated by the KBase type compiler, now maintained by hand - do
+not regenerate with kb-sdk compile (see README.md).
+
 @author: gaprice@lbl.gov
 '''
 import time as _time
 import requests as _requests
+from requests.adapters import HTTPAdapter as _HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry as _Retry
 import threading as _threading
 import hashlib
+import errno as _errno
+import os as _os
+import random as _random
+import tempfile as _tempfile
+from collections import OrderedDict
+
+try:
+    import redis as _redis
+except ImportError:
+    _redis = None
+
+
+class FileTokenStore(object):
+    '''
+    Shares validated tokens between the processes on a host through files in
+    a directory, one per token hash.
+
+    Anyone who can write to the directory can plant an entry that maps a
+    token hash to any user, so the directory is created private to the
+    service account, and an existing directory is refused unless it is
+    owned by the service account and not writable by group or others.
+    '''
+
+    def __init__(self, directory):
+        self._dir = directory
+        try:
+            _os.makedirs(directory, 0o700)
+        except OSError as e:
+            if e.errno != _errno.EEXIST:
+                raise
+        st = _os.stat(directory)
+        if st.st_uid != _os.getuid():
+            raise ValueError('Token cache directory {} is not owned by the '
+                             'service user'.format(directory))
+        if st.st_mode & 0o022:
+            raise ValueError('Token cache directory {} is writable by group '
+                             'or others'.format(directory))
+
+    def get(self, key):
+        path = _os.path.join(self._dir, key)
+        try:
+            with open(path) as f:
+                expires, user = f.read().split('\t', 1)
+        except (IOError, ValueError):
+            return None
+        if _time.time() > float(expires):
+            try:
+                _os.remove(path)
+            except OSError:
+                pass
+            return None
+        return user, float(expires)
+
+    def set(self, key, user, expires):
+        fd, tmp = _tempfile.mkstemp(dir=self._dir, prefix='.')
+        with _os.fdopen(fd, 'w') as f:
+            f.write('{!r}\t{}'.format(expires, user))
+        _os.rename(tmp, _os.path.join(self._dir, key))
+        if _random.random() < 0.01:
+            self._remove_expired()
+
+    def _remove_expired(self):
+        for name in _os.listdir(self._dir):
+            if not name.startswith('.'):
+                self.get(name)
+
+
+class RedisTokenStore(object):
+    '''
+    Shares validated tokens between processes and hosts through Redis.
+    Entries are set to expire in Redis along with the token.
+    '''
+
+    def __init__(self, host, port, prefix='GenomeAnnotationAPI:token:'):
+        if _redis is None:
+            raise ValueError('The redis package is required for the ' +
+                             'redis token cache')
+        self._redis = _redis.StrictRedis(host=host, port=int(port))
+        self._prefix = prefix
+
+    def get(self, key):
+        value = self._redis.get(self._prefix + key)
+        if value is None:
+            return None
+        expires, user = value.split('\t', 1)
+        return user, float(expires)
+
+    def set(self, key, user, expires):
+        ttl = int(expires - _time.time())
+        if ttl > 0:
+            self._redis.setex(self._prefix + key, ttl,
+                              '{!r}\t{}'.format(expires, user))
 
 
 class TokenCache(object):
-    ''' A basic cache for tokens. '''
+    '''
+    A thread safe LRU cache for tokens. Entries expire ttl seconds after they
+    are added, and the least recently used entry is evicted when the cache
+    is full. Tokens are only stored as hashes.
 
-    _MAX_TIME_SEC = 5 * 60  # 5 min
+    store - a shared store, such as a FileTokenStore or RedisTokenStore,
+        that is checked when a token isn't cached in this process and is
+        given every added token. Errors from the store are treated as
+        misses.
+    '''
 
-    _lock = _threading.RLock()
+    _MAX_TIME_SEC = 5 * 60  # 5 min
 
-    def __init__(self, maxsize=2000):
-        self._cache = {}
+    def __init__(self, maxsize=2000, ttl=_MAX_TIME_SEC, store=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if ttl <= 0:
+            raise ValueError('ttl must be positive')
+        self._cache = OrderedDict()
         self._maxsize = maxsize
-        self._halfmax = maxsize / 2  # int division to round down
+        self._ttl = ttl
+        self._lock = _threading.Lock()
+        self._store = store
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store_hits = 0
 
     def get_user(self, token):
         token = hashlib.sha256(token).hexdigest()
         with self._lock:
-            usertime = self._cache.get(token)
-        if not usertime:
-            return None
+            usertime = self._cache.pop(token, None)
+            if usertime and _time.time() <= usertime[1]:
+                # re-insert to mark as most recently used
+                self._cache[token] = usertime
+                self.hits += 1
+                return usertime[0]
+        usertime = self._get_stored(token)
+        with self._lock:
+            if not usertime:
+                self.misses += 1
+                return None
+            self.store_hits += 1
+            self._put(token, usertime)
+        return usertime[0]
 
-        user, intime = usertime
-        if _time.time() - intime > self._MAX_TIME_SEC:
+    def _get_stored(self, token):
+        if self._store is None:
             return None
-        return user
+        try:
+            usertime = self._store.get(token)
+        except Exception:
+            return None
+        if usertime and _time.time() <= usertime[1]:
+            return usertime
+        return None
+
+    def _put(self, token, usertime):
+        self._cache.pop(token, None)
+        self._cache[token] = usertime
+        if len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+            self.evictions += 1
 
     def add_valid_token(self, token, user):
         if not token:
@@ -41,15 +179,31 @@ class TokenCache(object):
         if not user:
             raise ValueError('Must supply user')
         token = hashlib.sha256(token).hexdigest()
+        expires = _time.time() + self._ttl
+        with self._lock:
+            self._put(token, (user, expires))
+        if self._store is not None:
+            try:
+                self._store.set(token, user, expires)
+            except Exception:
+                pass
+
+    def __len__(self):
         with self._lock:
-            self._cache[token] = [user, _time.time()]
-            if len(self._cache) > self._maxsize:
-                for i, (t, _) in enumerate(sorted(self._cache.items(),
-                                                  key=lambda (_, v): v[1])):
-                    if i <= self._halfmax:
-                        del self._cache[t]
-                    else:
-                        break
+            return len(self._cache)
+
+
+class InvalidTokenError(ValueError):
+    ''' The auth service rejected a token. '''
+
+
+class _Validation(object):
+    ''' An in progress validation of a token that other callers can wait on. '''
+
+    def __init__(self):
+        self.done = _threading.Event()
+        self.user = None
+        self.error = None
 
 
 class KBaseAuth(object):
@@ -59,32 +213,129 @@ class KBaseAuth(object):
 
     _LOGIN_URL = 'https://kbase.us/services/authorization/Sessions/Login'
 
-    def __init__(self, auth_url=None):
+    def __init__(self, auth_url=None, wait_timeout=60, cache_size=2000,
+                 cache_ttl=TokenCache._MAX_TIME_SEC, reject_cache_size=1000,
+                 reject_cache_ttl=10, cache_store=None, timeout=(10, 60),
+                 connect_retries=3):
         '''
         Constructor
+
+        wait_timeout - how long, in seconds, a caller waits for another
+            caller's validation of the same token before giving up.
+        cache_size - the maximum number of validated tokens to remember.
+        cache_ttl - how long, in seconds, a validated token is remembered.
+        reject_cache_size - the maximum number of rejected tokens to remember.
+        reject_cache_ttl - how long, in seconds, a rejected token is
+            remembered. 0 disables remembering rejected tokens.
+        cache_store - a store shared with other processes for validated
+            tokens, or None to only cache them in this process.
+        timeout - the connect and read timeouts, in seconds, for requests to
+            the auth service.
+        connect_retries - how many times to retry connecting to the auth
+            service, with exponential backoff.
         '''
         self._authurl = auth_url
         if not self._authurl:
             self._authurl = self._LOGIN_URL
-        self._cache = TokenCache()
+        self._cache = TokenCache(cache_size, cache_ttl, cache_store)
+        # maps rejected tokens to the error message, so clients retrying
+        # with a bad token fail fast
+        self._rejected = None
+        if reject_cache_ttl > 0:
+            self._rejected = TokenCache(reject_cache_size, reject_cache_ttl)
+        self._wait_timeout = wait_timeout
+        self._timeout = timeout
+        self._connect_retries = connect_retries
+        self._session = None
+        self._session_pid = None
+        self._session_lock = _threading.Lock()
+        self._validations = {}
+        self._validations_lock = _threading.Lock()
 
     def get_user(self, token):
+        '''
+        Returns the user name for token. Concurrent calls with the same
+        uncached token share a single request to the auth service, and all
+        of them get its error if it fails.
+        '''
         if not token:
             raise ValueError('Must supply token')
         user = self._cache.get_user(token)
         if user:
             return user
+        if self._rejected is not None:
+            message = self._rejected.get_user(token)
+            if message:
+                raise InvalidTokenError(message)
+
+        key = hashlib.sha256(token).hexdigest()
+        with self._validations_lock:
+            validation = self._validations.get(key)
+            first = validation is None
+            if first:
+                validation = _Validation()
+                self._validations[key] = validation
+        if not first:
+            if not validation.done.wait(self._wait_timeout):
+                raise ValueError(('Timed out after {} seconds waiting for ' +
+                                  'the auth service to validate the token')
+                                 .format(self._wait_timeout))
+            if validation.error is not None:
+                raise validation.error
+            return validation.user
+
+        try:
+            validation.user = self._validate_token(token)
+        except InvalidTokenError as e:
+            validation.error = e
+            if self._rejected is not None:
+                self._rejected.add_valid_token(token, str(e))
+            raise
+        except Exception as e:
+            validation.error = e
+            raise
+        finally:
+            with self._validations_lock:
+                del self._validations[key]
+            validation.done.set()
+        return validation.user
+
+    def _get_session(self):
+        # a keep-alive session per process, rebuilt after a fork. Only failed
+        # connection attempts are retried, since the request never reached
+        # the auth service.
+        with self._session_lock:
+            if self._session_pid != _os.getpid():
+                adapter = _HTTPAdapter(max_retries=_Retry(
+                    total=None, connect=self._connect_retries, read=False,
+                    backoff_factor=0.5))
+                self._session = _requests.Session()
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+                self._session_pid = _os.getpid()
+            return self._session
 
+    def _validate_token(self, token):
         d = {'token': token, 'fields': 'user_id'}
-        ret = _requests.post(self._authurl, data=d)
+        ret = self._get_session().post(self._authurl, data=d,
+                                       timeout=self._timeout)
         if not ret.ok:
+            # only a client error is a verdict on the token; anything else
+            # may succeed if retried
+            rejected = 400 <= ret.status_code < 500 and \
+                ret.status_code not in (408, 429)
             try:
                 err = ret.json()
             except:
+                if rejected:
+                    raise InvalidTokenError(
+                        'Error connecting to auth service: {} {}'
+                        .format(ret.status_code, ret.reason))
                 ret.raise_for_status()
-            raise ValueError('Error connecting to auth service: {} {}\n{}'
-                             .format(ret.status_code, ret.reason,
-                                     err['error_msg']))
+            error = InvalidTokenError if rejected else ValueError
+            raise error('Error connecting to auth service: {} {}\n{}'
+                        .format(ret.status_code, ret.reason,
+                                err['error_msg']))
 
         user = ret.json()['user_id']
         self._cache.add_valid_token(token, user)
@@ -1,7 +1,7 @@
 ############################################################
 #
-# Autogenerated by the KBase type compiler -
-# any changes made here will be overwritten
+# Originally generated by the KBase type compiler, now maintained
+# by hand - do not regenerate with kb-sdk compile
 #
 ############################################################
 
@@ -11,6 +11,9 @@ import json as _json
 import requests as _requests
 import random as _random
 import os as _os
+import threading as _threading
+from requests.adapters import HTTPAdapter as _HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry as _Retry
 
 try:
     from configparser import ConfigParser as _ConfigParser  # py 3
@@ -25,8 +28,34 @@ import time
 
 _CT = 'content-type'
 _AJ = 'application/json'
+_AE = 'accept-encoding'
+_TIMEOUT_HEADER = 'X-KBase-Timeout'
 _URL_SCHEME = frozenset(['http', 'https'])
 
+_TOKEN_TIMEOUT = (10, 60)  # connect, read (sec)
+_TOKEN_CONNECT_RETRIES = 3
+
+_token_session = None
+_token_session_pid = None
+_token_session_lock = _threading.Lock()
+
+
+def _get_token_session():
+    # a keep-alive session per process, rebuilt after a fork. Only failed
+    # connection attempts are retried, since the request never reached the
+    # server.
+    global _token_session, _token_session_pid
+    with _token_session_lock:
+        if _token_session_pid != _os.getpid():
+            adapter = _HTTPAdapter(max_retries=_Retry(
+                total=None, connect=_TOKEN_CONNECT_RETRIES, read=False,
+                backoff_factor=0.5))
+            _token_session = _requests.Session()
+            _token_session.mount('http://', adapter)
+            _token_session.mount('https://', adapter)
+            _token_session_pid = _os.getpid()
+        return _token_session
+
 
 def _get_token(user_id, password, auth_svc):
     # This is bandaid helper function until we get a full
@@ -36,7 +65,8 @@ def _get_token(user_id, password, auth_svc):
     # unicode, so if this changes this client will need to change.
     body = ('user_id=' + _requests.utils.quote(user_id) + '&password=' +
             _requests.utils.quote(password) + '&fields=token')
-    ret = _requests.post(auth_svc, data=body, allow_redirects=True)
+    ret = _get_token_session().post(auth_svc, data=body, allow_redirects=True,
+                                    timeout=_TOKEN_TIMEOUT)
     status = ret.status_code
     if status >= 200 and status <= 299:
         tok = _json.loads(ret.text)
@@ -116,6 +146,9 @@ class BaseClient(object):
     lookup_url - set to true when contacting KBase dynamic services.
     async_job_check_time_ms - the wait time between checking job state for
         asynchronous jobs run with the run_job method.
+    session - an object with a requests compatible post method, such as a
+        requests.Session, used to make the calls. Defaults to the requests
+        module, which opens a new connection for every call.
     '''
     def __init__(
             self, url=None, timeout=30 * 60, user_id=None,
@@ -125,7 +158,8 @@ class BaseClient(object):
             lookup_url=False,
             async_job_check_time_ms=100,
             async_job_check_time_scale_percent=150,
-            async_job_check_max_time_ms=300000):
+            async_job_check_max_time_ms=300000,
+            session=None):
         if url is None:
             raise ValueError('A url is required')
         scheme, _, _, _, _, _ = _urlparse(url)
@@ -133,13 +167,17 @@ class BaseClient(object):
             raise ValueError(url + " isn't a valid http url")
         self.url = url
         self.timeout = int(timeout)
-        self._headers = dict()
+        # requests transparently decodes compressed responses. Servers that
+        # support it stop working on a call once the client has given up.
+        self._headers = {_AE: 'gzip, deflate',
+                         _TIMEOUT_HEADER: str(self.timeout)}
         self.trust_all_ssl_certificates = trust_all_ssl_certificates
         self.lookup_url = lookup_url
         self.async_job_check_time = async_job_check_time_ms / 1000.0
         self.async_job_check_time_scale_percent = (
             async_job_check_time_scale_percent)
         self.async_job_check_max_time = async_job_check_max_time_ms / 1000.0
+        self._session = _requests if session is None else session
         # token overrides user_id and password
         if token is not None:
             self._headers['AUTHORIZATION'] = token
@@ -172,11 +210,11 @@ class BaseClient(object):
             arg_hash['context'] = context
 
         body = _json.dumps(arg_hash, cls=_JSONObjectEncoder)
-        ret = _requests.post(url, data=body, headers=self._headers,
-                             timeout=self.timeout,
-                             verify=not self.trust_all_ssl_certificates)
+        ret = self._session.post(url, data=body, headers=self._headers,
+                                 timeout=self.timeout,
+                                 verify=not self.trust_all_ssl_certificates)
         ret.encoding = 'utf-8'
-        if ret.status_code == 500:
+        if ret.status_code in (500, 503):
             if ret.headers.get(_CT) == _AJ:
                 err = ret.json()
                 if 'error' in err:
@@ -0,0 +1,49 @@
+'''
+Request deadlines.
+
+The server stores the time by which a caller needs an answer in the method
+context as ctx['deadline'], in seconds since the epoch. Code doing slow
+work calls check() between steps, and outbound calls take their timeouts
+from timeout(), so work nobody is waiting for anymore stops early.
+'''
+import time
+
+
+class DeadlineExceeded(Exception):
+    ''' The request ran past its deadline. '''
+
+
+def remaining(ctx):
+    '''
+    Returns the number of seconds left before the deadline in ctx, or None
+    if there is no deadline.
+    '''
+    deadline = ctx.get('deadline') if ctx else None
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def check(ctx):
+    ''' Raises DeadlineExceeded if the deadline in ctx has passed. '''
+    left = remaining(ctx)
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(
+            'The request deadline passed {:.1f} seconds ago'.format(-left))
+
+
+def timeout(ctx, default=None):
+    '''
+    Returns a timeout in seconds for an outbound call: default, capped to
+    the time left before the deadline. The result is at least 1 second, as
+    the KBase clients require, unless it is None because there is neither a
+    default nor a deadline. Raises DeadlineExceeded if the deadline has
+    passed.
+    '''
+    check(ctx)
+    left = remaining(ctx)
+    if left is None:
+        return default
+    if default is not None:
+        left = min(left, default)
+    return max(1, int(left))
@@ -0,0 +1,132 @@
+'''
+Pluggable JSON encoding and decoding for the server.
+
+An accelerated JSON implementation is used when one is installed, falling
+back to the standard library otherwise. Every backend keeps the behaviour
+of JSONObjectEncoder: sets and frozensets are encoded as lists, and objects
+with a toJSONable method are encoded as the value it returns.
+'''
+import json
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+BACKENDS = ('ujson', 'simplejson', 'json')
+
+
+def _default(obj):
+    if isinstance(obj, set):
+        return list(obj)
+    if isinstance(obj, frozenset):
+        return list(obj)
+    if hasattr(obj, 'toJSONable'):
+        return obj.toJSONable()
+    raise TypeError(repr(obj) + ' is not JSON serializable')
+
+
+class JSONObjectEncoder(json.JSONEncoder):
+
+    def default(self, obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return json.JSONEncoder.default(self, obj)
+
+
+def _ujson_loads(s):
+    try:
+        return ujson.loads(s, precise_float=True)
+    except TypeError:
+        # newer ujson releases always parse floats precisely and dropped
+        # the keyword
+        return ujson.loads(s)
+
+
+def _ujson_encodes_doubles_exactly():
+    # ujson before 2.0 rounds doubles to at most 15 significant digits,
+    # which would change values such as gc_content on the way out
+    if ujson is None:
+        return False
+    return ujson.loads(ujson.dumps(0.1 + 0.2)) == 0.1 + 0.2
+
+
+class JSONCodec(object):
+    '''
+    Encodes and decodes JSON with the named backends. Use get_codec rather
+    than building one directly.
+    '''
+
+    def __init__(self, decoder='json', encoder='json'):
+        if decoder not in BACKENDS:
+            raise ValueError('Unknown JSON decoder: ' + str(decoder))
+        if encoder not in BACKENDS:
+            raise ValueError('Unknown JSON encoder: ' + str(encoder))
+        self.decoder = decoder
+        self.encoder = encoder
+
+    def loads(self, s):
+        if self.decoder == 'ujson':
+            return _ujson_loads(s)
+        if self.decoder == 'simplejson':
+            return simplejson.loads(s)
+        return json.loads(s)
+
+    def dumps(self, obj):
+        if self.encoder == 'ujson':
+            try:
+                return ujson.dumps(obj, escape_forward_slashes=False)
+            except (TypeError, OverflowError, ValueError):
+                # ujson has no default hook, so let the stdlib handle sets
+                # and toJSONable objects
+                pass
+        elif self.encoder == 'simplejson':
+            return simplejson.dumps(obj, default=_default)
+        return json.dumps(obj, cls=JSONObjectEncoder)
+
+    def iterencode(self, obj):
+        '''Encodes obj incrementally. Always uses the standard library.'''
+        return JSONObjectEncoder().iterencode(obj)
+
+    def __repr__(self):
+        return 'JSONCodec(decoder={!r}, encoder={!r})'.format(
+            self.decoder, self.encoder)
+
+
+def _available(name):
+    if name == 'ujson':
+        return ujson is not None
+    if name == 'simplejson':
+        return simplejson is not None
+    return name == 'json'
+
+
+def get_codec(name='auto'):
+    '''
+    Returns a JSONCodec for the backend name: 'auto', 'ujson', 'simplejson'
+    or 'json'. 'auto' picks the fastest installed backend for each direction;
+    ujson is only used for encoding when it preserves doubles exactly.
+    '''
+    if name == 'auto':
+        decoder = 'json'
+        for candidate in BACKENDS:
+            if _available(candidate):
+                decoder = candidate
+                break
+        encoder = 'json'
+        if _ujson_encodes_doubles_exactly():
+            encoder = 'ujson'
+        elif simplejson is not None:
+            encoder = 'simplejson'
+        return JSONCodec(decoder, encoder)
+    if name not in BACKENDS:
+        raise ValueError('Unknown JSON codec: ' + str(name))
+    if not _available(name):
+        raise ValueError('JSON codec {} is not installed'.format(name))
+    return JSONCodec(name, name)
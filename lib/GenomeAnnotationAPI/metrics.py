@@ -0,0 +1,201 @@
+'''
+Per-method request metrics for the server, rendered in the Prometheus text
+exposition format.
+
+Each process keeps its own counters. When a metrics directory is given,
+every process also writes a snapshot of its counters there, and rendering
+sums the snapshots of all processes, so a scrape hitting any uwsgi worker
+reports totals for the whole host. Failures writing snapshots are logged
+and otherwise ignored, so metrics never fail a request.
+'''
+import errno
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2,
+                100 * 1024 ** 2, 1024 ** 3)
+
+_HISTOGRAMS = (
+    ('latency', 'request_duration_seconds', LATENCY_BUCKETS,
+     'Time from receiving a request to sending the last response byte.'),
+    ('request_bytes', 'request_size_bytes', SIZE_BUCKETS,
+     'Size of the request body.'),
+    ('response_bytes', 'response_size_bytes', SIZE_BUCKETS,
+     'Size of the response body as sent, after any compression.'),
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_log = logging.getLogger(__name__)
+
+
+def _new_histogram(buckets):
+    return {'counts': [0] * (len(buckets) + 1), 'sum': 0.0}
+
+
+def _observe(histogram, buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            histogram['counts'][i] += 1
+            break
+    else:
+        histogram['counts'][-1] += 1
+    histogram['sum'] += value
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+class MethodMetrics(object):
+    '''
+    Records latency, request and response sizes, errors and in-flight
+    counts per method.
+
+    prefix - the metric name prefix.
+    metrics_dir - a directory shared by all worker processes, or None to
+        report this process only.
+    flush_interval - the minimum number of seconds between snapshot writes.
+    '''
+
+    def __init__(self, prefix, metrics_dir=None, flush_interval=5):
+        self._prefix = prefix
+        self._dir = metrics_dir
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._methods = {}
+        self._last_flush = 0
+        if self._dir and not os.path.isdir(self._dir):
+            os.makedirs(self._dir)
+
+    def _method(self, method):
+        data = self._methods.get(method)
+        if data is None:
+            data = {'requests': 0, 'errors': 0, 'in_flight': 0}
+            for key, _, buckets, _ in _HISTOGRAMS:
+                data[key] = _new_histogram(buckets)
+            self._methods[method] = data
+        return data
+
+    def start(self, method):
+        with self._lock:
+            self._method(method)['in_flight'] += 1
+
+    def finish(self, method, latency, request_bytes, response_bytes, error):
+        with self._lock:
+            data = self._method(method)
+            data['in_flight'] -= 1
+            data['requests'] += 1
+            if error:
+                data['errors'] += 1
+            values = {'latency': latency, 'request_bytes': request_bytes,
+                      'response_bytes': response_bytes}
+            for key, _, buckets, _ in _HISTOGRAMS:
+                _observe(data[key], buckets, values[key])
+            flush = time.time() - self._last_flush >= self._flush_interval
+        if flush:
+            self.flush()
+
+    def _snapshot_file(self, pid):
+        return os.path.join(self._dir, 'metrics-{}.json'.format(pid))
+
+    def flush(self):
+        '''Writes this process's counters to the metrics directory.'''
+        if not self._dir:
+            return
+        with self._lock:
+            self._last_flush = time.time()
+            snapshot = json.dumps(self._methods)
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self._dir, prefix='.metrics-')
+            with os.fdopen(fd, 'w') as f:
+                f.write(snapshot)
+            os.rename(tmp, self._snapshot_file(os.getpid()))
+        except (IOError, OSError) as e:
+            _log.warning('Could not write metrics snapshot to %s: %s',
+                         self._dir, e)
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def _collect(self):
+        if not self._dir:
+            with self._lock:
+                return json.loads(json.dumps(self._methods))
+        self.flush()
+        totals = {}
+        for name in os.listdir(self._dir):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                pid = int(name[len('metrics-'):-len('.json')])
+                with open(os.path.join(self._dir, name)) as f:
+                    methods = json.load(f)
+            except (ValueError, IOError, OSError):
+                continue
+            alive = _pid_alive(pid)
+            for method, data in methods.items():
+                total = totals.get(method)
+                if total is None:
+                    total = {'requests': 0, 'errors': 0, 'in_flight': 0}
+                    for key, _, buckets, _ in _HISTOGRAMS:
+                        total[key] = _new_histogram(buckets)
+                    totals[method] = total
+                total['requests'] += data['requests']
+                total['errors'] += data['errors']
+                # requests of dead workers will never finish
+                if alive:
+                    total['in_flight'] += data['in_flight']
+                for key, _, _, _ in _HISTOGRAMS:
+                    total[key]['sum'] += data[key]['sum']
+                    total[key]['counts'] = [
+                        a + b for a, b in zip(total[key]['counts'],
+                                              data[key]['counts'])]
+        return totals
+
+    def render(self):
+        '''Returns the metrics in the Prometheus text format.'''
+        methods = self._collect()
+        lines = []
+        p = self._prefix
+        for key, name, buckets, doc in _HISTOGRAMS:
+            lines.append('# HELP {}_{} {}'.format(p, name, doc))
+            lines.append('# TYPE {}_{} histogram'.format(p, name))
+            for method in sorted(methods):
+                histogram = methods[method][key]
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',),
+                                        histogram['counts']):
+                    cumulative += count
+                    lines.append('{}_{}_bucket{{method="{}",le="{}"}} {}'
+                                 .format(p, name, method, bound, cumulative))
+                lines.append('{}_{}_sum{{method="{}"}} {}'.format(
+                    p, name, method, repr(histogram['sum'])))
+                lines.append('{}_{}_count{{method="{}"}} {}'.format(
+                    p, name, method, cumulative))
+        for key, name, kind, doc in (
+                ('requests', 'requests_total', 'counter',
+                 'Number of finished requests.'),
+                ('errors', 'request_errors_total', 'counter',
+                 'Number of requests that returned an error.'),
+                ('in_flight', 'requests_in_flight', 'gauge',
+                 'Number of requests currently being handled.')):
+            lines.append('# HELP {}_{} {}'.format(p, name, doc))
+            lines.append('# TYPE {}_{} {}'.format(p, name, kind))
+            for method in sorted(methods):
+                lines.append('{}_{}{{method="{}"}} {}'.format(
+                    p, name, method, methods[method][key]))
+        return '\n'.join(lines) + '\n'
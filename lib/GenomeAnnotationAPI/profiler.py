@@ -0,0 +1,79 @@
+'''
+Opt-in profiling of individual method calls.
+
+Calls are profiled when the caller asks for it or when they are picked by
+random sampling. Each profiled call leaves two files in the output
+directory: a .prof file that can be loaded with pstats or snakeviz, and a
+.txt summary of the top functions by cumulative time.
+'''
+import cProfile
+import errno
+import itertools
+import os
+import pstats
+import random
+import re
+import time
+import traceback
+from StringIO import StringIO
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class CallProfiler(object):
+    '''
+    Profiles method calls with cProfile and writes the results to disk.
+
+    output_dir - the directory for the profile files.
+    sample_rate - the fraction of all calls to profile even when not asked
+        to, between 0 and 1.
+    top_n - the number of functions listed in each summary.
+    '''
+
+    def __init__(self, output_dir, sample_rate=0.0, top_n=30):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1')
+        self.output_dir = output_dir
+        self._sample_rate = sample_rate
+        self._top_n = top_n
+        self._counter = itertools.count()
+
+    def wanted(self, ctx):
+        '''Returns True if the call in ctx should be profiled.'''
+        if ctx.get('profile'):
+            return True
+        return self._sample_rate > 0 and random.random() < self._sample_rate
+
+    def run(self, ctx, name, func, *args, **kwargs):
+        '''Calls func under the profiler and writes out the results.'''
+        profile = cProfile.Profile()
+        start = time.time()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            elapsed = time.time() - start
+            try:
+                self._dump(profile, ctx, name, elapsed)
+            except Exception:
+                # losing a profile must never fail the call itself
+                ctx.log_err('could not write profile: ' +
+                            traceback.format_exc())
+
+    def _dump(self, profile, ctx, name, elapsed):
+        try:
+            os.makedirs(self.output_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        base = os.path.join(self.output_dir, '{}_{}_{}_{}'.format(
+            time.strftime('%Y%m%dT%H%M%S'), os.getpid(),
+            next(self._counter), _UNSAFE_CHARS.sub('_', name)))
+        profile.dump_stats(base + '.prof')
+        summary = StringIO()
+        summary.write('method: {}\nuser: {}\ncall_id: {}\n'.format(
+            name, ctx.get('user_id'), ctx.get('call_id')))
+        summary.write('wall time: {:.3f} s\n\n'.format(elapsed))
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats('cumulative').print_stats(self._top_n)
+        with open(base + '.txt', 'w') as f:
+            f.write(summary.getvalue())
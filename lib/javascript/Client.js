@@ -344,6 +344,19 @@ function GenomeAnnotationAPI(url, auth, auth_cb, timeout, async_job_check_time_m
             [params], 1, _callback, _errorCallback);
     };
  
+     this.get_combined_data_page = function (params, _callback, _errorCallback) {
+        if (typeof params === 'function')
+            throw 'Argument params can not be a function';
+        if (_callback && typeof _callback !== 'function')
+            throw 'Argument _callback must be a function if defined';
+        if (_errorCallback && typeof _errorCallback !== 'function')
+            throw 'Argument _errorCallback must be a function if defined';
+        if (typeof arguments === 'function' && arguments.length > 1+2)
+            throw 'Too many arguments ('+arguments.length+' instead of '+(1+2)+')';
+        return json_call_ajax(_url, "GenomeAnnotationAPI.get_combined_data_page",
+            [params], 1, _callback, _errorCallback);
+    };
+ 
      this.get_genome_v1 = function (params, _callback, _errorCallback) {
         if (typeof params === 'function')
             throw 'Argument params can not be a function';
@@ -0,0 +1,111 @@
+
+package us.kbase.genomeannotationapi;
+
+import java.util.HashMap;
+import java.util.Map;
+import javax.annotation.Generated;
+import com.fasterxml.jackson.annotation.JsonAnyGetter;
+import com.fasterxml.jackson.annotation.JsonAnySetter;
+import com.fasterxml.jackson.annotation.JsonInclude;
+import com.fasterxml.jackson.annotation.JsonProperty;
+import com.fasterxml.jackson.annotation.JsonPropertyOrder;
+
+
+/**
+ * <p>Original spec-file type: CombinedDataPage</p>
+ * <pre>
+ * * A page of get_combined_data results. Features are ordered by type and then by id, and every
+ * * relation and protein appears on the page of the feature it is keyed by. feature_types and
+ * * summary are only returned on the first page. total_features is the number of features over all
+ * * pages. next_cursor is missing on the last page.
+ * * @optional next_cursor
+ * </pre>
+ * 
+ */
+@JsonInclude(JsonInclude.Include.NON_NULL)
+@Generated("com.googlecode.jsonschema2pojo")
+@JsonPropertyOrder({
+    "data",
+    "total_features",
+    "next_cursor"
+})
+public class CombinedDataPage {
+
+    /**
+     * <p>Original spec-file type: GenomeAnnotation_data</p>
+     * <pre>
+     * gene_id is a feature id of a gene feature.
+     * mrna_id is a feature id of a mrna feature.
+     * cds_id is a feature id of a cds feature.
+     * </pre>
+     * 
+     */
+    @JsonProperty("data")
+    private GenomeAnnotationData data;
+    @JsonProperty("total_features")
+    private Long totalFeatures;
+    @JsonProperty("next_cursor")
+    private java.lang.String nextCursor;
+    private Map<java.lang.String, Object> additionalProperties = new HashMap<java.lang.String, Object>();
+
+    @JsonProperty("data")
+    public GenomeAnnotationData getData() {
+        return data;
+    }
+
+    @JsonProperty("data")
+    public void setData(GenomeAnnotationData data) {
+        this.data = data;
+    }
+
+    public CombinedDataPage withData(GenomeAnnotationData data) {
+        this.data = data;
+        return this;
+    }
+
+    @JsonProperty("total_features")
+    public Long getTotalFeatures() {
+        return totalFeatures;
+    }
+
+    @JsonProperty("total_features")
+    public void setTotalFeatures(Long totalFeatures) {
+        this.totalFeatures = totalFeatures;
+    }
+
+    public CombinedDataPage withTotalFeatures(Long totalFeatures) {
+        this.totalFeatures = totalFeatures;
+        return this;
+    }
+
+    @JsonProperty("next_cursor")
+    public java.lang.String getNextCursor() {
+        return nextCursor;
+    }
+
+    @JsonProperty("next_cursor")
+    public void setNextCursor(java.lang.String nextCursor) {
+        this.nextCursor = nextCursor;
+    }
+
+    public CombinedDataPage withNextCursor(java.lang.String nextCursor) {
+        this.nextCursor = nextCursor;
+        return this;
+    }
+
+    @JsonAnyGetter
+    public Map<java.lang.String, Object> getAdditionalProperties() {
+        return this.additionalProperties;
+    }
+
+    @JsonAnySetter
+    public void setAdditionalProperties(java.lang.String name, Object value) {
+        this.additionalProperties.put(name, value);
+    }
+
+    @Override
+    public java.lang.String toString() {
+        return ((((((((("CombinedDataPage"+" [data=")+ data)+", totalFeatures=")+ totalFeatures)+", nextCursor=")+ nextCursor)+", additionalProperties=")+ additionalProperties)+"]");
+    }
+
+}
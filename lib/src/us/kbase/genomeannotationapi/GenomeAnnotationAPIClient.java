@@ -595,6 +595,29 @@ public class GenomeAnnotationAPIClient {
         return res.get(0);
     }
 
+    /**
+     * <p>Original spec-file function name: get_combined_data_page</p>
+     * <pre>
+     * * Retrieve get_combined_data results a page at a time, so large eukaryotic datasets can be read
+     * * without building the whole result at once. All the pages are read from the same version of the
+     * * object. A page reads only its own features and relations, but the ids of all the paged features
+     * * are read once per object version and server process. include_protein_by_cds_id reads the proteins
+     * * of the whole genome for every page that has CDSs on it, as data_api has no way to read some of
+     * * them, so leave it off for large genomes.
+     * </pre>
+     * @param   params   instance of type {@link us.kbase.genomeannotationapi.GetCombinedDataPageParams GetCombinedDataPageParams}
+     * @return   instance of type {@link us.kbase.genomeannotationapi.CombinedDataPage CombinedDataPage}
+     * @throws IOException if an IO exception occurs
+     * @throws JsonClientException if a JSON RPC exception occurs
+     */
+    public CombinedDataPage getCombinedDataPage(GetCombinedDataPageParams params, RpcContext... jsonRpcContext) throws IOException, JsonClientException {
+        List<Object> args = new ArrayList<Object>();
+        args.add(params);
+        TypeReference<List<CombinedDataPage>> retType = new TypeReference<List<CombinedDataPage>>() {};
+        List<CombinedDataPage> res = caller.jsonrpcCall("GenomeAnnotationAPI.get_combined_data_page", args, retType, true, true, jsonRpcContext, this.serviceVersion);
+        return res.get(0);
+    }
+
     /**
      * <p>Original spec-file function name: get_genome_v1</p>
      * <pre>
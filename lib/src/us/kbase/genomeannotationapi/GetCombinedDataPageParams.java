@@ -0,0 +1,322 @@
+
+package us.kbase.genomeannotationapi;
+
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import javax.annotation.Generated;
+import com.fasterxml.jackson.annotation.JsonAnyGetter;
+import com.fasterxml.jackson.annotation.JsonAnySetter;
+import com.fasterxml.jackson.annotation.JsonInclude;
+import com.fasterxml.jackson.annotation.JsonProperty;
+import com.fasterxml.jackson.annotation.JsonPropertyOrder;
+
+
+/**
+ * <p>Original spec-file type: GetCombinedDataPageParams</p>
+ * <pre>
+ * * Retrieve a page of get_combined_data results. The sections are chosen with the same flags as for
+ * * get_combined_data, except that protein_by_cds_id is only returned when include_protein_by_cds_id
+ * * is set. page_size is the maximum number of features in a page (default 1000). cursor is the
+ * * next_cursor returned with the previous page; leave it out to get the first page.
+ * * @optional exclude_genes include_mrnas exclude_cdss include_features_by_type include_protein_by_cds_id
+ * * @optional include_mrna_ids_by_gene_id exclude_cds_ids_by_gene_id include_cds_id_by_mrna_id
+ * * @optional include_exons_by_mrna_id include_utr_by_utr_type_by_mrna_id exclude_summary included_feature_fields
+ * * @optional page_size cursor
+ * </pre>
+ * 
+ */
+@JsonInclude(JsonInclude.Include.NON_NULL)
+@Generated("com.googlecode.jsonschema2pojo")
+@JsonPropertyOrder({
+    "ref",
+    "exclude_genes",
+    "include_mrnas",
+    "exclude_cdss",
+    "include_features_by_type",
+    "include_protein_by_cds_id",
+    "include_mrna_ids_by_gene_id",
+    "exclude_cds_ids_by_gene_id",
+    "include_cds_id_by_mrna_id",
+    "include_exons_by_mrna_id",
+    "include_utr_by_utr_type_by_mrna_id",
+    "exclude_summary",
+    "included_feature_fields",
+    "page_size",
+    "cursor"
+})
+public class GetCombinedDataPageParams {
+
+    @JsonProperty("ref")
+    private java.lang.String ref;
+    @JsonProperty("exclude_genes")
+    private Long excludeGenes;
+    @JsonProperty("include_mrnas")
+    private Long includeMrnas;
+    @JsonProperty("exclude_cdss")
+    private Long excludeCdss;
+    @JsonProperty("include_features_by_type")
+    private List<String> includeFeaturesByType;
+    @JsonProperty("include_protein_by_cds_id")
+    private Long includeProteinByCdsId;
+    @JsonProperty("include_mrna_ids_by_gene_id")
+    private Long includeMrnaIdsByGeneId;
+    @JsonProperty("exclude_cds_ids_by_gene_id")
+    private Long excludeCdsIdsByGeneId;
+    @JsonProperty("include_cds_id_by_mrna_id")
+    private Long includeCdsIdByMrnaId;
+    @JsonProperty("include_exons_by_mrna_id")
+    private Long includeExonsByMrnaId;
+    @JsonProperty("include_utr_by_utr_type_by_mrna_id")
+    private Long includeUtrByUtrTypeByMrnaId;
+    @JsonProperty("exclude_summary")
+    private Long excludeSummary;
+    @JsonProperty("included_feature_fields")
+    private List<String> includedFeatureFields;
+    @JsonProperty("page_size")
+    private Long pageSize;
+    @JsonProperty("cursor")
+    private java.lang.String cursor;
+    private Map<java.lang.String, Object> additionalProperties = new HashMap<java.lang.String, Object>();
+
+    @JsonProperty("ref")
+    public java.lang.String getRef() {
+        return ref;
+    }
+
+    @JsonProperty("ref")
+    public void setRef(java.lang.String ref) {
+        this.ref = ref;
+    }
+
+    public GetCombinedDataPageParams withRef(java.lang.String ref) {
+        this.ref = ref;
+        return this;
+    }
+
+    @JsonProperty("exclude_genes")
+    public Long getExcludeGenes() {
+        return excludeGenes;
+    }
+
+    @JsonProperty("exclude_genes")
+    public void setExcludeGenes(Long excludeGenes) {
+        this.excludeGenes = excludeGenes;
+    }
+
+    public GetCombinedDataPageParams withExcludeGenes(Long excludeGenes) {
+        this.excludeGenes = excludeGenes;
+        return this;
+    }
+
+    @JsonProperty("include_mrnas")
+    public Long getIncludeMrnas() {
+        return includeMrnas;
+    }
+
+    @JsonProperty("include_mrnas")
+    public void setIncludeMrnas(Long includeMrnas) {
+        this.includeMrnas = includeMrnas;
+    }
+
+    public GetCombinedDataPageParams withIncludeMrnas(Long includeMrnas) {
+        this.includeMrnas = includeMrnas;
+        return this;
+    }
+
+    @JsonProperty("exclude_cdss")
+    public Long getExcludeCdss() {
+        return excludeCdss;
+    }
+
+    @JsonProperty("exclude_cdss")
+    public void setExcludeCdss(Long excludeCdss) {
+        this.excludeCdss = excludeCdss;
+    }
+
+    public GetCombinedDataPageParams withExcludeCdss(Long excludeCdss) {
+        this.excludeCdss = excludeCdss;
+        return this;
+    }
+
+    @JsonProperty("include_features_by_type")
+    public List<String> getIncludeFeaturesByType() {
+        return includeFeaturesByType;
+    }
+
+    @JsonProperty("include_features_by_type")
+    public void setIncludeFeaturesByType(List<String> includeFeaturesByType) {
+        this.includeFeaturesByType = includeFeaturesByType;
+    }
+
+    public GetCombinedDataPageParams withIncludeFeaturesByType(List<String> includeFeaturesByType) {
+        this.includeFeaturesByType = includeFeaturesByType;
+        return this;
+    }
+
+    @JsonProperty("include_protein_by_cds_id")
+    public Long getIncludeProteinByCdsId() {
+        return includeProteinByCdsId;
+    }
+
+    @JsonProperty("include_protein_by_cds_id")
+    public void setIncludeProteinByCdsId(Long includeProteinByCdsId) {
+        this.includeProteinByCdsId = includeProteinByCdsId;
+    }
+
+    public GetCombinedDataPageParams withIncludeProteinByCdsId(Long includeProteinByCdsId) {
+        this.includeProteinByCdsId = includeProteinByCdsId;
+        return this;
+    }
+
+    @JsonProperty("include_mrna_ids_by_gene_id")
+    public Long getIncludeMrnaIdsByGeneId() {
+        return includeMrnaIdsByGeneId;
+    }
+
+    @JsonProperty("include_mrna_ids_by_gene_id")
+    public void setIncludeMrnaIdsByGeneId(Long includeMrnaIdsByGeneId) {
+        this.includeMrnaIdsByGeneId = includeMrnaIdsByGeneId;
+    }
+
+    public GetCombinedDataPageParams withIncludeMrnaIdsByGeneId(Long includeMrnaIdsByGeneId) {
+        this.includeMrnaIdsByGeneId = includeMrnaIdsByGeneId;
+        return this;
+    }
+
+    @JsonProperty("exclude_cds_ids_by_gene_id")
+    public Long getExcludeCdsIdsByGeneId() {
+        return excludeCdsIdsByGeneId;
+    }
+
+    @JsonProperty("exclude_cds_ids_by_gene_id")
+    public void setExcludeCdsIdsByGeneId(Long excludeCdsIdsByGeneId) {
+        this.excludeCdsIdsByGeneId = excludeCdsIdsByGeneId;
+    }
+
+    public GetCombinedDataPageParams withExcludeCdsIdsByGeneId(Long excludeCdsIdsByGeneId) {
+        this.excludeCdsIdsByGeneId = excludeCdsIdsByGeneId;
+        return this;
+    }
+
+    @JsonProperty("include_cds_id_by_mrna_id")
+    public Long getIncludeCdsIdByMrnaId() {
+        return includeCdsIdByMrnaId;
+    }
+
+    @JsonProperty("include_cds_id_by_mrna_id")
+    public void setIncludeCdsIdByMrnaId(Long includeCdsIdByMrnaId) {
+        this.includeCdsIdByMrnaId = includeCdsIdByMrnaId;
+    }
+
+    public GetCombinedDataPageParams withIncludeCdsIdByMrnaId(Long includeCdsIdByMrnaId) {
+        this.includeCdsIdByMrnaId = includeCdsIdByMrnaId;
+        return this;
+    }
+
+    @JsonProperty("include_exons_by_mrna_id")
+    public Long getIncludeExonsByMrnaId() {
+        return includeExonsByMrnaId;
+    }
+
+    @JsonProperty("include_exons_by_mrna_id")
+    public void setIncludeExonsByMrnaId(Long includeExonsByMrnaId) {
+        this.includeExonsByMrnaId = includeExonsByMrnaId;
+    }
+
+    public GetCombinedDataPageParams withIncludeExonsByMrnaId(Long includeExonsByMrnaId) {
+        this.includeExonsByMrnaId = includeExonsByMrnaId;
+        return this;
+    }
+
+    @JsonProperty("include_utr_by_utr_type_by_mrna_id")
+    public Long getIncludeUtrByUtrTypeByMrnaId() {
+        return includeUtrByUtrTypeByMrnaId;
+    }
+
+    @JsonProperty("include_utr_by_utr_type_by_mrna_id")
+    public void setIncludeUtrByUtrTypeByMrnaId(Long includeUtrByUtrTypeByMrnaId) {
+        this.includeUtrByUtrTypeByMrnaId = includeUtrByUtrTypeByMrnaId;
+    }
+
+    public GetCombinedDataPageParams withIncludeUtrByUtrTypeByMrnaId(Long includeUtrByUtrTypeByMrnaId) {
+        this.includeUtrByUtrTypeByMrnaId = includeUtrByUtrTypeByMrnaId;
+        return this;
+    }
+
+    @JsonProperty("exclude_summary")
+    public Long getExcludeSummary() {
+        return excludeSummary;
+    }
+
+    @JsonProperty("exclude_summary")
+    public void setExcludeSummary(Long excludeSummary) {
+        this.excludeSummary = excludeSummary;
+    }
+
+    public GetCombinedDataPageParams withExcludeSummary(Long excludeSummary) {
+        this.excludeSummary = excludeSummary;
+        return this;
+    }
+
+    @JsonProperty("included_feature_fields")
+    public List<String> getIncludedFeatureFields() {
+        return includedFeatureFields;
+    }
+
+    @JsonProperty("included_feature_fields")
+    public void setIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+    }
+
+    public GetCombinedDataPageParams withIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+        return this;
+    }
+
+    @JsonProperty("page_size")
+    public Long getPageSize() {
+        return pageSize;
+    }
+
+    @JsonProperty("page_size")
+    public void setPageSize(Long pageSize) {
+        this.pageSize = pageSize;
+    }
+
+    public GetCombinedDataPageParams withPageSize(Long pageSize) {
+        this.pageSize = pageSize;
+        return this;
+    }
+
+    @JsonProperty("cursor")
+    public java.lang.String getCursor() {
+        return cursor;
+    }
+
+    @JsonProperty("cursor")
+    public void setCursor(java.lang.String cursor) {
+        this.cursor = cursor;
+    }
+
+    public GetCombinedDataPageParams withCursor(java.lang.String cursor) {
+        this.cursor = cursor;
+        return this;
+    }
+
+    @JsonAnyGetter
+    public Map<java.lang.String, Object> getAdditionalProperties() {
+        return this.additionalProperties;
+    }
+
+    @JsonAnySetter
+    public void setAdditionalProperties(java.lang.String name, Object value) {
+        this.additionalProperties.put(name, value);
+    }
+
+    @Override
+    public java.lang.String toString() {
+        return ((((((((((((((((((((((((((((((((("GetCombinedDataPageParams"+" [ref=")+ ref)+", excludeGenes=")+ excludeGenes)+", includeMrnas=")+ includeMrnas)+", excludeCdss=")+ excludeCdss)+", includeFeaturesByType=")+ includeFeaturesByType)+", includeProteinByCdsId=")+ includeProteinByCdsId)+", includeMrnaIdsByGeneId=")+ includeMrnaIdsByGeneId)+", excludeCdsIdsByGeneId=")+ excludeCdsIdsByGeneId)+", includeCdsIdByMrnaId=")+ includeCdsIdByMrnaId)+", includeExonsByMrnaId=")+ includeExonsByMrnaId)+", includeUtrByUtrTypeByMrnaId=")+ includeUtrByUtrTypeByMrnaId)+", excludeSummary=")+ excludeSummary)+", includedFeatureFields=")+ includedFeatureFields)+", pageSize=")+ pageSize)+", cursor=")+ cursor)+", additionalProperties=")+ additionalProperties)+"]");
+    }
+
+}
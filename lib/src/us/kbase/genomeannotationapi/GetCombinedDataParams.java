@@ -17,6 +17,7 @@ import com.fasterxml.jackson.annotation.JsonPropertyOrder;
  * <pre>
  * * Retrieve any part of GenomeAnnotation.
  * * Any of exclude_genes, include_mrnas and exclude_cdss flags override values listed in include_features_by_type.
+ * * included_feature_fields lists the Feature_data fields to return for each feature (default all).
  * </pre>
  * 
  */
@@ -34,7 +35,8 @@ import com.fasterxml.jackson.annotation.JsonPropertyOrder;
     "include_cds_id_by_mrna_id",
     "include_exons_by_mrna_id",
     "include_utr_by_utr_type_by_mrna_id",
-    "exclude_summary"
+    "exclude_summary",
+    "included_feature_fields"
 })
 public class GetCombinedDataParams {
 
@@ -62,6 +64,8 @@ public class GetCombinedDataParams {
     private Long includeUtrByUtrTypeByMrnaId;
     @JsonProperty("exclude_summary")
     private Long excludeSummary;
+    @JsonProperty("included_feature_fields")
+    private List<String> includedFeatureFields;
     private Map<java.lang.String, Object> additionalProperties = new HashMap<java.lang.String, Object>();
 
     @JsonProperty("ref")
@@ -244,6 +248,21 @@ public class GetCombinedDataParams {
         return this;
     }
 
+    @JsonProperty("included_feature_fields")
+    public List<String> getIncludedFeatureFields() {
+        return includedFeatureFields;
+    }
+
+    @JsonProperty("included_feature_fields")
+    public void setIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+    }
+
+    public GetCombinedDataParams withIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+        return this;
+    }
+
     @JsonAnyGetter
     public Map<java.lang.String, Object> getAdditionalProperties() {
         return this.additionalProperties;
@@ -256,7 +275,7 @@ public class GetCombinedDataParams {
 
     @Override
     public java.lang.String toString() {
-        return ((((((((((((((((((((((((((("GetCombinedDataParams"+" [ref=")+ ref)+", excludeGenes=")+ excludeGenes)+", includeMrnas=")+ includeMrnas)+", excludeCdss=")+ excludeCdss)+", includeFeaturesByType=")+ includeFeaturesByType)+", excludeProteinByCdsId=")+ excludeProteinByCdsId)+", includeMrnaIdsByGeneId=")+ includeMrnaIdsByGeneId)+", excludeCdsIdsByGeneId=")+ excludeCdsIdsByGeneId)+", includeCdsIdByMrnaId=")+ includeCdsIdByMrnaId)+", includeExonsByMrnaId=")+ includeExonsByMrnaId)+", includeUtrByUtrTypeByMrnaId=")+ includeUtrByUtrTypeByMrnaId)+", excludeSummary=")+ excludeSummary)+", additionalProperties=")+ additionalProperties)+"]");
+        return ((((((((((((((((((((((((((((("GetCombinedDataParams"+" [ref=")+ ref)+", excludeGenes=")+ excludeGenes)+", includeMrnas=")+ includeMrnas)+", excludeCdss=")+ excludeCdss)+", includeFeaturesByType=")+ includeFeaturesByType)+", excludeProteinByCdsId=")+ excludeProteinByCdsId)+", includeMrnaIdsByGeneId=")+ includeMrnaIdsByGeneId)+", excludeCdsIdsByGeneId=")+ excludeCdsIdsByGeneId)+", includeCdsIdByMrnaId=")+ includeCdsIdByMrnaId)+", includeExonsByMrnaId=")+ includeExonsByMrnaId)+", includeUtrByUtrTypeByMrnaId=")+ includeUtrByUtrTypeByMrnaId)+", excludeSummary=")+ excludeSummary)+", includedFeatureFields=")+ includedFeatureFields)+", additionalProperties=")+ additionalProperties)+"]");
     }
 
 }
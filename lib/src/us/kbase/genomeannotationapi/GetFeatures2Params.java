@@ -17,6 +17,9 @@ import com.fasterxml.jackson.annotation.JsonPropertyOrder;
  * <pre>
  * exclude_sequence = set to 1 (true) or 0 (false) to indicate if sequences
  * should be included.  Defautl is false.
+ * included_feature_fields = the Feature_data fields to return, for example
+ * ["feature_id", "feature_type", "feature_function", "feature_locations"].
+ * Default is all fields.
  * </pre>
  * 
  */
@@ -25,7 +28,8 @@ import com.fasterxml.jackson.annotation.JsonPropertyOrder;
 @JsonPropertyOrder({
     "ref",
     "feature_id_list",
-    "exclude_sequence"
+    "exclude_sequence",
+    "included_feature_fields"
 })
 public class GetFeatures2Params {
 
@@ -35,6 +39,8 @@ public class GetFeatures2Params {
     private List<String> featureIdList;
     @JsonProperty("exclude_sequence")
     private Long excludeSequence;
+    @JsonProperty("included_feature_fields")
+    private List<String> includedFeatureFields;
     private Map<java.lang.String, Object> additionalProperties = new HashMap<java.lang.String, Object>();
 
     @JsonProperty("ref")
@@ -82,6 +88,21 @@ public class GetFeatures2Params {
         return this;
     }
 
+    @JsonProperty("included_feature_fields")
+    public List<String> getIncludedFeatureFields() {
+        return includedFeatureFields;
+    }
+
+    @JsonProperty("included_feature_fields")
+    public void setIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+    }
+
+    public GetFeatures2Params withIncludedFeatureFields(List<String> includedFeatureFields) {
+        this.includedFeatureFields = includedFeatureFields;
+        return this;
+    }
+
     @JsonAnyGetter
     public Map<java.lang.String, Object> getAdditionalProperties() {
         return this.additionalProperties;
@@ -94,7 +115,7 @@ public class GetFeatures2Params {
 
     @Override
     public java.lang.String toString() {
-        return ((((((((("GetFeatures2Params"+" [ref=")+ ref)+", featureIdList=")+ featureIdList)+", excludeSequence=")+ excludeSequence)+", additionalProperties=")+ additionalProperties)+"]");
+        return ((((((((((("GetFeatures2Params"+" [ref=")+ ref)+", featureIdList=")+ featureIdList)+", excludeSequence=")+ excludeSequence)+", includedFeatureFields=")+ includedFeatureFields)+", additionalProperties=")+ additionalProperties)+"]");
     }
 
 }
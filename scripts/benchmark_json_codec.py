@@ -0,0 +1,119 @@
+'''
+Compares JSON encode/decode throughput of the codecs in
+GenomeAnnotationAPI.jsoncodec on a realistic get_genome_v1 style payload.
+
+The Genome is built from the features of the GenBank test file, so run from
+the repository root with lib on the PYTHONPATH:
+
+    PYTHONPATH=lib python scripts/benchmark_json_codec.py [repeats]
+'''
+import hashlib
+import os
+import re
+import sys
+import time
+
+from GenomeAnnotationAPI import jsoncodec
+
+GBK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                        'test', 'data', 'kb_g.399.c.1.gbk')
+
+_FEATURE = re.compile(r'^     (gene|CDS)\s+(complement\()?(\d+)\.\.(\d+)')
+_QUALIFIER = re.compile(r'^\s+/(\w+)="?([^"]*)"?$')
+
+
+def load_features(path):
+    features = []
+    current = None
+    qualifier = None
+    with open(path) as f:
+        for line in f:
+            m = _FEATURE.match(line)
+            if m:
+                ftype, complement, start, end = m.groups()
+                start, end = int(start), int(end)
+                current = {
+                    'id': None, 'type': ftype,
+                    'location': [['kb|g.399.c.1',
+                                  end if complement else start,
+                                  '-' if complement else '+',
+                                  end - start + 1]],
+                    'aliases': [], 'publications': [], 'subsystems': [],
+                    'annotations': []}
+                features.append(current)
+                qualifier = None
+                continue
+            if current is None or not line.startswith(' ' * 21):
+                continue
+            m = _QUALIFIER.match(line)
+            if m:
+                qualifier, value = m.groups()
+                if qualifier == 'gene':
+                    current['id'] = value
+                    current['aliases'].append(value)
+                elif qualifier == 'function':
+                    current['function'] = value
+                elif qualifier == 'translation':
+                    current['protein_translation'] = value
+                else:
+                    qualifier = None
+            elif qualifier == 'translation':
+                current['protein_translation'] += line.strip().rstrip('"')
+            elif qualifier == 'function':
+                current['function'] += ' ' + line.strip().rstrip('"')
+    for i, feature in enumerate(features):
+        if feature['type'] == 'CDS':
+            feature['id'] = '{}.CDS'.format(feature['id'])
+        prot = feature.get('protein_translation', '')
+        feature['protein_translation_length'] = len(prot)
+        feature['md5'] = hashlib.md5(prot).hexdigest()
+        feature['quality'] = {'existence_confidence': 0.5 + i % 7 / 10.0}
+    return features
+
+
+def build_payload(features):
+    genome = {'id': 'kb|g.399', 'scientific_name': 'Vibrio vulnificus CMCP6',
+              'domain': 'Bacteria', 'genetic_code': 11, 'dna_size': 1844853,
+              'num_contigs': 1, 'contig_ids': ['kb|g.399.c.1'],
+              'contig_lengths': [1844853], 'gc_content': 0.46734562,
+              'source': 'KBase', 'source_id': 'kb|g.399',
+              'taxonomy': 'Bacteria; Proteobacteria; Gammaproteobacteria; ' +
+                          'Vibrionales; Vibrionaceae; Vibrio',
+              'features': features}
+    info = [2, 'kb_g.399', 'KBaseGenomes.Genome-8.0',
+            '2017-10-25T00:00:00+0000', 1, 'user', 1, 'ws', 'chsum', 1, {}]
+    return {'result': [{'genomes': [{'data': genome, 'info': info}]}],
+            'version': '1.1', 'id': '12345'}
+
+
+def bench(func, arg, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.time()
+        func(arg)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    payload = build_payload(load_features(GBK_FILE))
+    text = jsoncodec.get_codec('json').dumps(payload)
+    mb = len(text) / 1024.0 / 1024.0
+    print('Payload: {} features, {:.1f} MB of JSON, best of {} runs'.format(
+        len(payload['result'][0]['genomes'][0]['data']['features']), mb,
+        repeats))
+    print('{:<12} {:>14} {:>14}'.format('codec', 'encode MB/s',
+                                       'decode MB/s'))
+    names = [n for n in jsoncodec.BACKENDS if jsoncodec._available(n)]
+    for name in names + ['auto']:
+        codec = jsoncodec.get_codec(name)
+        encode = bench(codec.dumps, payload, repeats)
+        decode = bench(codec.loads, text, repeats)
+        print('{:<12} {:>14.1f} {:>14.1f}   {!r}'.format(
+            name, mb / encode, mb / decode, codec))
+
+
+if __name__ == '__main__':
+    main()
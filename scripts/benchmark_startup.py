@@ -0,0 +1,95 @@
+'''
+Measures the cold start of the service: the time to import the server
+module, which builds the Impl, and the latency of the first and second
+requests afterwards. Each run uses a fresh interpreter.
+
+The server reads its config from KB_DEPLOYMENT_CONFIG. Run from the
+repository root with lib on the PYTHONPATH:
+
+    KB_DEPLOYMENT_CONFIG=deploy.cfg PYTHONPATH=lib \
+        python scripts/benchmark_startup.py [--runs N] [--ref REF] [--warmup]
+
+--ref also times get_feature_types on that genome, using the token in
+KB_AUTH_TOKEN. --warmup runs Application.warm_up after the import, as
+the server does when warmup is true, and reports how long it took.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_CHILD = r'''
+import json
+import os
+import sys
+import time
+from StringIO import StringIO
+
+ref, warmup = sys.argv[1] or None, sys.argv[2] == 'true'
+timings = {}
+start = time.time()
+from GenomeAnnotationAPI import GenomeAnnotationAPIServer as server
+timings['import'] = time.time() - start
+if warmup:
+    start = time.time()
+    server.application.warm_up()
+    timings['warm_up'] = time.time() - start
+
+
+def call(method, params):
+    body = json.dumps({'version': '1.1', 'id': '1', 'method': method,
+                       'params': params})
+    environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body)),
+               'wsgi.input': StringIO(body),
+               'REMOTE_ADDR': '127.0.0.1'}
+    if os.environ.get('KB_AUTH_TOKEN'):
+        environ['HTTP_AUTHORIZATION'] = os.environ['KB_AUTH_TOKEN']
+    status = []
+    start = time.time()
+    response = ''.join(server.application(
+        environ, lambda s, headers: status.append(s)))
+    elapsed = time.time() - start
+    if status[0] != '200 OK':
+        sys.stderr.write(response + '\n')
+    return elapsed
+
+timings['first_status'] = call('GenomeAnnotationAPI.status', [{}])
+timings['second_status'] = call('GenomeAnnotationAPI.status', [{}])
+if ref:
+    params = [{'ref': ref}]
+    timings['first_get_feature_types'] = call(
+        'GenomeAnnotationAPI.get_feature_types', params)
+    timings['second_get_feature_types'] = call(
+        'GenomeAnnotationAPI.get_feature_types', params)
+print(json.dumps(timings))
+'''
+
+
+def run_once(ref, warmup):
+    out = subprocess.check_output(
+        [sys.executable, '-c', _CHILD, ref or '', 'true' if warmup else ''],
+        env=os.environ)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--ref')
+    parser.add_argument('--warmup', action='store_true')
+    args = parser.parse_args()
+    if 'KB_DEPLOYMENT_CONFIG' not in os.environ:
+        sys.exit('KB_DEPLOYMENT_CONFIG must point to a deploy.cfg')
+
+    results = [run_once(args.ref, args.warmup) for _ in range(args.runs)]
+    print('{:<28}{:>10}{:>10}{:>10}'.format('seconds', 'min', 'median',
+                                           'max'))
+    for key in sorted(results[0]):
+        values = sorted(r[key] for r in results)
+        print('{:<28}{:>10.3f}{:>10.3f}{:>10.3f}'.format(
+            key, values[0], values[len(values) // 2], values[-1]))
+
+
+if __name__ == '__main__':
+    main()
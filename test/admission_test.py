@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+
+from GenomeAnnotationAPI.admission import MethodLimiter, parse_limits
+
+
+class AdmissionTest(unittest.TestCase):
+
+    def test_rejects_when_queue_full(self):
+        limiter = MethodLimiter(1, 0)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.rejected, 1)
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+
+    def test_queued_call_runs_when_slot_frees(self):
+        limiter = MethodLimiter(1, 1, queue_timeout=5)
+        self.assertTrue(limiter.acquire())
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(limiter.acquire()))
+        waiter.start()
+        while not limiter.waiting:
+            time.sleep(0.01)
+        # the queue is full now
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        waiter.join()
+        self.assertEqual(results, [True])
+        self.assertEqual(limiter.running, 1)
+        self.assertEqual(limiter.waiting, 0)
+
+    def test_queue_timeout(self):
+        limiter = MethodLimiter(1, 1, queue_timeout=0.05)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.waiting, 0)
+
+    def test_max_wait(self):
+        limiter = MethodLimiter(1, 1, queue_timeout=30)
+        self.assertTrue(limiter.acquire())
+        started = time.time()
+        self.assertFalse(limiter.acquire(0.05))
+        self.assertLess(time.time() - started, 5)
+        # a call whose deadline has passed only gets a free slot
+        self.assertFalse(limiter.acquire(-1))
+        self.assertEqual(limiter.rejected, 2)
+        limiter.release()
+        self.assertTrue(limiter.acquire(-1))
+
+    def test_parse_limits(self):
+        limiters = parse_limits('Mod.a:2:8, Mod.b:4', 10)
+        self.assertEqual(sorted(limiters), ['Mod.a', 'Mod.b'])
+        self.assertEqual(limiters['Mod.a'].max_concurrent, 2)
+        self.assertEqual(limiters['Mod.a'].max_queued, 8)
+        self.assertEqual(limiters['Mod.b'].max_queued, 0)
+        self.assertEqual(limiters['Mod.b'].queue_timeout, 10)
+        self.assertEqual(parse_limits(''), {})
+        self.assertRaises(ValueError, parse_limits, 'Mod.a')
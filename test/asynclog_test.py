@@ -0,0 +1,89 @@
+import logging
+import threading
+import unittest
+
+from GenomeAnnotationAPI.asynclog import (AsyncLog, BackgroundWriter,
+                                          QueueLogHandler)
+
+
+class FakeLog(object):
+
+    def __init__(self):
+        self.messages = []
+
+    def log_message(self, level, message, *args):
+        self.messages.append((level, message) + args)
+
+    def get_log_file(self):
+        return 'log.txt'
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class AsyncLogTest(unittest.TestCase):
+
+    def test_writes_in_order(self):
+        out = []
+        writer = BackgroundWriter(100)
+        for i in range(50):
+            self.assertTrue(writer.submit(out.append, i))
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(out, range(50))
+
+    def test_drops_and_reports_when_full(self):
+        release = threading.Event()
+        reports = []
+        writer = BackgroundWriter(2, reports.append)
+        writer.submit(release.wait)
+        # wait for the writer to pick up the blocking call
+        while writer._queue.qsize():
+            release.wait(0.01)
+        writer.submit(lambda: None)
+        writer.submit(lambda: None)
+        self.assertFalse(writer.submit(lambda: None))
+        self.assertEqual(writer.dropped, 1)
+        release.set()
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(reports, [1])
+
+    def test_sampling_is_per_call(self):
+        fake = FakeLog()
+        writer = BackgroundWriter(1000)
+        logger = AsyncLog(fake, writer, 0.5, ('start method', 'end method'))
+        for call_id in range(200):
+            logger.log_message(6, 'start method', None, 'u', 'M', 'm',
+                               str(call_id))
+            logger.log_message(6, 'end method', None, 'u', 'M', 'm',
+                               str(call_id))
+            logger.log_message(3, 'an error', None, 'u', 'M', 'm',
+                               str(call_id))
+        writer.flush(5)
+        starts = set(m[-1] for m in fake.messages if m[1] == 'start method')
+        ends = set(m[-1] for m in fake.messages if m[1] == 'end method')
+        errors = [m for m in fake.messages if m[1] == 'an error']
+        self.assertEqual(starts, ends)
+        self.assertTrue(0 < len(starts) < 200)
+        self.assertEqual(logger.sampled_out, 2 * (200 - len(starts)))
+        self.assertEqual(len(errors), 200)
+        self.assertEqual(logger.get_log_file(), 'log.txt')
+
+    def test_queue_log_handler(self):
+        target = ListHandler()
+        handler = QueueLogHandler(target)
+        logger = logging.getLogger('asynclog_test')
+        logger.addHandler(handler)
+        logger.propagate = False
+        args = ['a']
+        logger.warning('value %s', args)
+        args.append('b')
+        handler.writer.flush(5)
+        self.assertEqual(len(target.records), 1)
+        self.assertEqual(target.records[0].getMessage(), "value ['a']")
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from GenomeAnnotationAPI.authclient import (KBaseAuth, TokenCache,
+                                            InvalidTokenError, FileTokenStore)
+
+
+class SlowAuth(KBaseAuth):
+    '''Counts validations, which block until released.'''
+
+    def __init__(self, user=None, error=None, wait_timeout=60,
+                 reject_cache_ttl=10):
+        KBaseAuth.__init__(self, 'http://localhost/auth', wait_timeout,
+                           reject_cache_ttl=reject_cache_ttl)
+        self.calls = 0
+        self.release = threading.Event()
+        self._user = user
+        self._error = error
+
+    def _validate_token(self, token):
+        self.calls += 1
+        self.release.wait()
+        if self._error:
+            raise self._error
+        self._cache.add_valid_token(token, self._user)
+        return self._user
+
+
+def _call_concurrently(auth, count):
+    results = []
+
+    def get_user():
+        try:
+            results.append(auth.get_user('token'))
+        except Exception as e:
+            results.append(e)
+    threads = [threading.Thread(target=get_user) for _ in range(count)]
+    for t in threads:
+        t.start()
+    # let all the callers find the validation in progress
+    time.sleep(0.2)
+    auth.release.set()
+    for t in threads:
+        t.join()
+    return results
+
+
+class KBaseAuthTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_validation(self):
+        auth = SlowAuth(user='someuser')
+        results = _call_concurrently(auth, 5)
+        self.assertEqual(results, ['someuser'] * 5)
+        self.assertEqual(auth.calls, 1)
+        self.assertEqual(auth.get_user('token'), 'someuser')
+        self.assertEqual(auth.calls, 1)
+
+    def test_failure_is_shared(self):
+        error = ValueError('Error connecting to auth service')
+        auth = SlowAuth(error=error)
+        results = _call_concurrently(auth, 5)
+        self.assertEqual(results, [error] * 5)
+        self.assertEqual(auth.calls, 1)
+        # the failure isn't remembered
+        auth._error = None
+        auth._user = 'someuser'
+        self.assertEqual(auth.get_user('token'), 'someuser')
+        self.assertEqual(auth.calls, 2)
+
+    def test_rejected_token_fails_fast(self):
+        auth = SlowAuth(error=InvalidTokenError('Invalid token'),
+                        reject_cache_ttl=0.2)
+        auth.release.set()
+        for _ in range(3):
+            with self.assertRaises(InvalidTokenError) as cm:
+                auth.get_user('token')
+            self.assertEqual(str(cm.exception), 'Invalid token')
+        self.assertEqual(auth.calls, 1)
+        # once the rejection expires the token is checked again
+        time.sleep(0.3)
+        auth._error = None
+        auth._user = 'someuser'
+        self.assertEqual(auth.get_user('token'), 'someuser')
+        self.assertEqual(auth.calls, 2)
+
+    def test_waiter_timeout(self):
+        auth = SlowAuth(user='someuser', wait_timeout=0.1)
+        first = threading.Thread(target=auth.get_user, args=('token',))
+        first.start()
+        time.sleep(0.05)
+        with self.assertRaises(ValueError) as cm:
+            auth.get_user('token')
+        self.assertIn('Timed out after 0.1 seconds', str(cm.exception))
+        auth.release.set()
+        first.join()
+
+
+class BrokenStore(object):
+
+    def get(self, key):
+        raise IOError('store is down')
+
+    def set(self, key, user, expires):
+        raise IOError('store is down')
+
+
+class TokenCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_shared_store(self):
+        worker1 = TokenCache(store=FileTokenStore(self.dir))
+        worker2 = TokenCache(store=FileTokenStore(self.dir))
+        worker1.add_valid_token('a', 'usera')
+        self.assertEqual(worker2.get_user('a'), 'usera')
+        self.assertEqual(worker2.store_hits, 1)
+        self.assertEqual(worker2.get_user('a'), 'usera')
+        self.assertEqual(worker2.hits, 1)
+        self.assertIsNone(worker2.get_user('b'))
+        # only the token hash is written
+        self.assertEqual(os.listdir(self.dir),
+                         [hashlib.sha256('a').hexdigest()])
+
+    def test_shared_store_expiry(self):
+        worker1 = TokenCache(ttl=0.05, store=FileTokenStore(self.dir))
+        worker2 = TokenCache(store=FileTokenStore(self.dir))
+        worker1.add_valid_token('a', 'usera')
+        time.sleep(0.1)
+        self.assertIsNone(worker2.get_user('a'))
+
+    def test_file_store_directory_is_private(self):
+        path = os.path.join(self.dir, 'tokens')
+        FileTokenStore(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+        os.chmod(path, 0o770)
+        with self.assertRaises(ValueError):
+            FileTokenStore(path)
+        os.chmod(path, 0o757)
+        with self.assertRaises(ValueError):
+            FileTokenStore(path)
+
+    def test_file_store_directory_owner(self):
+        if os.getuid() != 0:
+            self.skipTest('changing the owner needs root')
+        os.chown(self.dir, 1, -1)
+        with self.assertRaises(ValueError):
+            FileTokenStore(self.dir)
+
+    def test_store_errors_are_misses(self):
+        cache = TokenCache(store=BrokenStore())
+        cache.add_valid_token('a', 'usera')
+        self.assertEqual(cache.get_user('a'), 'usera')
+        self.assertIsNone(cache.get_user('b'))
+
+    def test_lru_eviction(self):
+        cache = TokenCache(maxsize=2)
+        cache.add_valid_token('a', 'usera')
+        cache.add_valid_token('b', 'userb')
+        self.assertEqual(cache.get_user('a'), 'usera')  # 'b' is now LRU
+        cache.add_valid_token('c', 'userc')
+        self.assertIsNone(cache.get_user('b'))
+        self.assertEqual(cache.get_user('a'), 'usera')
+        self.assertEqual(cache.get_user('c'), 'userc')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions),
+                         (3, 1, 1))
+
+    def test_ttl(self):
+        cache = TokenCache(ttl=0.05)
+        cache.add_valid_token('a', 'usera')
+        self.assertEqual(cache.get_user('a'), 'usera')
+        time.sleep(0.1)
+        self.assertIsNone(cache.get_user('a'))
+        self.assertEqual(len(cache), 0)
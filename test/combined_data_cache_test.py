@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from GenomeAnnotationAPI.CombinedDataCache import CombinedDataCache
+
+
+class CombinedDataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = os.path.join(tempfile.mkdtemp(), 'combined_data')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.dir))
+
+    def files(self):
+        return [n for n in os.listdir(self.dir) if not n.startswith('.')]
+
+    def test_put_and_get(self):
+        cache = CombinedDataCache(self.dir, 1024 * 1024)
+        self.assertIsNone(cache.get('1/2/3'))
+        value = {'feature_types': ['gene'], 'summary': {'gc_content': 0.1 + 0.2}}
+        cache.put('1/2/3', value)
+        self.assertEqual(cache.get('1/2/3'), value)
+        self.assertIsNone(cache.get('1/2/4'))
+        # shared with other processes through the directory
+        self.assertEqual(CombinedDataCache(self.dir, 1024 * 1024).get('1/2/3'), value)
+
+    def test_evicts_least_recently_used(self):
+        value = {'features': [str(i) * 20 for i in range(200)]}
+        cache = CombinedDataCache(self.dir, 1024 * 1024)
+        cache.put('a', value)
+        size = os.path.getsize(os.path.join(self.dir, self.files()[0]))
+        cache = CombinedDataCache(self.dir, size * 2)
+        cache.put('b', value)
+        past = time.time() - 100
+        for name in self.files():
+            os.utime(os.path.join(self.dir, name), (past, past))
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', value)
+        self.assertEqual(len(self.files()), 2)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = CombinedDataCache(self.dir, 1024 * 1024)
+        cache.put('a', {'x': 1})
+        path = os.path.join(self.dir, self.files()[0])
+        with open(path, 'wb') as f:
+            f.write('not gzip')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(self.files(), [])
+
+    def test_disabled(self):
+        cache = CombinedDataCache(self.dir, 0)
+        cache.put('a', {'x': 1})
+        self.assertIsNone(cache.get('a'))
+        self.assertFalse(os.path.exists(self.dir))
+        CombinedDataCache(None, 0).put('a', {'x': 1})
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, CombinedDataCache, self.dir, -1)
+        self.assertRaises(ValueError, CombinedDataCache, None, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
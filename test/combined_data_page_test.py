@@ -0,0 +1,188 @@
+import unittest
+
+from GenomeAnnotationAPI.GenomeAnnotationAPIImpl import GenomeAnnotationAPI
+
+FEATURES = {
+    'gene': ['g3', 'g1', 'g2'],
+    'mRNA': ['m1', 'm2', 'm3'],
+    'CDS': ['c2', 'c1', 'c3'],
+    'ncRNA': ['n1'],
+}
+
+
+class FakeWorkspace(object):
+
+    def get_object_info_new(self, params):
+        # every ref resolves to version 4 of object 2 in workspace 1
+        return [[2, 'genome', 'KBaseGenomeAnnotations.GenomeAnnotation-3.1',
+                 None, 4, None, 1] for _ in params['objects']]
+
+
+class FakeGenomeAnnotation(object):
+
+    def __init__(self):
+        self.type_lists = []
+        self.protein_reads = 0
+
+    def get_feature_types(self):
+        return sorted(FEATURES)
+
+    def get_feature_ids(self, filters):
+        self.type_lists.append(sorted(filters['type_list']))
+        return {'by_type': dict((t, list(FEATURES[t]))
+                                for t in filters['type_list'] if t in FEATURES)}
+
+    def get_features(self, feature_id_list=None, exclude_sequence=False):
+        return dict((i, {'feature_id': i, 'feature_type': i[0]})
+                    for i in feature_id_list)
+
+    def get_proteins(self):
+        self.protein_reads += 1
+        return dict((i, {'protein_id': 'p' + i}) for i in FEATURES['CDS'])
+
+    def get_mrna_by_gene(self, gene_ids=None):
+        return dict((i, ['m' + i[1:]]) for i in gene_ids or FEATURES['gene'])
+
+    def get_cds_by_gene(self, gene_ids=None):
+        return dict((i, ['c' + i[1:]]) for i in gene_ids or FEATURES['gene'])
+
+    def get_cds_by_mrna(self, mrna_ids=None):
+        return dict((i, 'c' + i[1:]) for i in mrna_ids or FEATURES['mRNA'])
+
+    def get_mrna_exons(self, mrna_ids=None):
+        return dict((i, []) for i in mrna_ids or FEATURES['mRNA'])
+
+    def get_mrna_utrs(self, mrna_ids=None):
+        return dict((i, {}) for i in mrna_ids or FEATURES['mRNA'])
+
+    def get_summary(self):
+        return {'annotation': {'feature_type_counts': {'gene': 3}}}
+
+
+class CombinedDataPageTest(unittest.TestCase):
+
+    def setUp(self):
+        config = {'workspace-url': 'http://localhost', 'shock-url': '',
+                  'handle-service-url': '', 'service-wizard-url': '',
+                  'combined_data_workers': '1'}
+        self.impl = GenomeAnnotationAPI(config)
+        self.impl._workspace = lambda ctx: FakeWorkspace()
+        self.ga = FakeGenomeAnnotation()
+        self.impl._get_genome_annotation = \
+            lambda ctx, ref, object_info=None: self.ga
+        self.ctx = {'token': 'token'}
+        self.params = {'ref': 'ws/genome', 'include_mrnas': 1,
+                       'include_protein_by_cds_id': 1,
+                       'include_mrna_ids_by_gene_id': 1,
+                       'include_cds_id_by_mrna_id': 1,
+                       'include_exons_by_mrna_id': 1}
+
+    def read_pages(self, page_size):
+        pages = []
+        cursor = None
+        while True:
+            params = dict(self.params, page_size=page_size)
+            if cursor:
+                params['cursor'] = cursor
+            page = self.impl.get_combined_data_page(self.ctx, params)[0]
+            pages.append(page)
+            cursor = page.get('next_cursor')
+            if not cursor:
+                return pages
+
+    def test_pages_add_up_to_combined_data(self):
+        full = self.impl.get_combined_data(self.ctx, dict(self.params))[0]
+        pages = self.read_pages(2)
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(pages[0]['total_features'], 9)
+        self.assertEqual(pages[0]['data']['feature_types'], full['feature_types'])
+        self.assertEqual(pages[0]['data']['summary'], full['summary'])
+        for page in pages[1:]:
+            self.assertNotIn('feature_types', page['data'])
+            self.assertNotIn('summary', page['data'])
+        for section in full:
+            if section in ('feature_types', 'summary'):
+                continue
+            if section == 'feature_by_id_by_type':
+                merged = {}
+                for page in pages:
+                    for t, features in page['data'][section].items():
+                        merged.setdefault(t, {}).update(features)
+            elif isinstance(full[section], dict):
+                merged = {}
+                for page in pages:
+                    merged.update(page['data'][section])
+            else:
+                merged = pages[0]['data'][section]
+            self.assertEqual(merged, full[section], section)
+
+    def test_ids_are_read_once(self):
+        self.read_pages(2)
+        self.assertEqual(self.ga.type_lists, [['CDS', 'gene', 'mRNA']])
+
+    def test_proteins_are_opt_in(self):
+        del self.params['include_protein_by_cds_id']
+        pages = self.read_pages(2)
+        self.assertEqual(self.ga.protein_reads, 0)
+        for page in pages:
+            self.assertNotIn('protein_by_cds_id', page['data'])
+        self.params['include_protein_by_cds_id'] = 1
+        self.read_pages(2)
+        # once for each page with CDSs on it
+        self.assertEqual(self.ga.protein_reads, 2)
+
+    def test_combined_data_only_loads_needed_types(self):
+        self.impl.get_combined_data(self.ctx, dict(self.params))
+        self.assertEqual(self.ga.type_lists, [['CDS', 'gene', 'mRNA']])
+        self.ga.type_lists = []
+        result = self.impl.get_combined_data(self.ctx, {
+            'ref': 'ws/genome', 'include_features_by_type': [],
+            'exclude_cds_ids_by_gene_id': 1})[0]
+        self.assertEqual(self.ga.type_lists, [])
+        self.assertEqual(result['feature_by_id_by_type'], {})
+        self.assertEqual(result['feature_types'], sorted(FEATURES))
+
+    def test_feature_fields(self):
+        params = dict(self.params, included_feature_fields=['feature_type'])
+        result = self.impl.get_combined_data(self.ctx, params)[0]
+        self.assertEqual(result['feature_by_id_by_type']['gene']['g1'],
+                         {'feature_type': 'g'})
+        page = self.impl.get_combined_data_page(self.ctx, params)[0]
+        self.assertEqual(page['data']['feature_by_id_by_type']['CDS']['c1'],
+                         {'feature_type': 'c'})
+
+    def test_pages_are_ordered_by_type_and_id(self):
+        ids = []
+        for page in self.read_pages(4):
+            by_type = page['data']['feature_by_id_by_type']
+            for t in sorted(by_type):
+                ids.extend(sorted(by_type[t]))
+        self.assertEqual(ids, ['c1', 'c2', 'c3', 'g1', 'g2', 'g3',
+                               'm1', 'm2', 'm3'])
+
+    def test_page_size_larger_than_genome(self):
+        pages = self.read_pages(100)
+        self.assertEqual(len(pages), 1)
+        self.assertNotIn('next_cursor', pages[0])
+
+    def test_cursor_for_other_sections_is_rejected(self):
+        page = self.impl.get_combined_data_page(
+            self.ctx, dict(self.params, page_size=2))[0]
+        params = {'ref': 'ws/genome', 'cursor': page['next_cursor']}
+        with self.assertRaises(ValueError):
+            self.impl.get_combined_data_page(self.ctx, params)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.impl.get_combined_data_page(
+                self.ctx, {'ref': 'ws/genome', 'cursor': 'not a cursor'})
+        with self.assertRaises(ValueError):
+            self.impl.get_combined_data_page(
+                self.ctx, {'ref': 'ws/genome', 'cursor': 5})
+        with self.assertRaises(ValueError):
+            self.impl.get_combined_data_page(
+                self.ctx, {'ref': 'ws/genome', 'page_size': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
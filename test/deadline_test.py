@@ -0,0 +1,27 @@
+import time
+import unittest
+
+from GenomeAnnotationAPI import deadline
+
+
+class DeadlineTest(unittest.TestCase):
+
+    def test_no_deadline(self):
+        self.assertIsNone(deadline.remaining({}))
+        deadline.check({'deadline': None})
+        self.assertEqual(deadline.timeout({}, 1800), 1800)
+        self.assertIsNone(deadline.timeout({}))
+
+    def test_timeout_is_capped(self):
+        ctx = {'deadline': time.time() + 10.5}
+        self.assertEqual(deadline.timeout(ctx, 1800), 10)
+        self.assertEqual(deadline.timeout(ctx, 5), 5)
+        self.assertEqual(deadline.timeout(ctx), 10)
+        ctx = {'deadline': time.time() + 0.2}
+        self.assertEqual(deadline.timeout(ctx, 1800), 1)
+
+    def test_expired(self):
+        ctx = {'deadline': time.time() - 1}
+        self.assertRaises(deadline.DeadlineExceeded, deadline.check, ctx)
+        self.assertRaises(deadline.DeadlineExceeded, deadline.timeout, ctx,
+                          1800)
@@ -0,0 +1,108 @@
+import unittest
+
+from GenomeAnnotationAPI.GenomeAnnotationAPIImpl import GenomeAnnotationAPI
+
+LEGACY_TYPE = 'KBaseGenomes.Genome-8.0'
+GA_TYPE = 'KBaseGenomeAnnotations.GenomeAnnotation-3.1'
+
+
+class FakeWorkspace(object):
+
+    def __init__(self, object_type):
+        self.object_type = object_type
+        self.included = []
+
+    def get_object_info_new(self, params):
+        return [[2, 'genome', self.object_type, None, 4, None, 1]
+                for _ in params['objects']]
+
+    def get_objects2(self, params):
+        self.included.append(params['objects'][0]['included'])
+        return {'data': [{'data': {'features': [
+            {'id': 'g1', 'type': 'gene', 'function': 'kinase',
+             'location': [['contig1', 100, '+', 30]]},
+            {'id': 'g2', 'type': 'gene', 'location': []},
+        ]}}]}
+
+
+class FakeGenomeAnnotation(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def get_features(self, feature_id_list=None, exclude_sequence=False):
+        self.calls.append((feature_id_list, exclude_sequence))
+        features = {}
+        for feature_id in feature_id_list or ['g1', 'g2']:
+            features[feature_id] = {
+                'feature_id': feature_id, 'feature_type': 'gene',
+                'feature_aliases': {'alias': ['source']}, 'feature_md5': 'md5'}
+            if not exclude_sequence:
+                features[feature_id]['feature_dna_sequence'] = 'ACGT'
+        return features
+
+
+class FeatureFieldsTest(unittest.TestCase):
+
+    def setUp(self):
+        config = {'workspace-url': 'http://localhost', 'shock-url': '',
+                  'handle-service-url': '', 'service-wizard-url': ''}
+        self.impl = GenomeAnnotationAPI(config)
+        self.ws = FakeWorkspace(GA_TYPE)
+        self.ga = FakeGenomeAnnotation()
+        self.impl._workspace = lambda ctx: self.ws
+        self.impl._get_genome_annotation = \
+            lambda ctx, ref, object_info=None: self.ga
+        self.ctx = {'token': 'token', 'user_id': 'user'}
+
+    def get_features2(self, **params):
+        params['ref'] = 'ws/genome'
+        return self.impl.get_features2(self.ctx, params)[0]
+
+    def test_all_fields_by_default(self):
+        features = self.get_features2(feature_id_list=['g1'])
+        self.assertEqual(sorted(features['g1']),
+                         ['feature_aliases', 'feature_dna_sequence',
+                          'feature_id', 'feature_md5', 'feature_type'])
+        self.assertEqual(self.ga.calls, [(['g1'], False)])
+
+    def test_projection(self):
+        features = self.get_features2(
+            included_feature_fields=['feature_id', 'feature_aliases'])
+        self.assertEqual(features['g2'], {'feature_id': 'g2',
+                                          'feature_aliases': {'alias': ['source']}})
+        # sequences aren't fetched when they aren't wanted
+        self.assertEqual(self.ga.calls, [(None, True)])
+        self.get_features2(included_feature_fields=['feature_dna_sequence'])
+        self.assertEqual(self.ga.calls[1], (None, False))
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.get_features2(included_feature_fields=['feature_id', 'foo'])
+
+    def test_legacy_projection_uses_subdata(self):
+        self.ws.object_type = LEGACY_TYPE
+        features = self.get_features2(
+            feature_id_list=['g1'],
+            included_feature_fields=['feature_id', 'feature_function',
+                                     'feature_locations'])
+        self.assertEqual(self.ga.calls, [])
+        self.assertEqual(self.ws.included, [[
+            'features/[*]/id', 'features/[*]/function',
+            'features/[*]/location']])
+        self.assertEqual(features, {'g1': {
+            'feature_id': 'g1', 'feature_function': 'kinase',
+            'feature_locations': [{'contig_id': 'contig1', 'start': 100,
+                                   'strand': '+', 'length': 30}]}})
+
+    def test_legacy_projection_falls_back_to_data_api(self):
+        self.ws.object_type = LEGACY_TYPE
+        features = self.get_features2(
+            included_feature_fields=['feature_id', 'feature_aliases'])
+        self.assertEqual(self.ws.included, [])
+        self.assertEqual(sorted(features['g1']),
+                         ['feature_aliases', 'feature_id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
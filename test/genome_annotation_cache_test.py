@@ -0,0 +1,89 @@
+import time
+import unittest
+
+from GenomeAnnotationAPI.GenomeAnnotationCache import GenomeAnnotationCache
+from GenomeAnnotationAPI.GenomeAnnotationAPIImpl import GenomeAnnotationAPI
+
+
+class GenomeAnnotationCacheTest(unittest.TestCase):
+
+    def test_get_or_create_reuses_value(self):
+        cache = GenomeAnnotationCache(maxsize=2, ttl=60)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        first = cache.get_or_create(('1/2/3', 'user'), factory)
+        second = cache.get_or_create(('1/2/3', 'user'), factory)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        other_user = cache.get_or_create(('1/2/3', 'user2'), factory)
+        self.assertIsNot(first, other_user)
+        self.assertEqual(len(calls), 2)
+
+    def test_lru_eviction(self):
+        cache = GenomeAnnotationCache(maxsize=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now least recently used
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_ttl_expiry(self):
+        cache = GenomeAnnotationCache(maxsize=2, ttl=0.05)
+        cache.put('a', 1)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        cache = GenomeAnnotationCache(maxsize=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+
+class FakeWorkspace(object):
+
+    def get_object_info_new(self, params):
+        return [[2, 'genome', 'KBaseGenomeAnnotations.GenomeAnnotation-3.1',
+                 None, 4, None, 1] for _ in params['objects']]
+
+
+class FakeGenomeAnnotation(object):
+
+    def __init__(self, services, token, ref):
+        self.token = token
+        self.ref = ref
+
+
+class ImplCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        config = {'workspace-url': 'http://localhost', 'shock-url': '',
+                  'handle-service-url': '', 'service-wizard-url': ''}
+        self.impl = GenomeAnnotationAPI(config)
+        self.impl._workspace = lambda ctx: FakeWorkspace()
+        self.impl._load_data_api = lambda: FakeGenomeAnnotation
+
+    def get(self, token):
+        ctx = {'token': token, 'user_id': 'user'}
+        return self.impl._get_genome_annotation(ctx, 'ws/genome')
+
+    def test_keyed_by_token(self):
+        first = self.get('token1')
+        self.assertEqual(first.ref, '1/2/4')
+        self.assertIs(self.get('token1'), first)
+        # the same user with a new token never gets an object holding the
+        # old one
+        second = self.get('token2')
+        self.assertIsNot(second, first)
+        self.assertEqual(second.token, 'token2')
+        self.assertEqual(self.get('token1').token, 'token1')
+        # and the raw token is not kept in the keys
+        keys = self.impl.genome_annotation_cache._cache.keys()
+        self.assertNotIn('token1', repr(keys))
@@ -0,0 +1,42 @@
+import json
+import unittest
+
+from GenomeAnnotationAPI import jsoncodec
+
+
+class _JSONable(object):
+
+    def toJSONable(self):
+        return {'a': 1}
+
+
+class JSONCodecTest(unittest.TestCase):
+
+    def codecs(self):
+        names = [n for n in jsoncodec.BACKENDS if jsoncodec._available(n)]
+        return [jsoncodec.get_codec(n) for n in names + ['auto']]
+
+    def test_round_trip(self):
+        data = {'id': 'kb|g.399.peg.1', 'gc_content': 0.1 + 0.2,
+                'location': [['kb|g.399.c.1', 10, '+', 300]],
+                'name': u'\xe9', 'url': 'http://kbase.us/a/b'}
+        for codec in self.codecs():
+            encoded = codec.dumps(data)
+            self.assertEqual(json.loads(encoded), data, repr(codec))
+            self.assertEqual(codec.loads(encoded), data, repr(codec))
+
+    def test_sets_and_jsonable(self):
+        data = {'s': set([1]), 'f': frozenset([2]), 'j': _JSONable()}
+        for codec in self.codecs():
+            self.assertEqual(json.loads(codec.dumps(data)),
+                             {'s': [1], 'f': [2], 'j': {'a': 1}},
+                             repr(codec))
+            self.assertEqual(json.loads(''.join(codec.iterencode(data))),
+                             {'s': [1], 'f': [2], 'j': {'a': 1}})
+
+    def test_unserializable(self):
+        for codec in self.codecs():
+            self.assertRaises(TypeError, codec.dumps, {'o': object()})
+
+    def test_unknown_codec(self):
+        self.assertRaises(ValueError, jsoncodec.get_codec, 'fastjson')
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from GenomeAnnotationAPI.metrics import MethodMetrics
+
+
+class MethodMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_render_single_process(self):
+        metrics = MethodMetrics('test')
+        metrics.start('Mod.a')
+        metrics.finish('Mod.a', 0.02, 100, 2048, False)
+        metrics.start('Mod.a')
+        metrics.finish('Mod.a', 3, 100, 10, True)
+        metrics.start('Mod.b')
+        text = metrics.render()
+        self.assertIn('test_request_duration_seconds_bucket' +
+                      '{method="Mod.a",le="0.025"} 1\n', text)
+        self.assertIn('test_request_duration_seconds_bucket' +
+                      '{method="Mod.a",le="+Inf"} 2\n', text)
+        self.assertIn('test_request_duration_seconds_count' +
+                      '{method="Mod.a"} 2\n', text)
+        self.assertIn('test_response_size_bytes_bucket' +
+                      '{method="Mod.a",le="1024"} 1\n', text)
+        self.assertIn('test_requests_total{method="Mod.a"} 2\n', text)
+        self.assertIn('test_request_errors_total{method="Mod.a"} 1\n', text)
+        self.assertIn('test_requests_in_flight{method="Mod.a"} 0\n', text)
+        self.assertIn('test_requests_in_flight{method="Mod.b"} 1\n', text)
+
+    def test_aggregates_worker_snapshots(self):
+        metrics = MethodMetrics('test', self.dir)
+        metrics.start('Mod.a')
+        metrics.finish('Mod.a', 0.5, 10, 10, False)
+        metrics.start('Mod.a')
+        # a snapshot left behind by another worker that has since exited
+        other = MethodMetrics('test')
+        other.start('Mod.a')
+        other.finish('Mod.a', 0.5, 10, 10, True)
+        other.start('Mod.a')
+        snapshot = json.dumps(other._methods)
+        with open(os.path.join(self.dir, 'metrics-999999999.json'),
+                  'w') as f:
+            f.write(snapshot)
+        text = metrics.render()
+        self.assertIn('test_requests_total{method="Mod.a"} 2\n', text)
+        self.assertIn('test_request_errors_total{method="Mod.a"} 1\n', text)
+        self.assertIn('test_request_duration_seconds_sum' +
+                      '{method="Mod.a"} 1.0\n', text)
+        self.assertIn('test_requests_in_flight{method="Mod.a"} 1\n', text)
+
+    def test_write_errors_are_ignored(self):
+        metrics = MethodMetrics('test', os.path.join(self.dir, 'metrics'), 0)
+        shutil.rmtree(os.path.join(self.dir, 'metrics'))
+        metrics.start('Mod.a')
+        metrics.finish('Mod.a', 0.5, 10, 10, False)
+        metrics.flush()
+        self.assertEqual(metrics._methods['Mod.a']['requests'], 1)
+        self.assertEqual(metrics._methods['Mod.a']['in_flight'], 0)
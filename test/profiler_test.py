@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from GenomeAnnotationAPI.profiler import CallProfiler
+
+
+class Context(dict):
+
+    def log_err(self, message):
+        self.setdefault('errors', []).append(message)
+
+
+class CallProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_wanted(self):
+        profiler = CallProfiler(self.dir)
+        self.assertFalse(profiler.wanted(Context()))
+        self.assertTrue(profiler.wanted(Context(profile=True)))
+        self.assertTrue(CallProfiler(self.dir, 1).wanted(Context()))
+        self.assertRaises(ValueError, CallProfiler, self.dir, 2)
+
+    def test_run_writes_profile_and_summary(self):
+        out = os.path.join(self.dir, 'profiles')
+        profiler = CallProfiler(out, top_n=5)
+        ctx = Context(user_id='someuser', call_id='1')
+        result = profiler.run(ctx, 'Mod.method/../x', sorted, [3, 1, 2])
+        self.assertEqual(result, [1, 2, 3])
+        files = sorted(os.listdir(out))
+        self.assertEqual(len(files), 2)
+        self.assertTrue(files[0].endswith('_Mod.method_.._x.prof'))
+        with open(os.path.join(out, files[1])) as f:
+            summary = f.read()
+        self.assertIn('method: Mod.method/../x', summary)
+        self.assertIn('user: someuser', summary)
+        self.assertNotIn('errors', ctx)
+
+    def test_run_raises_method_error(self):
+        profiler = CallProfiler(self.dir)
+
+        def fail():
+            raise KeyError('x')
+        self.assertRaises(KeyError, profiler.run, Context(), 'm', fail)
+        self.assertEqual(len(os.listdir(self.dir)), 2)
@@ -0,0 +1,443 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zlib
+from StringIO import StringIO
+
+from GenomeAnnotationAPI import GenomeAnnotationAPIServer as server
+from GenomeAnnotationAPI.GenomeAnnotationAPIServer import Application
+from GenomeAnnotationAPI.admission import MethodLimiter
+from GenomeAnnotationAPI.metrics import MethodMetrics
+
+
+class FakeAuth(object):
+
+    def __init__(self):
+        self.tokens = []
+
+    def get_user(self, token):
+        self.tokens.append(token)
+        if token != 'good token':
+            raise ValueError('bad token')
+        return 'user'
+
+
+class FakeImpl(object):
+
+    def __init__(self):
+        self.contexts = []
+
+    def echo(self, ctx, params):
+        self.contexts.append(dict(ctx))
+        return [params]
+
+    def fail(self, ctx, params):
+        raise ValueError('no such genome')
+
+
+def rpc(method, params, id=None, **kwargs):
+    req = {'version': '1.1', 'method': 'GenomeAnnotationAPI.' + method,
+           'params': [params]}
+    if id is not None:
+        req['id'] = id
+    req.update(kwargs)
+    return req
+
+
+class ServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Application()
+        self.app.auth_client = FakeAuth()
+        self.impl = FakeImpl()
+        for name, auth in (('echo', 'required'), ('fail', 'required'),
+                           ('ping', 'none')):
+            method = self.impl.fail if name == 'fail' else self.impl.echo
+            self.app.rpc_service.add(
+                method, name='GenomeAnnotationAPI.' + name, types=[dict])
+            self.app.method_authentication[
+                'GenomeAnnotationAPI.' + name] = auth
+
+    def post(self, body, **headers):
+        if not isinstance(body, basestring):
+            body = json.dumps(body)
+        environ = {'REQUEST_METHOD': 'POST', 'REMOTE_ADDR': '127.0.0.1',
+                   'CONTENT_LENGTH': str(len(body)),
+                   'wsgi.input': StringIO(body)}
+        environ.update(headers)
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = status
+            response['headers'] = dict(response_headers)
+
+        response['chunks'] = list(self.app(environ, start_response))
+        response['body'] = ''.join(response['chunks'])
+        return response
+
+
+class BatchTest(ServerTestCase):
+
+    def test_mixed_batch(self):
+        self.app.rpc_service._batch_workers = 4
+        response = self.post([
+            rpc('echo', {'n': 1}, 1, context={'timeout': 30}),
+            rpc('no_such_method', {}, 2),
+            rpc('echo', {'n': 'notification'}),
+            rpc('fail', {}, 3),
+            rpc('echo', {'n': 4}, 4),
+        ], HTTP_AUTHORIZATION='good token')
+        self.assertEqual(response['status'], '200 OK')
+        responds = json.loads(response['body'])
+        self.assertEqual([r['id'] for r in responds], [1, 2, 3, 4])
+        self.assertEqual(responds[0]['result'], [{'n': 1}])
+        self.assertNotIn('error', responds[0])
+        self.assertEqual(responds[1]['error']['code'], -32601)
+        self.assertEqual(responds[2]['error']['message'], 'no such genome')
+        self.assertEqual(responds[3]['result'], [{'n': 4}])
+        # the token is validated once for the whole batch
+        self.assertEqual(self.app.auth_client.tokens, ['good token'])
+        # the notification ran, and every element had its own context
+        contexts = sorted(self.impl.contexts,
+                          key=lambda c: c['provenance'][0]['method_params'])
+        self.assertEqual([c['call_id'] for c in contexts], [1, 4, None])
+        self.assertEqual([c['provenance'][0]['method_params'][0]['n']
+                          for c in contexts], [1, 4, 'notification'])
+        for ctx in contexts:
+            self.assertEqual(ctx['method'], 'echo')
+            self.assertEqual(ctx['user_id'], 'user')
+            self.assertEqual(ctx['token'], 'good token')
+        self.assertIsNotNone(contexts[0]['deadline'])
+        if self.app.max_request_time is None:
+            self.assertIsNone(contexts[1]['deadline'])
+
+    def test_authentication_per_element(self):
+        responds = json.loads(self.post([
+            rpc('ping', {}, 1), rpc('echo', {}, 2)])['body'])
+        self.assertEqual(responds[0]['result'], [{}])
+        self.assertIn('Authentication required',
+                      responds[1]['error']['message'])
+        responds = json.loads(self.post(
+            [rpc('echo', {}, 1), rpc('echo', {}, 2)],
+            HTTP_AUTHORIZATION='bad token')['body'])
+        for respond in responds:
+            self.assertIn('Token validation failed',
+                          respond['error']['message'])
+        self.assertEqual(self.app.auth_client.tokens, ['bad token'])
+
+    def test_invalid_elements(self):
+        responds = json.loads(self.post(
+            [rpc('ping', {}, 1), 'not a request', {'id': 3}])['body'])
+        self.assertEqual(responds[0]['result'], [{}])
+        self.assertEqual(responds[1]['error']['code'], -32600)
+        self.assertEqual(responds[2]['error']['code'], -32600)
+        self.assertEqual(responds[2]['id'], 3)
+
+    def test_notifications_only(self):
+        response = self.post([rpc('ping', {})])
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['body'], '')
+
+    def test_empty_batch(self):
+        response = self.post([])
+        self.assertNotEqual(response['status'], '200 OK')
+        self.assertEqual(json.loads(response['body'])['error']['code'],
+                         -32600)
+
+
+class StreamingTest(ServerTestCase):
+
+    PARAMS = {'features': dict(('g{}'.format(i), {'n': i, 'x': 1.5,
+                                                  'aliases': ['a', u'\xe9']})
+                               for i in range(50))}
+
+    def post_both(self, body):
+        self.app.stream_responses = False
+        buffered = self.post(body, HTTP_AUTHORIZATION='good token')
+        self.app.stream_responses = True
+        self.app.stream_chunk_size = 64
+        streamed = self.post(body, HTTP_AUTHORIZATION='good token')
+        self.assertEqual(streamed['status'], buffered['status'])
+        return buffered, streamed
+
+    def test_streamed_equals_buffered(self):
+        buffered, streamed = self.post_both(rpc('echo', self.PARAMS, 1))
+        self.assertGreater(len(streamed['chunks']), 1)
+        self.assertNotIn('content-length', streamed['headers'])
+        self.assertEqual(json.loads(streamed['body']),
+                         json.loads(buffered['body']))
+        self.assertEqual(json.loads(streamed['body'])['result'],
+                         [self.PARAMS])
+
+    def test_streamed_batch_equals_buffered(self):
+        buffered, streamed = self.post_both(
+            [rpc('echo', self.PARAMS, 1), rpc('fail', {}, 2)])
+        self.assertEqual(json.loads(streamed['body']),
+                         json.loads(buffered['body']))
+
+    def test_errors_are_not_streamed(self):
+        buffered, streamed = self.post_both(rpc('fail', {}, 1))
+        self.assertEqual(streamed['body'], buffered['body'])
+        self.assertEqual(streamed['headers']['content-length'],
+                         str(len(buffered['body'])))
+
+
+class CompressionTest(ServerTestCase):
+
+    LARGE = {'data': ['ACGT' * 25] * 20}
+
+    def setUp(self):
+        ServerTestCase.setUp(self)
+        self.app.compression_min_size = 1024
+
+    def echo(self, params, **headers):
+        return self.post(rpc('echo', params, 1),
+                         HTTP_AUTHORIZATION='good token', **headers)
+
+    def check_compressed(self, response, encoding, wbits):
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Encoding'], encoding)
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        body = zlib.decompress(response['body'], wbits)
+        self.assertEqual(json.loads(body)['result'], [self.LARGE])
+        self.assertLess(len(response['body']), len(body))
+        return body
+
+    def test_gzip_and_deflate(self):
+        plain = self.echo(self.LARGE)
+        self.assertNotIn('Content-Encoding', plain['headers'])
+        body = self.check_compressed(
+            self.echo(self.LARGE, HTTP_ACCEPT_ENCODING='gzip, deflate'),
+            'gzip', 16 + zlib.MAX_WBITS)
+        self.assertEqual(json.loads(body), json.loads(plain['body']))
+        self.check_compressed(
+            self.echo(self.LARGE, HTTP_ACCEPT_ENCODING='deflate'),
+            'deflate', zlib.MAX_WBITS)
+
+    def test_streamed(self):
+        self.app.stream_responses = True
+        self.app.stream_chunk_size = 64
+        self.check_compressed(
+            self.echo(self.LARGE, HTTP_ACCEPT_ENCODING='gzip'),
+            'gzip', 16 + zlib.MAX_WBITS)
+        # a small streamed body is buffered and sent as is
+        response = self.echo({'n': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response['headers'])
+        self.assertEqual(json.loads(response['body'])['result'], [{'n': 1}])
+
+    def test_not_accepted(self):
+        for header in ('identity', 'gzip;q=0, deflate;q=0', '*;q=0'):
+            response = self.echo(self.LARGE, HTTP_ACCEPT_ENCODING=header)
+            self.assertNotIn('Content-Encoding', response['headers'])
+            self.assertEqual(json.loads(response['body'])['result'],
+                             [self.LARGE])
+
+    def test_below_threshold(self):
+        response = self.echo({'n': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response['headers'])
+        self.assertEqual(json.loads(response['body'])['result'], [{'n': 1}])
+
+    def test_disabled(self):
+        self.app.compression_min_size = None
+        response = self.echo(self.LARGE, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response['headers'])
+        self.assertNotIn('Vary', response['headers'])
+
+
+class LargeRequestTest(ServerTestCase):
+
+    PARAMS = {'ints': range(100), 'floats': [0.1, 1e-300, -2.5, 1e20],
+              'text': u'caf\xe9 \u2603 "quoted"\n', 'flags': [True, None],
+              'nested': {'a': [{'b': {}}, []], 'c': {'d': [[1], [2.0]]}}}
+
+    def setUp(self):
+        ServerTestCase.setUp(self)
+        self.scratch = tempfile.mkdtemp()
+        self.app.scratch = self.scratch
+
+    def tearDown(self):
+        shutil.rmtree(self.scratch)
+
+    def read_request(self, body):
+        environ = {'wsgi.input': StringIO(body)}
+        return self.app._read_request(environ, len(body))
+
+    def test_staged_parse_equals_small(self):
+        for body in (json.dumps(rpc('echo', self.PARAMS, 1)),
+                     json.dumps([rpc('echo', self.PARAMS, 1),
+                                 rpc('ping', {}, 2)])):
+            small = self.read_request(body)
+            self.app.large_request_size = 16
+            self.assertEqual(self.read_request(body), small)
+            self.app.large_request_size = 16 * 1024 * 1024
+        # the staged copy is removed
+        self.assertEqual(os.listdir(self.scratch), [])
+
+    def test_staged_request(self):
+        small = self.post(rpc('echo', self.PARAMS, 1),
+                          HTTP_AUTHORIZATION='good token')
+        self.app.large_request_size = 16
+        large = self.post(rpc('echo', self.PARAMS, 1),
+                          HTTP_AUTHORIZATION='good token')
+        self.assertEqual(large['status'], '200 OK')
+        self.assertEqual(large['body'], small['body'])
+        self.assertEqual(json.loads(large['body'])['result'], [self.PARAMS])
+
+    def test_staged_parse_error(self):
+        self.app.large_request_size = 16
+        response = self.post('{"method": "GenomeAnnotationAPI.echo", ')
+        self.assertEqual(json.loads(response['body'])['error']['code'],
+                         -32700)
+        self.assertEqual(os.listdir(self.scratch), [])
+
+
+class AdmissionTest(ServerTestCase):
+
+    def setUp(self):
+        ServerTestCase.setUp(self)
+        self.limiter = MethodLimiter(1, 1, queue_timeout=30)
+        self.app.rpc_service._limiters = {
+            'GenomeAnnotationAPI.ping': self.limiter}
+        # a call that holds the only slot
+        self.limiter.acquire()
+
+    def test_queue_wait_ends_at_deadline(self):
+        started = time.time()
+        response = self.post(rpc('ping', {}, 1, context={'timeout': 0.1}))
+        self.assertLess(time.time() - started, 5)
+        error = json.loads(response['body'])['error']
+        self.assertIn('deadline', error['message'])
+        self.assertNotIn('Retry-After', response['headers'])
+
+    def test_busy(self):
+        self.limiter.max_queued = 0
+        response = self.post(rpc('ping', {}, 1))
+        self.assertEqual(response['status'], '503 Service Unavailable')
+        self.assertIn('Retry-After', response['headers'])
+
+
+class AsyncCLITest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.impl = FakeImpl()
+        self.service = server.application.rpc_service
+        self.service.add(self.impl.echo, name='GenomeAnnotationAPI.echo',
+                         types=[dict])
+        self.service.add(self.impl.fail, name='GenomeAnnotationAPI.fail',
+                         types=[dict])
+
+    def tearDown(self):
+        for name in ('echo', 'fail'):
+            del self.service.method_data['GenomeAnnotationAPI.' + name]
+        shutil.rmtree(self.dir)
+
+    def run_cli(self, data):
+        input_path = os.path.join(self.dir, 'input.json')
+        output_path = os.path.join(self.dir, 'output.json')
+        with open(input_path, 'w') as f:
+            f.write(data)
+        exit_code = server.process_async_cli(input_path, output_path, None)
+        with open(output_path) as f:
+            return exit_code, f.read()
+
+    def test_array(self):
+        exit_code, output = self.run_cli(json.dumps(
+            [rpc('echo', {'n': i}, i) for i in range(6)]))
+        self.assertEqual(exit_code, 0)
+        responds = json.loads(output)
+        self.assertEqual([r['id'] for r in responds], range(6))
+        self.assertEqual([r['result'] for r in responds],
+                         [[{'n': i}] for i in range(6)])
+
+    def test_array_with_errors(self):
+        exit_code, output = self.run_cli(json.dumps([
+            rpc('echo', {'n': 1}, 1), 'not a request', rpc('fail', {}, 3),
+            rpc('echo', {'n': 4}, 4)]))
+        self.assertEqual(exit_code, 500)
+        responds = json.loads(output)
+        self.assertEqual(len(responds), 4)
+        self.assertEqual(responds[0]['result'], [{'n': 1}])
+        self.assertEqual(responds[1]['error']['code'], -32600)
+        self.assertIsNone(responds[1]['id'])
+        self.assertEqual(responds[2]['id'], 3)
+        self.assertEqual(responds[2]['error']['message'], 'no such genome')
+        self.assertEqual(responds[3]['result'], [{'n': 4}])
+
+    def test_lines(self):
+        exit_code, output = self.run_cli('\n'.join(
+            json.dumps(rpc('echo', {'n': i}, i)) for i in range(3)) + '\n\n')
+        self.assertEqual(exit_code, 0)
+        lines = output.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual([json.loads(line)['result'] for line in lines],
+                         [[{'n': i}] for i in range(3)])
+
+    def test_lines_with_errors(self):
+        exit_code, output = self.run_cli('\n'.join([
+            json.dumps(rpc('fail', {}, 1)), json.dumps({'id': 2}),
+            json.dumps(rpc('echo', {'n': 3}, 3))]))
+        self.assertEqual(exit_code, 500)
+        responds = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(responds[0]['error']['message'], 'no such genome')
+        self.assertEqual(responds[1]['id'], 2)
+        self.assertEqual(responds[1]['error']['code'], -32600)
+        self.assertEqual(responds[2]['result'], [{'n': 3}])
+
+    def test_single(self):
+        exit_code, output = self.run_cli(json.dumps(rpc('echo', {'n': 1})))
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(json.loads(output)['result'], [{'n': 1}])
+        exit_code, output = self.run_cli(json.dumps(rpc('fail', {}, 1)))
+        self.assertEqual(exit_code, 500)
+        self.assertEqual(json.loads(output)['error']['message'],
+                         'no such genome')
+
+
+class MetricsTest(ServerTestCase):
+
+    def setUp(self):
+        ServerTestCase.setUp(self)
+        self.app.metrics = MethodMetrics('test')
+
+    def in_flight(self):
+        return sum(data['in_flight']
+                   for data in self.app.metrics._methods.values())
+
+    def call(self, body):
+        environ = {'REQUEST_METHOD': 'POST', 'REMOTE_ADDR': '127.0.0.1',
+                   'CONTENT_LENGTH': str(len(body)),
+                   'wsgi.input': StringIO(body)}
+        return self.app(environ, lambda status, headers: None)
+
+    def test_recorded_when_handling_fails(self):
+        # a request without a method fails outside the JSON-RPC error
+        # handling
+        self.assertRaises(Exception, self.call, json.dumps({'id': 1}))
+        self.assertEqual(self.in_flight(), 0)
+        self.assertEqual(self.app.metrics._methods['unknown']['errors'], 1)
+
+    def test_stream_recorded_when_closed_unread(self):
+        self.app.stream_responses = True
+        body = self.call(json.dumps(rpc('ping', {'n': 1}, 1)))
+        self.assertEqual(self.in_flight(), 1)
+        body.close()
+        self.assertEqual(self.in_flight(), 0)
+        self.assertEqual(
+            self.app.metrics._methods['GenomeAnnotationAPI.ping']['requests'],
+            1)
+
+    def test_stream_recorded_once(self):
+        self.app.stream_responses = True
+        body = self.call(json.dumps(rpc('ping', {'n': 1}, 1)))
+        self.assertEqual(json.loads(''.join(body))['result'], [{'n': 1}])
+        body.close()
+        data = self.app.metrics._methods['GenomeAnnotationAPI.ping']
+        self.assertEqual((data['requests'], data['in_flight']), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()